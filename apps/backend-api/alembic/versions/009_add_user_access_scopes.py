@@ -0,0 +1,87 @@
+"""add user access scopes
+
+Revision ID: 009_add_user_access_scopes
+Revises: 008_add_performance_indexes
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '009_add_user_access_scopes'
+down_revision = '008_add_performance_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Precomputed per-user access scopes (user -> reachable property, unit, lease
+    and work order ids) for landlord, tenant and vendor row-level scoping.
+    Maintained incrementally by core.access_scope; backfilled here.
+    """
+    op.create_table(
+        'user_access_scopes',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('role', sa.Text(), nullable=False),
+        sa.Column('resource_type', sa.Text(), nullable=False),
+        sa.Column('resource_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'role', 'resource_type', 'resource_id'),
+    )
+    op.create_index('idx_user_access_scopes_resource', 'user_access_scopes', ['resource_type', 'resource_id'])
+
+    # Backfill from the current ownership paths
+    op.execute("""
+        INSERT INTO user_access_scopes (user_id, role, resource_type, resource_id, organization_id)
+        SELECT l.user_id, 'landlord', 'property', p.id, p.organization_id
+          FROM landlords l JOIN properties p ON p.landlord_id = l.id
+         WHERE l.user_id IS NOT NULL
+        UNION
+        SELECT l.user_id, 'landlord', 'unit', u.id, p.organization_id
+          FROM landlords l JOIN properties p ON p.landlord_id = l.id JOIN units u ON u.property_id = p.id
+         WHERE l.user_id IS NOT NULL
+        UNION
+        SELECT l.user_id, 'landlord', 'lease', le.id, le.organization_id
+          FROM landlords l JOIN leases le ON le.landlord_id = l.id
+         WHERE l.user_id IS NOT NULL
+        UNION
+        SELECT l.user_id, 'landlord', 'work_order', w.id, w.organization_id
+          FROM landlords l JOIN properties p ON p.landlord_id = l.id JOIN work_orders w ON w.property_id = p.id
+         WHERE l.user_id IS NOT NULL
+        UNION
+        SELECT t.user_id, 'tenant', 'lease', le.id, le.organization_id
+          FROM tenants t JOIN lease_tenants lt ON lt.tenant_id = t.id JOIN leases le ON le.id = lt.lease_id
+         WHERE t.user_id IS NOT NULL
+        UNION
+        SELECT t.user_id, 'tenant', 'unit', le.unit_id, le.organization_id
+          FROM tenants t JOIN lease_tenants lt ON lt.tenant_id = t.id JOIN leases le ON le.id = lt.lease_id
+         WHERE t.user_id IS NOT NULL
+        UNION
+        SELECT t.user_id, 'tenant', 'property', u.property_id, le.organization_id
+          FROM tenants t JOIN lease_tenants lt ON lt.tenant_id = t.id JOIN leases le ON le.id = lt.lease_id
+          JOIN units u ON u.id = le.unit_id
+         WHERE t.user_id IS NOT NULL
+        UNION
+        SELECT v.user_id, 'vendor', 'work_order', w.id, w.organization_id
+          FROM vendors v JOIN work_order_assignments a ON a.vendor_id = v.id JOIN work_orders w ON w.id = a.work_order_id
+         WHERE v.user_id IS NOT NULL
+        UNION
+        SELECT v.user_id, 'vendor', 'property', w.property_id, w.organization_id
+          FROM vendors v JOIN work_order_assignments a ON a.vendor_id = v.id JOIN work_orders w ON w.id = a.work_order_id
+         WHERE v.user_id IS NOT NULL
+        UNION
+        SELECT v.user_id, 'vendor', 'unit', w.unit_id, w.organization_id
+          FROM vendors v JOIN work_order_assignments a ON a.vendor_id = v.id JOIN work_orders w ON w.id = a.work_order_id
+         WHERE v.user_id IS NOT NULL AND w.unit_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Revert: drop user_access_scopes"""
+    op.drop_index('idx_user_access_scopes_resource', table_name='user_access_scopes')
+    op.drop_table('user_access_scopes')
@@ -0,0 +1,51 @@
+"""add keyset pagination indexes
+
+Revision ID: 010_add_keyset_pagination_indexes
+Revises: 009_add_user_access_scopes
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_add_keyset_pagination_indexes'
+down_revision = '009_add_user_access_scopes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add (scope, created_at, id) indexes so cursor pagination seeks directly to
+    the page boundary instead of scanning and discarding OFFSET rows.
+    These indexes back:
+    - Work orders: list_work_orders (organization scoped)
+    - Notifications: list_notifications (per user)
+    - Audit logs: list_audit_logs (super_admin, unscoped)
+    - Rent payments: list_rent_payments (organization scoped)
+    """
+    
+    op.create_index('idx_work_orders_org_created_id',
+                   'work_orders', ['organization_id', 'created_at', 'id'],
+                   if_not_exists=True)
+    
+    op.create_index('idx_notifications_user_created_id',
+                   'notifications', ['user_id', 'created_at', 'id'],
+                   if_not_exists=True)
+    
+    op.create_index('idx_audit_logs_created_id',
+                   'audit_logs', ['created_at', 'id'],
+                   if_not_exists=True)
+    
+    op.create_index('idx_rent_payments_org_created_id',
+                   'rent_payments', ['organization_id', 'created_at', 'id'],
+                   if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Revert: drop keyset pagination indexes"""
+    op.drop_index('idx_rent_payments_org_created_id', table_name='rent_payments', if_exists=True)
+    op.drop_index('idx_audit_logs_created_id', table_name='audit_logs', if_exists=True)
+    op.drop_index('idx_notifications_user_created_id', table_name='notifications', if_exists=True)
+    op.drop_index('idx_work_orders_org_created_id', table_name='work_orders', if_exists=True)
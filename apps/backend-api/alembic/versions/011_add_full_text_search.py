@@ -0,0 +1,71 @@
+"""add full text search
+
+Revision ID: 011_add_full_text_search
+Revises: 010_add_keyset_pagination_indexes
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011_add_full_text_search'
+down_revision = '010_add_keyset_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Email addresses are indexed whole and split on separators, so both
+# "jane.doe@example.com" and "doe" match
+EMAIL_DOCUMENT = "coalesce(email, '') || ' ' || translate(coalesce(email, ''), '@.+_-', '     ')"
+
+SEARCH_DOCUMENTS = {
+    'properties': (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', address_line1), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(postal_code, '')), 'C')"
+    ),
+    'tenants': (
+        "setweight(to_tsvector('simple', name), 'A') || "
+        f"setweight(to_tsvector('simple', {EMAIL_DOCUMENT}), 'B')"
+    ),
+    'landlords': (
+        "setweight(to_tsvector('simple', name), 'A') || "
+        f"setweight(to_tsvector('simple', {EMAIL_DOCUMENT}), 'B')"
+    ),
+    'vendors': (
+        "setweight(to_tsvector('simple', company_name), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(contact_name, '')), 'B') || "
+        f"setweight(to_tsvector('simple', {EMAIL_DOCUMENT}), 'C')"
+    ),
+    'work_orders': (
+        "setweight(to_tsvector('simple', title), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ),
+}
+
+
+def upgrade() -> None:
+    """
+    Add a generated, GIN-indexed search_vector tsvector column to every table
+    searched by /api/v2/search. Postgres keeps the column current on every
+    insert/update, so no triggers or application write hooks are needed.
+    Note: adding a stored generated column rewrites the table.
+    """
+    for table, document in SEARCH_DOCUMENTS.items():
+        op.add_column(
+            table,
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(document, persisted=True), nullable=True),
+        )
+        op.create_index(f'idx_{table}_search_vector',
+                       table, ['search_vector'],
+                       postgresql_using='gin',
+                       if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Revert: drop search_vector columns and their indexes"""
+    for table in reversed(list(SEARCH_DOCUMENTS)):
+        op.drop_index(f'idx_{table}_search_vector', table_name=table, if_exists=True)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,48 @@
+"""add trigram indexes
+
+Revision ID: 012_add_trigram_indexes
+Revises: 011_add_full_text_search
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_add_trigram_indexes'
+down_revision = '011_add_full_text_search'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_COLUMNS = {
+    'properties': ['name', 'address_line1', 'city'],
+    'tenants': ['name', 'email'],
+    'landlords': ['name', 'email'],
+    'vendors': ['company_name'],
+}
+
+
+def upgrade() -> None:
+    """
+    Enable pg_trgm and add GIN trigram indexes for fuzzy search
+    (/api/v2/search?mode=similarity). gin_trgm_ops answers ILIKE '%q%',
+    % and <% (word similarity), so substring and misspelling lookups stay
+    index-assisted as the tables grow.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.create_index(f'idx_{table}_{column}_trgm',
+                           table, [column],
+                           postgresql_using='gin',
+                           postgresql_ops={column: 'gin_trgm_ops'},
+                           if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Revert: drop trigram indexes (the pg_trgm extension is left installed)"""
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.drop_index(f'idx_{table}_{column}_trgm', table_name=table, if_exists=True)
@@ -0,0 +1,28 @@
+"""add attachment content hash
+
+Revision ID: 013_add_attachment_content_hash
+Revises: 012_add_trigram_indexes
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_add_attachment_content_hash'
+down_revision = '012_add_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Store the SHA-256 digest computed while an attachment upload streams in.
+    Existing rows keep NULL (not hashed).
+    """
+    op.add_column('attachments', sa.Column('content_sha256', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Revert: drop attachments.content_sha256"""
+    op.drop_column('attachments', 'content_sha256')
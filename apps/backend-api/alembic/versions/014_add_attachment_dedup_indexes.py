@@ -0,0 +1,39 @@
+"""add attachment dedup indexes
+
+Revision ID: 014_add_attachment_dedup_indexes
+Revises: 013_add_attachment_content_hash
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014_add_attachment_dedup_indexes'
+down_revision = '013_add_attachment_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Attachments are stored content-addressed (storage_key = blobs/ab/cd/{sha256})
+    and rows with identical content share a key. These indexes back:
+    - Reference counting on delete (rows per storage_key)
+    - Content lookup for POST /attachments/from-content (organization + digest)
+    Existing rows keep their per-entity paths.
+    """
+    
+    op.create_index('idx_attachments_storage_key',
+                   'attachments', ['storage_key'],
+                   if_not_exists=True)
+    
+    op.create_index('idx_attachments_org_content',
+                   'attachments', ['organization_id', 'content_sha256'],
+                   if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Revert: drop attachment dedup indexes"""
+    op.drop_index('idx_attachments_org_content', table_name='attachments', if_exists=True)
+    op.drop_index('idx_attachments_storage_key', table_name='attachments', if_exists=True)
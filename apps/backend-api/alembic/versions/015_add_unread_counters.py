@@ -0,0 +1,65 @@
+"""add unread counters
+
+Revision ID: 015_add_unread_counters
+Revises: 014_add_attachment_dedup_indexes
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '015_add_unread_counters'
+down_revision = '014_add_attachment_dedup_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Maintained unread counters for badge counts:
+    - conversation_participants.unread_count: messages from others since last_read_at
+    - user_unread_counts: per-user unread notifications and messages
+    Maintained by core.unread_counts; backfilled here.
+    """
+    op.add_column('conversation_participants',
+                  sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+    
+    op.create_table(
+        'user_unread_counts',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('notifications', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('messages', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    
+    # Backfill from the current rows
+    op.execute("""
+        UPDATE conversation_participants cp
+           SET unread_count = (
+               SELECT count(*) FROM messages m
+                WHERE m.conversation_id = cp.conversation_id
+                  AND m.sender_user_id <> cp.user_id
+                  AND m.created_at > coalesce(cp.last_read_at, '-infinity')
+           )
+    """)
+    op.execute("""
+        INSERT INTO user_unread_counts (user_id, notifications, messages)
+        SELECT user_id, sum(notifications), sum(messages)
+          FROM (
+              SELECT user_id, count(*) AS notifications, 0 AS messages
+                FROM notifications WHERE NOT is_read GROUP BY user_id
+              UNION ALL
+              SELECT user_id, 0, sum(unread_count)
+                FROM conversation_participants GROUP BY user_id
+          ) counts
+         GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    """Revert: drop unread counters"""
+    op.drop_table('user_unread_counts')
+    op.drop_column('conversation_participants', 'unread_count')
@@ -0,0 +1,50 @@
+"""add notification jobs
+
+Revision ID: 016_add_notification_jobs
+Revises: 015_add_unread_counters
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '016_add_notification_jobs'
+down_revision = '015_add_unread_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Background jobs for POST /notifications/broadcast when the audience is
+    larger than NOTIFICATION_BROADCAST_INLINE_LIMIT.
+    """
+    op.create_table(
+        'notification_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_by_user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('audience', postgresql.JSONB(), nullable=False),
+        sa.Column('entity_type', sa.Text(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('type', sa.Text(), nullable=False),
+        sa.Column('status', sa.Text(), server_default='queued', nullable=False),
+        sa.Column('recipient_count', sa.Integer(), nullable=True),
+        sa.Column('sent_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_notification_jobs_org_created', 'notification_jobs', ['organization_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Revert: drop notification_jobs"""
+    op.drop_index('idx_notification_jobs_org_created', table_name='notification_jobs')
+    op.drop_table('notification_jobs')
@@ -0,0 +1,154 @@
+"""partition notifications by month
+
+Revision ID: 017_partition_notifications
+Revises: 016_add_notification_jobs
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '017_partition_notifications'
+down_revision = '016_add_notification_jobs'
+branch_labels = None
+depends_on = None
+
+
+# Monthly partitions created ahead of the current month
+# (later months are added by core.notification_retention)
+MONTHS_AHEAD = 3
+
+NOTIFICATION_COLUMNS = 'id, user_id, organization_id, entity_type, entity_id, type, is_read, created_at, read_at'
+
+
+def _notification_columns():
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('entity_type', sa.Text(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('type', sa.Text(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), server_default='false', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _create_notification_indexes() -> None:
+    op.create_index('idx_notifications_user_read_created', 'notifications', ['user_id', 'is_read', 'created_at'])
+    op.create_index('idx_notifications_user_created_id', 'notifications', ['user_id', 'created_at', 'id'])
+    op.create_index('idx_notifications_organization_id', 'notifications', ['organization_id'])
+
+
+def upgrade() -> None:
+    """
+    Rebuild notifications as a table partitioned by month on created_at, so
+    per-user queries bounded by created_at only scan recent partitions and old
+    months can be dropped instead of deleted row by row:
+    - notifications_YYYY_MM for every month with rows, up to MONTHS_AHEAD ahead
+    - notifications_default for rows outside the monthly partitions
+    - primary key (id, created_at): it must include the partition key
+    - notifications_archive: where the retention job moves expired rows
+    Existing rows are copied under an ACCESS EXCLUSIVE lock, so notification
+    reads and writes wait until the migration commits (none are lost).
+    """
+    # SHARE mode would let reads continue, but the lock upgrade needed for the
+    # DROP below could then deadlock with a reader that goes on to write
+    op.execute("LOCK TABLE notifications IN ACCESS EXCLUSIVE MODE")
+
+    op.create_table(
+        'notifications_partitioned',
+        *_notification_columns(),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+
+    # Month bounds in UTC, matching core.notification_retention.partition_name()
+    op.execute(f"""
+        DO $$
+        DECLARE
+            first_month timestamp;
+            month timestamp;
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(created_at), now()) AT TIME ZONE 'UTC')
+              INTO first_month FROM notifications;
+            FOR month IN
+                SELECT generate_series(
+                    first_month,
+                    date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF notifications_partitioned FOR VALUES FROM (%L) TO (%L)',
+                    'notifications_' || to_char(month, 'YYYY_MM'),
+                    month AT TIME ZONE 'UTC',
+                    (month + interval '1 month') AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE notifications_default PARTITION OF notifications_partitioned DEFAULT")
+
+    op.execute(f"""
+        INSERT INTO notifications_partitioned ({NOTIFICATION_COLUMNS})
+        SELECT {NOTIFICATION_COLUMNS} FROM notifications
+    """)
+    op.drop_table('notifications')
+    op.rename_table('notifications_partitioned', 'notifications')
+
+    op.create_primary_key('notifications_pkey', 'notifications', ['id', 'created_at'])
+    op.create_foreign_key('notifications_user_id_fkey', 'notifications', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('notifications_organization_id_fkey', 'notifications', 'organizations',
+                          ['organization_id'], ['id'], ondelete='CASCADE')
+    _create_notification_indexes()
+
+    op.create_table(
+        'notifications_archive',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('entity_type', sa.Text(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('type', sa.Text(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_notifications_archive_user_created', 'notifications_archive', ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """
+    Revert: back to a single notifications table (copied under the same
+    lock as upgrade). Archived notifications are not restored.
+    """
+    op.execute("LOCK TABLE notifications IN ACCESS EXCLUSIVE MODE")
+    op.drop_index('idx_notifications_archive_user_created', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+
+    op.create_table(
+        'notifications_unpartitioned',
+        *_notification_columns(),
+    )
+    op.execute(f"""
+        INSERT INTO notifications_unpartitioned ({NOTIFICATION_COLUMNS})
+        SELECT {NOTIFICATION_COLUMNS} FROM notifications
+    """)
+    # Drops the partitions with it
+    op.drop_table('notifications')
+    op.rename_table('notifications_unpartitioned', 'notifications')
+
+    op.create_primary_key('notifications_pkey', 'notifications', ['id'])
+    op.create_foreign_key('notifications_user_id_fkey', 'notifications', 'users',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('notifications_organization_id_fkey', 'notifications', 'organizations',
+                          ['organization_id'], ['id'], ondelete='CASCADE')
+    _create_notification_indexes()
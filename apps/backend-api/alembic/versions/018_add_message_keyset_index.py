@@ -0,0 +1,35 @@
+"""add message keyset index
+
+Revision ID: 018_add_message_keyset_index
+Revises: 017_partition_notifications
+Create Date: 2024-12-XX XX:XX:XX.XXXXXX
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '018_add_message_keyset_index'
+down_revision = '017_partition_notifications'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Index for GET /conversations/{id}/messages (cursor on created_at, id) and
+    the latest-message lookup of conversation summaries. It replaces
+    idx_messages_conversation_created, which is a prefix of it.
+    """
+    op.create_index('idx_messages_conversation_created_id',
+                   'messages', ['conversation_id', 'created_at', 'id'],
+                   if_not_exists=True)
+    op.drop_index('idx_messages_conversation_created', table_name='messages', if_exists=True)
+
+
+def downgrade() -> None:
+    """Revert: restore the (conversation_id, created_at) index"""
+    op.create_index('idx_messages_conversation_created',
+                   'messages', ['conversation_id', 'created_at'],
+                   if_not_exists=True)
+    op.drop_index('idx_messages_conversation_created_id', table_name='messages', if_exists=True)
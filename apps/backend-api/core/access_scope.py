@@ -0,0 +1,205 @@
+"""
+Precomputed per-user access scopes
+
+Landlords, tenants and vendors only see the rows they reach through their own
+records (landlord -> properties, tenant -> lease_tenants -> leases, vendor ->
+work_order_assignments). Instead of re-deriving that through multi-hop
+subqueries on every request, the reachable ids are materialized in the
+user_access_scopes table and routers apply a single indexed join.
+
+The table is refreshed per affected user, inside the caller's transaction,
+whenever a write changes one of the derivation paths:
+
+    scope_user_ids = await lease_scope_user_ids(db, lease.id)
+    await refresh_access_scopes(db, scope_user_ids)
+    await db.commit()
+"""
+from typing import Iterable, List, Optional, Set
+from uuid import UUID
+from sqlalchemy import Text, and_, delete, insert, literal_column, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.auth_v2 import RoleEnum
+from db.models_v2 import (
+    UserAccessScope, Landlord, Tenant, Vendor, Property, Unit, Lease, LeaseTenant,
+    WorkOrder, WorkOrderAssignment,
+)
+
+
+# Resource types stored in user_access_scopes.resource_type (match ResourceType values)
+SCOPE_PROPERTY = "property"
+SCOPE_UNIT = "unit"
+SCOPE_LEASE = "lease"
+SCOPE_WORK_ORDER = "work_order"
+
+SCOPE_COLUMNS = ["user_id", "role", "resource_type", "resource_id", "organization_id"]
+
+
+def _constant(value: str):
+    return literal_column(f"'{value}'", Text)
+
+
+def _scope_select(user_col, role: str, resource_type: str, resource_col, org_col):
+    return select(
+        user_col.label("user_id"),
+        _constant(role).label("role"),
+        _constant(resource_type).label("resource_type"),
+        resource_col.label("resource_id"),
+        org_col.label("organization_id"),
+    )
+
+
+def _scope_sources(user_ids: Optional[Set[UUID]] = None) -> List:
+    """Every derivation path, optionally restricted to the given users"""
+    landlord_filter = Landlord.user_id.in_(user_ids) if user_ids is not None else Landlord.user_id.isnot(None)
+    tenant_filter = Tenant.user_id.in_(user_ids) if user_ids is not None else Tenant.user_id.isnot(None)
+    vendor_filter = Vendor.user_id.in_(user_ids) if user_ids is not None else Vendor.user_id.isnot(None)
+
+    return [
+        # Landlord -> properties they own, and the units, leases and work orders under them
+        _scope_select(Landlord.user_id, RoleEnum.LANDLORD, SCOPE_PROPERTY, Property.id, Property.organization_id)
+        .join(Property, Property.landlord_id == Landlord.id)
+        .where(landlord_filter),
+        _scope_select(Landlord.user_id, RoleEnum.LANDLORD, SCOPE_UNIT, Unit.id, Property.organization_id)
+        .join(Property, Property.landlord_id == Landlord.id)
+        .join(Unit, Unit.property_id == Property.id)
+        .where(landlord_filter),
+        _scope_select(Landlord.user_id, RoleEnum.LANDLORD, SCOPE_LEASE, Lease.id, Lease.organization_id)
+        .join(Lease, Lease.landlord_id == Landlord.id)
+        .where(landlord_filter),
+        _scope_select(Landlord.user_id, RoleEnum.LANDLORD, SCOPE_WORK_ORDER, WorkOrder.id, WorkOrder.organization_id)
+        .join(Property, Property.landlord_id == Landlord.id)
+        .join(WorkOrder, WorkOrder.property_id == Property.id)
+        .where(landlord_filter),
+        # Tenant -> leases they are on, and the units/properties of those leases
+        _scope_select(Tenant.user_id, RoleEnum.TENANT, SCOPE_LEASE, Lease.id, Lease.organization_id)
+        .join(LeaseTenant, LeaseTenant.tenant_id == Tenant.id)
+        .join(Lease, Lease.id == LeaseTenant.lease_id)
+        .where(tenant_filter),
+        _scope_select(Tenant.user_id, RoleEnum.TENANT, SCOPE_UNIT, Lease.unit_id, Lease.organization_id)
+        .join(LeaseTenant, LeaseTenant.tenant_id == Tenant.id)
+        .join(Lease, Lease.id == LeaseTenant.lease_id)
+        .where(tenant_filter),
+        _scope_select(Tenant.user_id, RoleEnum.TENANT, SCOPE_PROPERTY, Unit.property_id, Lease.organization_id)
+        .join(LeaseTenant, LeaseTenant.tenant_id == Tenant.id)
+        .join(Lease, Lease.id == LeaseTenant.lease_id)
+        .join(Unit, Unit.id == Lease.unit_id)
+        .where(tenant_filter),
+        # Vendor -> assigned work orders, and their properties/units
+        _scope_select(Vendor.user_id, RoleEnum.VENDOR, SCOPE_WORK_ORDER, WorkOrder.id, WorkOrder.organization_id)
+        .join(WorkOrderAssignment, WorkOrderAssignment.vendor_id == Vendor.id)
+        .join(WorkOrder, WorkOrder.id == WorkOrderAssignment.work_order_id)
+        .where(vendor_filter),
+        _scope_select(Vendor.user_id, RoleEnum.VENDOR, SCOPE_PROPERTY, WorkOrder.property_id, WorkOrder.organization_id)
+        .join(WorkOrderAssignment, WorkOrderAssignment.vendor_id == Vendor.id)
+        .join(WorkOrder, WorkOrder.id == WorkOrderAssignment.work_order_id)
+        .where(vendor_filter),
+        _scope_select(Vendor.user_id, RoleEnum.VENDOR, SCOPE_UNIT, WorkOrder.unit_id, WorkOrder.organization_id)
+        .join(WorkOrderAssignment, WorkOrderAssignment.vendor_id == Vendor.id)
+        .join(WorkOrder, WorkOrder.id == WorkOrderAssignment.work_order_id)
+        .where(and_(vendor_filter, WorkOrder.unit_id.isnot(None))),
+    ]
+
+
+async def refresh_access_scopes(db: AsyncSession, user_ids: Iterable[Optional[UUID]]) -> None:
+    """
+    Recompute the scope rows of the given users from the source tables.
+
+    Runs in the caller's transaction (pending ORM changes are flushed first),
+    so the scope table commits or rolls back together with the write.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    await db.flush()
+    await db.execute(delete(UserAccessScope).where(UserAccessScope.user_id.in_(user_ids)))
+    await db.execute(
+        insert(UserAccessScope).from_select(SCOPE_COLUMNS, union(*_scope_sources(user_ids)))
+    )
+
+
+async def rebuild_access_scopes(db: AsyncSession) -> None:
+    """Recompute the whole table (initial backfill / repair after bulk imports)"""
+    await db.flush()
+    await db.execute(delete(UserAccessScope))
+    await db.execute(insert(UserAccessScope).from_select(SCOPE_COLUMNS, union(*_scope_sources())))
+
+
+async def _scope_user_ids(db: AsyncSession, resource_type: str, resource_id: UUID, *derived) -> Set[UUID]:
+    """Users currently holding a scope row for the resource, plus users it now derives to"""
+    current = select(UserAccessScope.user_id).where(
+        UserAccessScope.resource_type == resource_type,
+        UserAccessScope.resource_id == resource_id,
+    )
+    await db.flush()
+    result = await db.execute(union(current, *derived))
+    return {user_id for user_id in result.scalars().all() if user_id is not None}
+
+
+async def lease_scope_user_ids(db: AsyncSession, lease_id: UUID) -> Set[UUID]:
+    """Users whose scope depends on a lease (its landlord and tenants)"""
+    return await _scope_user_ids(
+        db, SCOPE_LEASE, lease_id,
+        select(Landlord.user_id).join(Lease, Lease.landlord_id == Landlord.id).where(Lease.id == lease_id),
+        select(Tenant.user_id).join(LeaseTenant, LeaseTenant.tenant_id == Tenant.id).where(LeaseTenant.lease_id == lease_id),
+    )
+
+
+async def property_scope_user_ids(db: AsyncSession, property_id: UUID) -> Set[UUID]:
+    """Users whose scope depends on a property (current and previous landlord)"""
+    return await _scope_user_ids(
+        db, SCOPE_PROPERTY, property_id,
+        select(Landlord.user_id).join(Property, Property.landlord_id == Landlord.id).where(Property.id == property_id),
+    )
+
+
+async def unit_scope_user_ids(db: AsyncSession, unit_id: UUID) -> Set[UUID]:
+    """Users whose scope depends on a unit (property landlord, lease tenants, vendors)"""
+    return await _scope_user_ids(
+        db, SCOPE_UNIT, unit_id,
+        select(Landlord.user_id)
+        .join(Property, Property.landlord_id == Landlord.id)
+        .join(Unit, Unit.property_id == Property.id)
+        .where(Unit.id == unit_id),
+    )
+
+
+async def work_order_scope_user_ids(db: AsyncSession, work_order_id: UUID) -> Set[UUID]:
+    """Users whose scope depends on a work order (property landlord and assigned vendors)"""
+    return await _scope_user_ids(
+        db, SCOPE_WORK_ORDER, work_order_id,
+        select(Landlord.user_id)
+        .join(Property, Property.landlord_id == Landlord.id)
+        .join(WorkOrder, WorkOrder.property_id == Property.id)
+        .where(WorkOrder.id == work_order_id),
+        select(Vendor.user_id)
+        .join(WorkOrderAssignment, WorkOrderAssignment.vendor_id == Vendor.id)
+        .where(WorkOrderAssignment.work_order_id == work_order_id),
+    )
+
+
+def scoped_ids(user_id: UUID, role: str, resource_type: str):
+    """Subquery of the resource ids ``user_id`` reaches as ``role``"""
+    return select(UserAccessScope.resource_id).where(
+        UserAccessScope.user_id == user_id,
+        UserAccessScope.role == role,
+        UserAccessScope.resource_type == resource_type,
+    )
+
+
+def join_access_scope(query, id_column, user_id: UUID, role: str, resource_type: str):
+    """
+    Restrict ``query`` to rows whose ``id_column`` is in the user's scope.
+
+    A single join against the (user_id, role, resource_type, resource_id)
+    primary key replaces the per-role multi-hop subqueries.
+    """
+    return query.join(
+        UserAccessScope,
+        and_(
+            UserAccessScope.resource_id == id_column,
+            UserAccessScope.user_id == user_id,
+            UserAccessScope.role == role,
+            UserAccessScope.resource_type == resource_type,
+        ),
+    )
@@ -0,0 +1,92 @@
+"""
+Content-addressed attachment storage
+
+Attachment bytes are stored once per distinct content, under a key derived
+from their SHA-256 (``blobs/ab/cd/abcd...``). Every Attachment row with that
+content shares the same ``storage_key``, which doubles as the reference count:
+a blob is removed only when the last row pointing at it is deleted.
+
+Uploads and deletes of the same key are serialized with a transaction-scoped
+advisory lock, so a new row can never reference a blob that a concurrent
+delete is removing:
+
+    await lock_storage_key(db, storage_key)
+    await db.execute(delete(Attachment).where(Attachment.id == attachment_id))
+    if await count_references(db, storage_key) == 0:
+        ...remove the blob...
+    await db.commit()
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.rbac import PermissionAction, ResourceType, get_permitted_resource_ids
+from db.models_v2 import Attachment, User
+
+BLOB_PREFIX = "blobs"
+
+# Attachments with the same content considered when looking for a readable one
+CONTENT_CANDIDATE_LIMIT = 100
+
+
+def content_storage_key(sha256: str) -> str:
+    """Storage key for content with the given hex digest (fanned out by prefix)"""
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+async def lock_storage_key(db: AsyncSession, storage_key: str) -> None:
+    """Hold an advisory lock on the key until the current transaction ends"""
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(storage_key))))
+
+
+async def count_references(db: AsyncSession, storage_key: str) -> int:
+    """Number of attachment rows sharing the key (pending deletes are flushed first)"""
+    await db.flush()
+    result = await db.execute(
+        select(func.count()).select_from(Attachment).where(Attachment.storage_key == storage_key)
+    )
+    return result.scalar() or 0
+
+
+async def find_readable_content(
+    db: AsyncSession,
+    user: User,
+    sha256: str,
+    size: Optional[int],
+) -> Optional[Attachment]:
+    """
+    An existing attachment with this content that ``user`` may already read, if any.
+
+    Knowing a digest must not be enough to obtain the bytes, so only
+    attachments of the user's organization on entities they have READ
+    permission for qualify (entity types without an RBAC resource never do).
+    """
+    query = select(Attachment).where(
+        Attachment.organization_id == user.organization_id,
+        Attachment.content_sha256 == sha256,
+        Attachment.storage_key == content_storage_key(sha256),
+    )
+    if size is not None:
+        query = query.where(Attachment.file_size_bytes == size)
+    result = await db.execute(query.limit(CONTENT_CANDIDATE_LIMIT))
+    candidates = result.scalars().all()
+
+    by_type: Dict[str, List[Attachment]] = defaultdict(list)
+    for attachment in candidates:
+        by_type[attachment.entity_type].append(attachment)
+
+    # One permission check per entity type
+    for entity_type, attachments in by_type.items():
+        try:
+            resource = ResourceType(entity_type)
+        except ValueError:
+            continue
+        permitted = await get_permitted_resource_ids(
+            user, PermissionAction.READ, resource, db,
+            [attachment.entity_id for attachment in attachments],
+            resource_org_id=user.organization_id,
+        )
+        for attachment in attachments:
+            if attachment.entity_id in permitted:
+                return attachment
+    return None
@@ -0,0 +1,89 @@
+"""
+Attachments of many entities in one query
+
+List pages (work orders, inspections, ...) show attachment counts or
+galleries for every row. Instead of one ``GET /attachments`` per row, they
+load all rows' attachments with a single ``entity_id IN (...)`` query
+answered by the (entity_type, entity_id) index:
+
+    summaries = await attachment_summaries(db, "work_order", ids, organization_id)
+    summaries[work_order.id].count
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.models_v2 import Attachment
+from schemas.attachment import Attachment as AttachmentSchema, AttachmentGroup, AttachmentSummary
+
+# Upper bound on entity ids per batch (one page of a list endpoint)
+MAX_BATCH_ENTITIES = 100
+
+
+def _scoped(query, entity_type: str, entity_ids: Sequence[UUID], organization_id: Optional[UUID]):
+    query = query.where(
+        Attachment.entity_type == entity_type,
+        Attachment.entity_id.in_(entity_ids),
+    )
+    if organization_id is not None:
+        query = query.where(Attachment.organization_id == organization_id)
+    return query
+
+
+async def attachment_summaries(
+    db: AsyncSession,
+    entity_type: str,
+    entity_ids: Sequence[UUID],
+    organization_id: Optional[UUID],
+) -> Dict[UUID, AttachmentSummary]:
+    """
+    Count, total size and latest upload per entity (aggregated in the
+    database). Every requested id is present; entities without attachments
+    get an empty summary. ``organization_id`` None means unscoped.
+    """
+    summaries = {entity_id: AttachmentSummary() for entity_id in entity_ids}
+    if not summaries:
+        return summaries
+
+    query = _scoped(
+        select(
+            Attachment.entity_id,
+            func.count(),
+            func.coalesce(func.sum(Attachment.file_size_bytes), 0),
+            func.max(Attachment.created_at),
+        ),
+        entity_type, list(summaries), organization_id,
+    ).group_by(Attachment.entity_id)
+
+    result = await db.execute(query)
+    for entity_id, count, total_size, latest in result.all():
+        summaries[entity_id] = AttachmentSummary(count=count, total_size_bytes=total_size, latest_created_at=latest)
+    return summaries
+
+
+async def attachment_groups(
+    db: AsyncSession,
+    entity_type: str,
+    entity_ids: Sequence[UUID],
+    organization_id: Optional[UUID],
+) -> Dict[UUID, AttachmentGroup]:
+    """Attachments per entity (oldest first) with their summary; one query for all ids"""
+    grouped: Dict[UUID, List[Attachment]] = defaultdict(list)
+    entity_ids = list(dict.fromkeys(entity_ids))
+    if entity_ids:
+        query = _scoped(select(Attachment), entity_type, entity_ids, organization_id)
+        result = await db.execute(query.order_by(Attachment.entity_id, Attachment.created_at))
+        for attachment in result.scalars():
+            grouped[attachment.entity_id].append(attachment)
+
+    groups = {}
+    for entity_id in entity_ids:
+        attachments = grouped.get(entity_id, [])
+        groups[entity_id] = AttachmentGroup(
+            count=len(attachments),
+            total_size_bytes=sum(a.file_size_bytes or 0 for a in attachments),
+            latest_created_at=max((a.created_at for a in attachments), default=None),
+            attachments=[AttachmentSchema.model_validate(a) for a in attachments],
+        )
+    return groups
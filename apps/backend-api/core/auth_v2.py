@@ -1,15 +1,19 @@
 """
 Authentication and authorization utilities for v2 schema
 """
+import copy
+import hashlib
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Any, Optional, List, Dict, Tuple
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from core.cache import TTLCache
 from core.config import settings
 from core.database import get_db
 from db.models_v2 import User, UserRole, Role, Organization
@@ -18,6 +22,12 @@ from uuid import UUID
 # JWT security
 security = HTTPBearer()
 
+# Attribute used to attach the resolved principal to the request's User instance
+_PRINCIPAL_ATTR = "_principal"
+
+# Request methods eligible for stateless (claims-only) authentication
+STATELESS_METHODS = ("GET", "HEAD")
+
 # Role enum
 class RoleEnum:
     SUPER_ADMIN = "super_admin"
@@ -59,13 +69,100 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user_v2(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token (v2 schema)"""
-    token = credentials.credentials
+@dataclass
+class Principal:
+    """
+    Identity of the caller, resolved once per request.
+    
+    Holds the user row, role names and organization so that role checks,
+    permission checks and router bodies don't re-query roles.
+    """
+    user: User
+    roles: List[str]
+    organization_id: Optional[UUID] = None
+    # Effective permission bitmask, computed lazily by core.rbac
+    permission_mask: Optional[int] = None
+    
+    @property
+    def user_id(self) -> UUID:
+        return self.user.id
     
+    @property
+    def is_super_admin(self) -> bool:
+        return RoleEnum.SUPER_ADMIN in self.roles
+    
+    def has_any_role(self, roles: List[str]) -> bool:
+        return any(role in roles for role in self.roles)
+
+
+def get_principal(user: User) -> Optional[Principal]:
+    """Return the principal attached to a user by get_current_principal, if any"""
+    return getattr(user, _PRINCIPAL_ATTR, None)
+
+
+def compute_role_version(user_status: str, roles: List[str], organization_id: Optional[UUID]) -> str:
+    """
+    Fingerprint of the authorization-relevant state of a user.
+    
+    Minted into access tokens as the ``rv`` claim; a token is only trusted
+    statelessly while its ``rv`` matches the user's current fingerprint.
+    """
+    raw = "|".join([user_status, ",".join(sorted(roles)), str(organization_id or "")])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+# Current role version per user (see compute_role_version), used by the stateless path
+role_version_cache = TTLCache(
+    "role_versions",
+    maxsize=settings.IDENTITY_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_ROLE_VERSION_TTL_SECONDS,
+)
+
+
+@dataclass(frozen=True)
+class CachedIdentity:
+    """Snapshot of a users row and its role names, safe to share across sessions"""
+    user_data: Dict[str, Any]
+    roles: Tuple[str, ...]
+
+
+# User rows and role lists keyed by user id, shared by all requests on this worker
+identity_cache = TTLCache(
+    "identity",
+    maxsize=settings.IDENTITY_CACHE_MAX_ENTRIES,
+    ttl=settings.IDENTITY_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_identity(user_id: UUID) -> None:
+    """
+    Drop cached identity data (user row, roles, role version) for a user.
+    
+    Call after changing a user's roles, status or organization. Takes effect
+    immediately on this worker; other workers pick up the change once their
+    cached entries expire.
+    """
+    identity_cache.invalidate(user_id)
+    role_version_cache.invalidate(user_id)
+
+
+def _snapshot_user(user: User) -> Dict[str, Any]:
+    """Copy the column values of a loaded users row"""
+    return {
+        attr.key: copy.deepcopy(getattr(user, attr.key))
+        for attr in User.__mapper__.column_attrs
+    }
+
+
+async def _attach_cached_user(cached: CachedIdentity, db: AsyncSession) -> User:
+    """Attach a cached users row to the session without issuing SQL"""
+    user = User(**copy.deepcopy(cached.user_data))
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def _decode_token(token: str) -> dict:
+    """Decode a JWT and return its payload (must carry a subject)"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: str = payload.get("sub")
@@ -80,20 +177,68 @@ async def get_current_user_v2(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
+    return payload
+
+
+def _principal_from_claims(payload: dict) -> Optional[Principal]:
+    """
+    Build a principal from signed token claims without touching the database.
     
-    # Fetch user from database with roles
-    result = await db.execute(
-        select(User)
-        .options(selectinload(User.user_roles).selectinload(UserRole.role))
-        .where(User.id == UUID(user_id))
+    Returns None unless the token carries a role version that matches the
+    cached current version for the user.
+    """
+    version = payload.get("rv")
+    roles = payload.get("roles")
+    if version is None or roles is None:
+        return None
+    
+    user_id = UUID(payload["sub"])
+    if role_version_cache.get(user_id) != version:
+        return None
+    
+    organization_id = payload.get("organization_id")
+    organization_id = UUID(organization_id) if organization_id else None
+    
+    # Transient (never persisted in this session) user carrying the claims
+    user = User(
+        id=user_id,
+        email=payload.get("email"),
+        organization_id=organization_id,
+        status="active",
     )
-    user = result.scalar_one_or_none()
+    principal = Principal(user=user, roles=list(roles), organization_id=organization_id)
+    setattr(user, _PRINCIPAL_ATTR, principal)
+    return principal
+
+
+async def _load_principal(user_id: UUID, db: AsyncSession, use_cache: bool = True) -> Principal:
+    """
+    Resolve the user and its roles, from the identity cache when possible,
+    otherwise from the database in one round trip.
+    """
+    cached = identity_cache.get(user_id) if use_cache else None
     
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+    if cached is not None:
+        user = await _attach_cached_user(cached, db)
+        roles = list(cached.roles)
+    else:
+        result = await db.execute(
+            select(User)
+            .options(joinedload(User.user_roles).joinedload(UserRole.role))
+            .where(User.id == user_id)
         )
+        user = result.unique().scalar_one_or_none()
+        
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        
+        roles = [ur.role.name for ur in user.user_roles if ur.role is not None]
+        identity_cache.set(user.id, CachedIdentity(user_data=_snapshot_user(user), roles=tuple(roles)))
+        if settings.AUTH_STATELESS_READS:
+            role_version_cache.set(user.id, compute_role_version(user.status, roles, user.organization_id))
     
     if user.status != "active":
         raise HTTPException(
@@ -101,12 +246,85 @@ async def get_current_user_v2(
             detail="User account is not active",
         )
     
-    return user
+    principal = Principal(
+        user=user,
+        roles=roles,
+        organization_id=user.organization_id,
+    )
+    # Attach to the (request-scoped) user instance so get_user_roles can reuse it
+    setattr(user, _PRINCIPAL_ATTR, principal)
+    
+    return principal
+
+
+async def get_current_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Resolve the authenticated principal (user, roles, organization) for this request.
+    
+    Served from the identity cache when possible, otherwise issues a single query
+    (users LEFT JOIN user_roles LEFT JOIN roles). FastAPI caches
+    dependency results per request, so every dependency and router that depends on
+    this (directly or via get_current_user_v2) shares the same principal.
+    
+    When AUTH_STATELESS_READS is enabled, GET/HEAD requests whose token role version
+    matches the cached one are authenticated from the signed claims alone, with no
+    database round trip. The principal's user is then a transient ``User`` carrying
+    only id, email, organization_id and status.
+    """
+    payload = _decode_token(credentials.credentials)
+    
+    principal = None
+    if settings.AUTH_STATELESS_READS and request.method in STATELESS_METHODS:
+        principal = _principal_from_claims(payload)
+    if principal is None:
+        principal = await _load_principal(UUID(payload["sub"]), db)
+    
+    # Exposed to middleware (e.g. read-your-writes tracking for replica routing)
+    request.state.principal = principal
+    return principal
+
+
+async def get_current_principal_from_db(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Resolve the principal from the database, bypassing the stateless fast path
+    and the identity cache.
+    
+    Use for endpoints that need the full ``User`` row with its roles loaded.
+    """
+    payload = _decode_token(credentials.credentials)
+    return await _load_principal(UUID(payload["sub"]), db, use_cache=False)
+
+
+async def get_current_user_v2(
+    principal: Principal = Depends(get_current_principal),
+) -> User:
+    """Get current authenticated user from JWT token (v2 schema)"""
+    return principal.user
 
 
 async def get_user_roles(user: User, db: AsyncSession) -> List[str]:
-    """Get list of role names for a user (always queries database to avoid lazy loading issues)"""
-    # Always query the database to avoid lazy loading issues in async context
+    """
+    Get list of role names for a user.
+    
+    Returns the roles already resolved for the request principal or held in the
+    identity cache when available; otherwise queries the database (avoids lazy
+    loading issues in async context).
+    """
+    principal = get_principal(user)
+    if principal is not None:
+        return list(principal.roles)
+    
+    cached = identity_cache.get(user.id)
+    if cached is not None:
+        return list(cached.roles)
+    
     result = await db.execute(
         select(Role.name)
         .join(UserRole)
@@ -130,26 +348,23 @@ def require_role_v2(allowed_roles: List[str], require_organization: bool = False
     _require_organization = require_organization
     
     async def role_checker(
-        current_user: User = Depends(get_current_user_v2),
-        db: AsyncSession = Depends(get_db)
+        principal: Principal = Depends(get_current_principal),
     ) -> User:
-        user_roles = await get_user_roles(current_user, db)
+        current_user = principal.user
         
         # super_admin can access everything
-        if RoleEnum.SUPER_ADMIN in user_roles:
+        if principal.is_super_admin:
             return current_user
         
         # Check if user has any of the allowed roles
-        has_role = any(role in _allowed_roles for role in user_roles)
-        
-        if not has_role:
+        if not principal.has_any_role(_allowed_roles):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access denied. Required roles: {_allowed_roles}",
             )
         
         # If organization scoping is required, ensure user has organization_id
-        if _require_organization and not current_user.organization_id:
+        if _require_organization and not principal.organization_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Organization access required",
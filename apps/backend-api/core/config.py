@@ -13,11 +13,89 @@ class Settings(BaseSettings):
     # Default matches the active Next.js API database (PT)
     # Note: asyncpg doesn't support 'schema' parameter, remove it from URL
     DATABASE_URL: str = "postgresql+asyncpg://skolagot@localhost:5432/PT"
+    # Connection pool, per worker process: workers x (size + overflow) must stay below max_connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    # Recycle connections older than this (seconds); -1 disables
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Test connections on checkout so stale ones are replaced transparently
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement cache per connection; set to 0 behind pgbouncer transaction pooling
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Read replicas (JSON list of URLs); empty routes every read to the primary
+    DATABASE_REPLICA_URLS: List[str] = []
+    # Replicas lagging more than this (seconds) are skipped in favour of the primary
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    # How often each replica's replay lag is re-measured (seconds)
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5
+    # After a write, the same user's reads stay on the primary for this long (seconds)
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = 10
+    # Tolerated clock difference between workers when reading the last-write cookie (seconds)
+    REPLICA_CLOCK_SKEW_SECONDS: float = 2
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Authenticate GET/HEAD requests from signed token claims (no DB lookup)
+    AUTH_STATELESS_READS: bool = False
+    # How long a user's role version is trusted before being re-read from the DB
+    AUTH_ROLE_VERSION_TTL_SECONDS: int = 60
+    # In-process identity cache (user rows + role lists); 0 entries disables it
+    IDENTITY_CACHE_MAX_ENTRIES: int = 10000
+    IDENTITY_CACHE_TTL_SECONDS: int = 30
+    
+    # Search
+    # Time budget per entity type in /search; slower types are omitted (partial results)
+    SEARCH_ENTITY_TIMEOUT_SECONDS: float = 2
+    # In-process result cache for /search (type-ahead); 0 entries disables it
+    SEARCH_CACHE_MAX_ENTRIES: int = 5000
+    SEARCH_CACHE_TTL_SECONDS: int = 30
+    
+    # Attachments
+    # Largest accepted upload (bytes); enforced while the body streams in
+    ATTACHMENT_MAX_FILE_BYTES: int = 50 * 1024 * 1024
+    # Total attachment bytes per organization; 0 disables the quota
+    ATTACHMENT_ORG_QUOTA_BYTES: int = 0
+    # Read/write chunk size for streamed uploads (bytes)
+    ATTACHMENT_UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    # Storage backend: "local" (ATTACHMENT_LOCAL_DIR) or "s3" (any S3-compatible store, e.g. MinIO)
+    ATTACHMENT_STORAGE_BACKEND: str = "local"
+    ATTACHMENT_LOCAL_DIR: str = "uploads"
+    ATTACHMENT_S3_ENDPOINT_URL: str = "http://localhost:9000"
+    ATTACHMENT_S3_BUCKET: str = "attachments"
+    ATTACHMENT_S3_REGION: str = "us-east-1"
+    ATTACHMENT_S3_ACCESS_KEY_ID: str = ""
+    ATTACHMENT_S3_SECRET_ACCESS_KEY: str = ""
+    # Downloads redirect to presigned URLs valid this long (backends that support it)
+    ATTACHMENT_DOWNLOAD_REDIRECT: bool = True
+    ATTACHMENT_PRESIGN_EXPIRES_SECONDS: int = 300
+    # Worker processes rendering image thumbnails/previews (0 = one per CPU)
+    ATTACHMENT_DERIVATIVE_WORKERS: int = 2
+    # Render derivatives of new images right after upload instead of on first request
+    ATTACHMENT_DERIVATIVES_ON_UPLOAD: bool = True
+    
+    # Notifications
+    # Comment line sent on idle /notifications/stream connections (keeps proxies from closing them)
+    NOTIFICATION_STREAM_KEEPALIVE_SECONDS: int = 15
+    # Events buffered per stream; a client that falls further behind is told to resync
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+    # Broadcasts up to this many recipients are sent within the request; larger ones become jobs
+    NOTIFICATION_BROADCAST_INLINE_LIMIT: int = 1000
+    # Recipients per INSERT ... SELECT (and per commit in background jobs)
+    NOTIFICATION_BROADCAST_CHUNK_SIZE: int = 1000
+    # Read notifications older than this many days are moved to notifications_archive
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    # Unread ones are archived after this many days; queries skip partitions older than this
+    NOTIFICATION_UNREAD_RETENTION_DAYS: int = 365
+    # Monthly notification partitions created ahead of time by the retention job
+    NOTIFICATION_PARTITION_MONTHS_AHEAD: int = 3
+    # Notifications archived per transaction by the retention job
+    NOTIFICATION_ARCHIVE_BATCH_SIZE: int = 5000
+    # In-process cache of unread badge counts; other workers' writes show up within the TTL
+    UNREAD_COUNT_CACHE_MAX_ENTRIES: int = 10000
+    UNREAD_COUNT_CACHE_TTL_SECONDS: int = 5
     
     # CORS
     CORS_ORIGINS: List[str] = [
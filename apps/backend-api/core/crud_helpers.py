@@ -7,12 +7,20 @@ Replaces repeated patterns for:
 - Access control checks
 - Common CRUD operations
 """
-from typing import Optional, Type, TypeVar, Generic, List
+import asyncio
+import base64
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Type, TypeVar, Generic, List, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import Table, select, delete, func, literal, text, tuple_
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
-from fastapi import HTTPException, status, Query
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from fastapi import HTTPException, Response, status, Query
 from core.auth_v2 import get_user_roles, RoleEnum
 from db.models_v2 import User, Organization
 
@@ -218,11 +226,39 @@ async def update_entity_fields(
         setattr(entity, field, value)
 
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, entity_id: UUID) -> str:
+    """Opaque cursor for the (created_at, id) position of a row"""
+    payload = json.dumps([created_at.isoformat(), str(entity_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, entity_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(entity_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
 def apply_pagination(
     query,
     page: int = 1,
     limit: int = 50,
-    order_by=None
+    order_by=None,
+    cursor: Optional[str] = None,
 ):
     """
     Apply pagination to a query.
@@ -231,18 +267,169 @@ def apply_pagination(
         offset = (page - 1) * limit
         query = query.order_by(Model.created_at.desc()).offset(offset).limit(limit)
     
+    Two modes:
+    - Offset (default): ``page``/``limit``; cost grows with the page depth.
+    - Cursor: pass the ``X-Next-Cursor`` value of the previous page (see
+      set_next_cursor). ``page`` is ignored and the query seeks straight past the
+      cursor row on (created_at, id), so every page costs the same.
+    
+    When ``order_by`` is a column ordering (e.g. ``Model.created_at.desc()``),
+    the model's ``id`` is added as a tie-breaker so both modes are deterministic.
+    
     Args:
         query: SQLAlchemy select query
-        page: Page number (1-indexed)
+        page: Page number (1-indexed), offset mode only
         limit: Items per page
         order_by: Order by clause (e.g., Model.created_at.desc())
+        cursor: Opaque cursor from the previous page (enables cursor mode)
     
     Returns:
         Modified query with pagination applied
     """
+    if order_by is None:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not supported for this listing"
+            )
+        return query.offset((page - 1) * limit).limit(limit)
+    
+    column = order_by.element
+    id_column = column.table.c.id
+    descending = order_by.modifier is operators.desc_op
+    query = query.order_by(order_by, id_column.desc() if descending else id_column.asc())
+    
+    if cursor:
+        created_at, entity_id = decode_cursor(cursor)
+        position = tuple_(column, id_column)
+        boundary = tuple_(literal(created_at, column.type), literal(entity_id, id_column.type))
+        query = query.where(position < boundary if descending else position > boundary)
+        return query.limit(limit)
+    
     offset = (page - 1) * limit
-    if order_by is not None:
-        query = query.order_by(order_by)
     query = query.offset(offset).limit(limit)
     return query
 
+
+def set_next_cursor(response: Response, items: List, limit: int) -> List:
+    """
+    Expose the cursor of the page following ``items`` as the ``X-Next-Cursor``
+    response header (only when the page is full, i.e. more rows may follow).
+    
+    Returns ``items`` unchanged so list endpoints keep their response body.
+    """
+    if items and len(items) >= limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return items
+
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_MODE_HEADER = "X-Total-Count-Mode"
+
+# Estimates below this many rows are replaced by an exact count (cheap at that size,
+# and planner estimates are least reliable for small results)
+EXACT_COUNT_BELOW = 1000
+
+
+class TotalCountMode(str, Enum):
+    """How list endpoints compute X-Total-Count (``include_total`` query parameter)"""
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, keeping the statement's bound parameters"""
+    inherit_cache = False
+    
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _exact_count(db: AsyncSession, query) -> int:
+    """COUNT(*) over the unpaginated query on a separate session (runs alongside the page query)"""
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    async with AsyncSession(db.bind) as count_session:
+        result = await count_session.execute(count_query)
+        return result.scalar() or 0
+
+
+async def _estimated_count(db: AsyncSession, query) -> Optional[int]:
+    """
+    Planner estimate for the query's row count: pg_class.reltuples for an
+    unfiltered single-table scan, otherwise the EXPLAIN row estimate.
+    Returns None when no estimate is available (e.g. never analyzed).
+    """
+    froms = query.get_final_froms()
+    async with AsyncSession(db.bind) as count_session:
+        if query.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+            result = await count_session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+                {"table_name": froms[0].name},
+            )
+            estimate = result.scalar()
+        else:
+            result = await count_session.execute(_Explain(query.order_by(None)))
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]["Plan"]["Plan Rows"]
+    # reltuples is -1 for tables that have never been vacuumed/analyzed
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+async def count_total(
+    db: AsyncSession,
+    query,
+    mode: Optional[TotalCountMode],
+) -> Optional[Tuple[int, TotalCountMode]]:
+    """
+    Total row count for the (unpaginated) list query.
+    
+    Returns (total, mode actually used) or None when no total was requested.
+    Estimated mode falls back to an exact count for small or unknown estimates.
+    """
+    if mode is None:
+        return None
+    if mode == TotalCountMode.ESTIMATED:
+        estimate = await _estimated_count(db, query)
+        if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+            return estimate, TotalCountMode.ESTIMATED
+    return await _exact_count(db, query), TotalCountMode.EXACT
+
+
+async def execute_page(
+    db: AsyncSession,
+    query,
+    response: Response,
+    count_query=None,
+    include_total: Optional[TotalCountMode] = None,
+):
+    """
+    Execute a paginated list query and, when ``include_total`` is set, count
+    ``count_query`` (the same query before apply_pagination) concurrently.
+    
+    The total is exposed via the ``X-Total-Count`` and ``X-Total-Count-Mode``
+    headers so list response bodies stay plain arrays.
+    
+    Returns:
+        The page query result
+    """
+    if include_total is None or count_query is None:
+        return await db.execute(query)
+    
+    result, total = await asyncio.gather(
+        db.execute(query),
+        count_total(db, count_query, include_total),
+    )
+    count, mode = total
+    response.headers[TOTAL_COUNT_HEADER] = str(count)
+    response.headers[TOTAL_COUNT_MODE_HEADER] = mode.value
+    return result
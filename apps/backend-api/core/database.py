@@ -2,33 +2,111 @@
 Database configuration and session management
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import time
+from typing import Any, Dict
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from core.config import settings
+from core.metrics import Histogram
+
+
+def normalize_database_url(url: str) -> str:
+    """Ensure the URL uses the asyncpg driver and drop the schema parameter (asyncpg doesn't support it)"""
+    if not url.startswith("postgresql+asyncpg://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://")
+    # Remove schema parameter if present (asyncpg doesn't support it)
+    if "?schema=" in url:
+        url = url.split("?schema=")[0]
+    return url
+
 
 # Create async engine
-# Ensure DATABASE_URL uses asyncpg driver and remove schema parameter (asyncpg doesn't support it)
-db_url = settings.DATABASE_URL
-if not db_url.startswith("postgresql+asyncpg://"):
-    db_url = db_url.replace("postgresql://", "postgresql+asyncpg://")
-# Remove schema parameter if present (asyncpg doesn't support it)
-if "?schema=" in db_url:
-    db_url = db_url.split("?schema=")[0]
-
-engine = create_async_engine(
-    db_url,
-    echo=False,  # Set to True for SQL logging
-    future=True,
-)
+db_url = normalize_database_url(settings.DATABASE_URL)
+
+# Connection checkout wait (seconds), keyed by pool logging name
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+pool_wait_histograms: Dict[str, Histogram] = {}
+pool_timeouts: Dict[str, int] = {}
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long each checkout waited
+    (queue wait + new connection + pre-ping) and how many timed out.
+    """
+    
+    def connect(self):
+        name = self._orig_logging_name or "primary"
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_timeouts[name] = pool_timeouts.get(name, 0) + 1
+            raise
+        finally:
+            histogram = pool_wait_histograms.get(name)
+            if histogram is not None:
+                histogram.observe(time.perf_counter() - start)
+
+
+def create_pooled_engine(url: str, pool_name: str) -> AsyncEngine:
+    """Create an async engine with the configured pool settings and instrumentation"""
+    pool_wait_histograms.setdefault(pool_name, Histogram(f"{pool_name}_pool_wait_seconds", POOL_WAIT_BUCKETS))
+    return create_async_engine(
+        url,
+        echo=False,  # Set to True for SQL logging
+        future=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # asyncpg's own statement cache and SQLAlchemy's prepared statement cache
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Live pool gauges for metrics/dashboards"""
+    pool = engine.sync_engine.pool
+    name = pool._orig_logging_name or "primary"
+    histogram = pool_wait_histograms.get(name)
+    return {
+        "name": name,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Negative while the pool has not yet opened pool_size connections
+        "overflow": pool.overflow(),
+        "timeouts": pool_timeouts.get(name, 0),
+        "wait_seconds": histogram.stats() if histogram else None,
+    }
+
+
+engine = create_pooled_engine(db_url, "primary")
+
+
+def create_session_factory(bind: AsyncEngine) -> async_sessionmaker:
+    """Session factory with the application's session options"""
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
 
 # Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+AsyncSessionLocal = create_session_factory(engine)
 
 # Base class for models
 Base = declarative_base()
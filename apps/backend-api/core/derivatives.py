@@ -0,0 +1,217 @@
+"""
+Image attachment derivatives (thumbnails and previews)
+
+Galleries request ``/attachments/{id}/download?variant=thumbnail`` instead of
+the full-resolution original. A derivative depends only on the original's
+content, so it is stored next to the content-addressed blob under the same
+key scheme (``blobs/ab/cd/{sha256}.thumbnail.jpg``), shared by every
+attachment with that content and removed together with the blob.
+
+Decoding and resizing are CPU-bound and hold the GIL, so they run in a
+process pool; the event loop only moves files to and from storage:
+
+    key = await ensure_derivative(attachment_storage, attachment.storage_key, AttachmentVariant.THUMBNAIL)
+
+Derivatives are rendered right after upload (ATTACHMENT_DERIVATIVES_ON_UPLOAD)
+or on first request, and concurrent requests for the same derivative share
+one render.
+"""
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from core.storage import StorageBackend, StorageError
+
+DERIVATIVE_MIME_TYPE = "image/jpeg"
+
+# Formats Pillow decodes without extra plugins
+DERIVABLE_MIME_TYPES = frozenset({
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "image/gif",
+    "image/bmp",
+    "image/tiff",
+})
+
+
+class AttachmentVariant(str, Enum):
+    """Rendition served by the download endpoint (``variant`` query parameter)"""
+    ORIGINAL = "original"
+    THUMBNAIL = "thumbnail"
+    PREVIEW = "preview"
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """Longest edge (pixels) and JPEG quality of a derivative"""
+    max_size: int
+    quality: int
+
+
+VARIANT_SPECS: Dict[AttachmentVariant, VariantSpec] = {
+    AttachmentVariant.THUMBNAIL: VariantSpec(max_size=320, quality=75),
+    AttachmentVariant.PREVIEW: VariantSpec(max_size=1600, quality=82),
+}
+
+
+class DerivativeError(Exception):
+    """The original could not be decoded as an image"""
+
+
+def is_derivable(mime_type: Optional[str]) -> bool:
+    return (mime_type or "").lower() in DERIVABLE_MIME_TYPES
+
+
+def derivative_storage_key(storage_key: str, variant: AttachmentVariant) -> str:
+    return f"{storage_key}.{variant.value}.jpg"
+
+
+def derivative_storage_keys(storage_key: str) -> List[str]:
+    """Keys of every derivative a blob may have (for cleanup)"""
+    return [derivative_storage_key(storage_key, variant) for variant in VARIANT_SPECS]
+
+
+def render_derivative(source: str, destination: str, max_size: int, quality: int) -> None:
+    """
+    Write a JPEG of ``source`` scaled to fit ``max_size`` x ``max_size``.
+
+    Runs in a worker process. EXIF orientation is applied (phone photos are
+    usually stored rotated) and transparency is flattened onto white.
+    """
+    try:
+        with Image.open(source) as image:
+            # JPEG decoders can downscale while decoding, which is far cheaper
+            image.draft("RGB", (max_size, max_size))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+                rgba = image.convert("RGBA")
+                image = Image.new("RGB", rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            elif image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(destination, "JPEG", quality=quality, optimize=True, progressive=True)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise DerivativeError(f"Cannot render image: {e}") from None
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and thread pools is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.ATTACHMENT_DERIVATIVE_WORKERS or None,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_derivative_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _temp_path(directory: Path, suffix: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=directory, suffix=suffix)
+    os.close(fd)
+    return Path(name)
+
+
+async def _download(storage: StorageBackend, key: str) -> Path:
+    """Copy an object to a temporary file (for backends without local paths)"""
+    path = await run_in_threadpool(_temp_path, storage.staging_dir, ".src")
+    buffer = await run_in_threadpool(open, path, "wb")
+    try:
+        async for chunk in storage.stream(key):
+            await run_in_threadpool(buffer.write, chunk)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(path.unlink, True)
+        raise
+    await run_in_threadpool(buffer.close)
+    return path
+
+
+async def _generate(storage: StorageBackend, storage_key: str, key: str, spec: VariantSpec) -> Optional[str]:
+    if not await storage.exists(storage_key):
+        return None
+
+    source = storage.local_path(storage_key)
+    downloaded = None
+    if source is None:
+        source = downloaded = await _download(storage, storage_key)
+    destination = await run_in_threadpool(_temp_path, storage.staging_dir, ".jpg")
+    try:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            _get_pool(), render_derivative, str(source), str(destination), spec.max_size, spec.quality,
+        )
+        await storage.put_file(key, destination, DERIVATIVE_MIME_TYPE)
+    finally:
+        await run_in_threadpool(destination.unlink, True)
+        if downloaded is not None:
+            await run_in_threadpool(downloaded.unlink, True)
+    return key
+
+
+# Renders in progress in this worker, by derivative key
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+async def ensure_derivative(
+    storage: StorageBackend,
+    storage_key: str,
+    variant: AttachmentVariant,
+) -> Optional[str]:
+    """
+    Storage key of the derivative, rendering and storing it first if needed.
+    Returns None when the original is missing; raises DerivativeError when it
+    is not a decodable image.
+    """
+    key = derivative_storage_key(storage_key, variant)
+    if await storage.exists(key):
+        return key
+
+    render = _in_flight.get(key)
+    if render is None:
+        render = asyncio.ensure_future(_generate(storage, storage_key, key, VARIANT_SPECS[variant]))
+        _in_flight[key] = render
+        render.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # A client disconnecting must not cancel a render other requests wait for
+    return await asyncio.shield(render)
+
+
+# Strong references to upload-time renders (the loop only keeps weak ones)
+_background: Set[asyncio.Task] = set()
+
+
+async def _render_all(storage: StorageBackend, storage_key: str) -> None:
+    for variant in VARIANT_SPECS:
+        try:
+            await ensure_derivative(storage, storage_key, variant)
+        except (DerivativeError, StorageError, OSError):
+            return  # rendered (or reported) again on first request
+
+
+def schedule_derivatives(storage: StorageBackend, storage_key: str, mime_type: Optional[str]) -> None:
+    """Render every derivative of a newly stored image in the background"""
+    if not settings.ATTACHMENT_DERIVATIVES_ON_UPLOAD or not is_derivable(mime_type):
+        return
+    task = asyncio.get_running_loop().create_task(_render_all(storage, storage_key))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
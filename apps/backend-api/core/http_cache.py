@@ -0,0 +1,110 @@
+"""
+HTTP validators and byte ranges for file downloads
+
+Attachments are immutable (content-addressed), so their validators come
+straight from the database row: a strong ETag from the SHA-256 (or size and
+creation time for rows uploaded before hashing) and Last-Modified from
+created_at. Conditional requests are answered with 304 before any storage
+access, and ``Range`` requests are served as 206 from the storage backend.
+"""
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+from fastapi import HTTPException, status
+
+
+def strong_etag(validator: str) -> str:
+    return f'"{validator}"'
+
+
+def http_date(value: datetime.datetime) -> str:
+    """IMF-fixdate (``Tue, 15 Nov 1994 08:12:31 GMT``)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return format_datetime(value.astimezone(datetime.timezone.utc), usegmt=True)
+
+
+def _parse_http_date(value: str) -> Optional[datetime.datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak: ``W/`` prefixes are ignored)"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: datetime.datetime) -> bool:
+    """
+    Whether a GET can be answered with 304 (RFC 9110 section 13.2.2:
+    If-None-Match wins; If-Modified-Since is only consulted without it).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        since = _parse_http_date(if_modified_since)
+        if since is not None:
+            return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _if_range_allows(headers: Mapping[str, str], etag: str, last_modified: datetime.datetime) -> bool:
+    """If-Range: serve the range only if the representation is unchanged (strong comparison)"""
+    if_range = headers.get("if-range")
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    since = _parse_http_date(if_range)
+    return since is not None and last_modified.replace(microsecond=0) == since
+
+
+def requested_range(
+    headers: Mapping[str, str],
+    size: int,
+    etag: str,
+    last_modified: datetime.datetime,
+) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive ``(start, end)`` for a single-range ``Range: bytes=...`` request,
+    or None to send the whole file (no/ignored Range, multiple ranges, or a
+    failed If-Range). Raises 416 when the range cannot be satisfied.
+    """
+    header = headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    if not _if_range_allows(headers, etag, last_modified):
+        return None
+
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start > end and first and last:
+        return None  # syntactically invalid; ignored per RFC 9110
+
+    if start >= size or size == 0 or end < start:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
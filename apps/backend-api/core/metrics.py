@@ -0,0 +1,58 @@
+"""
+In-process metrics primitives
+
+Values are per worker process and exported through /api/v2/health/metrics.
+"""
+import bisect
+import threading
+from typing import Any, Dict, Sequence
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (cumulative bucket counts, Prometheus style).
+
+    Usage:
+        wait = Histogram("db_pool_wait_seconds", buckets=(0.001, 0.01, 0.1, 1))
+        wait.observe(0.004)
+        wait.stats()
+    """
+
+    def __init__(self, name: str, buckets: Sequence[float]):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def stats(self) -> Dict[str, Any]:
+        """Cumulative bucket counts plus count/sum/max"""
+        with self._lock:
+            counts = list(self._counts)
+            count, total, maximum = self.count, self.sum, self.max
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative[f"le_{bound:g}"] = running
+        cumulative["le_inf"] = running + counts[-1]
+        return {
+            "name": self.name,
+            "count": count,
+            "sum": round(total, 6),
+            "max": round(maximum, 6),
+            "avg": round(total / count, 6) if count else 0.0,
+            "buckets": cumulative,
+        }
@@ -0,0 +1,227 @@
+"""
+Notification broadcasts
+
+Sends one notification to every user of an audience (organization, property,
+roles, explicit users) without a request per recipient. Recipients are
+resolved in SQL and each chunk is a single ``INSERT ... SELECT``, followed by
+one counter upsert and one NOTIFY statement for the whole chunk:
+
+    sent = await send_broadcast_chunk(db, broadcast, after_user_id=None, limit=1000)
+
+Audiences up to NOTIFICATION_BROADCAST_INLINE_LIMIT are sent within the
+request. Larger ones become a NotificationJob, processed in the background in
+user id order with one commit per chunk, so progress survives a failed chunk
+and the job can be polled. Each worker resumes unfinished jobs on startup
+(resume_notification_jobs), continuing after the job's last_user_id; a job
+locked by another worker is retried until that worker finishes or dies.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+from uuid import UUID
+from sqlalchemy import Text, exists, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.access_scope import SCOPE_PROPERTY
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.notification_hub import publish_events
+from core.unread_counts import adjust_unread_counts, invalidate_unread_counts
+from db.models_v2 import Notification, NotificationJob, Role, User, UserAccessScope, UserRole
+from schemas.notification import NotificationAudience, NotificationBroadcast
+
+
+def recipients_query(audience: NotificationAudience):
+    """Ids of the audience's users (suspended users excluded)"""
+    query = select(User.id).where(
+        User.organization_id == audience.organization_id,
+        User.status != "suspended",
+    )
+    if audience.property_id:
+        query = query.where(exists().where(
+            UserAccessScope.user_id == User.id,
+            UserAccessScope.resource_type == SCOPE_PROPERTY,
+            UserAccessScope.resource_id == audience.property_id,
+        ))
+    if audience.roles:
+        query = query.where(exists().where(
+            UserRole.user_id == User.id,
+            UserRole.role_id == Role.id,
+            Role.name.in_(audience.roles),
+        ))
+    if audience.user_ids is not None:
+        query = query.where(User.id.in_(audience.user_ids))
+    return query
+
+
+async def count_recipients(db: AsyncSession, audience: NotificationAudience) -> int:
+    result = await db.execute(select(func.count()).select_from(recipients_query(audience).subquery()))
+    return result.scalar() or 0
+
+
+async def send_broadcast_chunk(
+    db: AsyncSession,
+    broadcast: NotificationBroadcast,
+    after_user_id: Optional[UUID],
+    limit: int,
+) -> List[UUID]:
+    """
+    Notify the next ``limit`` recipients with ids above ``after_user_id``.
+    Returns their ids in ascending order (fewer than ``limit`` means done).
+    """
+    recipients = recipients_query(broadcast.audience)
+    if after_user_id is not None:
+        recipients = recipients.where(User.id > after_user_id)
+    recipients = recipients.order_by(User.id).limit(limit).subquery()
+
+    result = await db.execute(
+        insert(Notification)
+        .from_select(
+            ["user_id", "organization_id", "entity_type", "entity_id", "type"],
+            select(
+                recipients.c.id,
+                literal(broadcast.audience.organization_id, PG_UUID(as_uuid=True)),
+                literal(broadcast.entity_type, Text),
+                literal(broadcast.entity_id, PG_UUID(as_uuid=True)),
+                literal(broadcast.type, Text),
+            ),
+            # ids come from gen_random_uuid(); a Python default would be one value for all rows
+            include_defaults=False,
+        )
+        .returning(Notification.id, Notification.user_id, Notification.created_at)
+    )
+    rows = result.all()
+    user_ids = sorted(row.user_id for row in rows)
+
+    await adjust_unread_counts(db, user_ids, notifications=1)
+    await publish_events(db, [
+        (row.user_id, "notification", {
+            "id": row.id,
+            "user_id": row.user_id,
+            "organization_id": broadcast.audience.organization_id,
+            "entity_type": broadcast.entity_type,
+            "entity_id": broadcast.entity_id,
+            "type": broadcast.type,
+            "is_read": False,
+            "created_at": row.created_at.isoformat(),
+            "read_at": None,
+        })
+        for row in rows
+    ])
+    return user_ids
+
+
+async def send_broadcast(db: AsyncSession, broadcast: NotificationBroadcast) -> List[UUID]:
+    """Notify the whole audience in the caller's transaction (small audiences)"""
+    chunk_size = settings.NOTIFICATION_BROADCAST_CHUNK_SIZE
+    sent: List[UUID] = []
+    after_user_id = None
+    while True:
+        user_ids = await send_broadcast_chunk(db, broadcast, after_user_id, chunk_size)
+        sent.extend(user_ids)
+        if len(user_ids) < chunk_size:
+            return sent
+        after_user_id = user_ids[-1]
+
+
+def _job_broadcast(job: NotificationJob) -> NotificationBroadcast:
+    return NotificationBroadcast(
+        audience=NotificationAudience.model_validate(job.audience),
+        entity_type=job.entity_type,
+        entity_id=job.entity_id,
+        type=job.type,
+    )
+
+
+UNFINISHED_JOB_STATUSES = ("queued", "running")
+
+# _run_job_chunk() outcomes
+CHUNK_SENT = "sent"
+JOB_LOCKED = "locked"
+JOB_DONE = "done"
+
+# Seconds before retrying a job another session is processing
+JOB_LOCK_RETRY_SECONDS = 5
+
+
+async def _run_job_chunk(job_id: UUID) -> str:
+    """Process the next chunk of a job in its own transaction"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(NotificationJob).where(NotificationJob.id == job_id).with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            # Either gone, or locked by another worker processing a chunk of it
+            result = await db.execute(select(NotificationJob.status).where(NotificationJob.id == job_id))
+            return JOB_LOCKED if result.scalar_one_or_none() in UNFINISHED_JOB_STATUSES else JOB_DONE
+        if job.status not in UNFINISHED_JOB_STATUSES:
+            return JOB_DONE
+
+        chunk_size = settings.NOTIFICATION_BROADCAST_CHUNK_SIZE
+        user_ids = await send_broadcast_chunk(db, _job_broadcast(job), job.last_user_id, chunk_size)
+        job.status = "running"
+        job.sent_count += len(user_ids)
+        if user_ids:
+            job.last_user_id = user_ids[-1]
+        if len(user_ids) < chunk_size:
+            job.status = "completed"
+            job.completed_at = datetime.now(timezone.utc)
+        await db.commit()
+        invalidate_unread_counts(user_ids)
+        return CHUNK_SENT if job.status == "running" else JOB_DONE
+
+
+async def _fail_job(job_id: UUID, error: Exception) -> None:
+    async with AsyncSessionLocal() as db:
+        job = await db.get(NotificationJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            job.error = str(error)[:1000]
+            job.completed_at = datetime.now(timezone.utc)
+            await db.commit()
+
+
+async def run_notification_job(job_id: UUID) -> None:
+    """Process a job until it is finished (safe to run for the same job in several workers)"""
+    try:
+        while True:
+            outcome = await _run_job_chunk(job_id)
+            if outcome == JOB_DONE:
+                return
+            # Let request handlers run between chunks; back off while another worker holds the job
+            await asyncio.sleep(JOB_LOCK_RETRY_SECONDS if outcome == JOB_LOCKED else 0)
+    except Exception as e:
+        await _fail_job(job_id, e)
+
+
+# Strong references to running jobs (the loop only keeps weak ones)
+_running_jobs: Set[asyncio.Task] = set()
+
+
+def schedule_notification_job(job_id: UUID) -> None:
+    """Run the job in the background of this worker (call after committing it)"""
+    task = asyncio.get_running_loop().create_task(run_notification_job(job_id))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+
+
+async def unfinished_job_ids() -> List[UUID]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(NotificationJob.id)
+            .where(NotificationJob.status.in_(UNFINISHED_JOB_STATUSES))
+            .order_by(NotificationJob.created_at)
+        )
+        return list(result.scalars().all())
+
+
+async def resume_notification_jobs() -> List[UUID]:
+    """
+    Schedule the jobs a restart or deploy left queued or running; they continue
+    after their last_user_id. Called on worker startup.
+    """
+    job_ids = await unfinished_job_ids()
+    for job_id in job_ids:
+        schedule_notification_job(job_id)
+    return job_ids
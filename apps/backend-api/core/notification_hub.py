@@ -0,0 +1,181 @@
+"""
+Real-time notification fan-out
+
+Connected clients hold a ``GET /notifications/stream`` (Server-Sent Events)
+connection instead of polling. Each worker keeps one in-process hub of
+per-user queues; events cross workers through Postgres LISTEN/NOTIFY:
+
+    writer (any worker)                      every worker
+    ------------------                       ------------
+    db.add(notification)
+    await publish_event(db, user_id, ...)    LISTEN pinaka_notifications
+    await db.commit()  --- NOTIFY ------->   notification_hub.deliver(...)
+                                               -> queues of that user's streams
+
+NOTIFY is transactional, so an event is delivered only if the write commits,
+and in commit order. The LISTEN connection is opened on the first stream of a
+worker (not taken from the pool) and reconnects on failure.
+"""
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+from uuid import UUID
+import asyncpg
+from sqlalchemy import Text, column, func, select, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.database import db_url
+
+NOTIFY_CHANNEL = "pinaka_notifications"
+
+# Sent instead of events a slow client missed; it should refetch the list
+RESYNC_EVENT = {"event": "resync", "data": {}}
+
+# Seconds between LISTEN reconnect attempts
+RECONNECT_DELAY_SECONDS = 2
+
+LISTEN_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+def _notify_payload(user_id: UUID, event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"user_id": str(user_id), "event": event, "data": data}, default=str)
+
+
+async def publish_event(db: AsyncSession, user_id: UUID, event: str, data: Dict[str, Any]) -> None:
+    """
+    Queue an event for the user's streams; sent when the transaction commits.
+    ``data`` must be JSON-serializable and small (NOTIFY payloads are limited
+    to 8000 bytes).
+    """
+    await db.execute(select(func.pg_notify(NOTIFY_CHANNEL, _notify_payload(user_id, event, data))))
+
+
+async def publish_events(db: AsyncSession, events: Sequence[Tuple[UUID, str, Dict[str, Any]]]) -> None:
+    """publish_event() for many ``(user_id, event, data)`` in one statement"""
+    if not events:
+        return
+    payloads = values(column("payload", Text), name="events").data(
+        [(_notify_payload(user_id, event, data),) for user_id, event, data in events]
+    )
+    await db.execute(select(func.pg_notify(NOTIFY_CHANNEL, payloads.c.payload)))
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class NotificationHub:
+    """Per-worker registry of open streams, keyed by user id"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[UUID, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+        self._connection: Optional[asyncpg.Connection] = None
+        self.delivered = 0
+        self.resyncs = 0
+        self.listen_failures = 0
+
+    def subscribe(self, user_id: UUID) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        self._ensure_listener()
+        return queue
+
+    def unsubscribe(self, user_id: UUID, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def deliver(self, user_id: UUID, message: Dict[str, Any]) -> None:
+        """Hand an event to every stream of the user in this worker (never blocks)"""
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # The client is not keeping up: drop its backlog, ask it to refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+                self.resyncs += 1
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            user_id = UUID(message.pop("user_id"))
+        except (ValueError, KeyError, TypeError):
+            return
+        self.deliver(user_id, message)
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Hold a LISTEN connection for as long as this worker has streams"""
+        dsn = db_url.replace("postgresql+asyncpg://", "postgresql://")
+        missed_events = False
+        while True:
+            try:
+                self._connection = await asyncpg.connect(dsn)
+                await self._connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                if missed_events:
+                    # Events sent while the connection was down were lost
+                    for user_id in list(self._subscribers):
+                        self.deliver(user_id, RESYNC_EVENT)
+                    missed_events = False
+                while self._subscribers and not self._connection.is_closed():
+                    await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                missed_events = True
+            except LISTEN_ERRORS:
+                missed_events = True
+                self.listen_failures += 1
+            finally:
+                await self._close_connection()
+            # No await between this check and returning, so a new stream either
+            # keeps this task alive or sees it done and starts another one
+            if not self._subscribers:
+                return
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _close_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=RECONNECT_DELAY_SECONDS)
+            except LISTEN_ERRORS:
+                connection.terminate()
+
+    async def close(self) -> None:
+        self._subscribers.clear()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._close_connection()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._subscribers),
+            "streams": sum(len(queues) for queues in self._subscribers.values()),
+            "listening": self._connection is not None and not self._connection.is_closed(),
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+            "listen_failures": self.listen_failures,
+        }
+
+
+notification_hub = NotificationHub(settings.NOTIFICATION_STREAM_QUEUE_SIZE)
@@ -0,0 +1,201 @@
+"""
+Notification partitions and retention
+
+``notifications`` is partitioned by month on created_at (migration 017):
+``notifications_2025_01`` holds January 2025 (UTC), and ``notifications_default``
+catches rows no monthly partition covers. The retention job, run daily
+(``scripts/notification_retention.py``):
+
+1. creates the partitions for the next NOTIFICATION_PARTITION_MONTHS_AHEAD months,
+2. moves read notifications older than NOTIFICATION_RETENTION_DAYS, and any older
+   than NOTIFICATION_UNREAD_RETENTION_DAYS, to ``notifications_archive`` in
+   batches (unread badge counts are adjusted),
+3. detaches and drops monthly partitions left empty.
+
+Queries on notifications filter on ``created_at >= live_window_start()``. No
+live row is older than that, and the filter lets Postgres skip the older
+partitions.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import and_, delete, func, insert, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.database import AsyncSessionLocal
+from core.unread_counts import adjust_unread_counts
+from db.models_v2 import Notification, NotificationArchive
+
+DEFAULT_PARTITION = "notifications_default"
+
+_PARTITION_NAME = re.compile(r"^notifications_(\d{4})_(\d{2})$")
+
+ARCHIVED_COLUMNS = [
+    "id", "user_id", "organization_id", "entity_type", "entity_id", "type", "is_read", "created_at", "read_at",
+]
+
+
+def month_start(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime) -> str:
+    return f"notifications_{month:%Y_%m}"
+
+
+def live_window_start(now: Optional[datetime] = None) -> datetime:
+    """Oldest created_at a live (not archived) notification can have"""
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=settings.NOTIFICATION_UNREAD_RETENTION_DAYS)
+
+
+def retention_cutoffs(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """``(read_cutoff, unread_cutoff)``: notifications created before these are archived"""
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS), live_window_start(now)
+
+
+async def list_partitions(db: AsyncSession) -> Dict[datetime, str]:
+    """Monthly partitions of notifications by month start"""
+    result = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'notifications'::regclass"
+    ))
+    partitions = {}
+    for name in result.scalars():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            partitions[datetime(year, month, 1, tzinfo=timezone.utc)] = name
+    return partitions
+
+
+async def ensure_partitions(db: AsyncSession, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create the monthly partitions from the current month up to
+    NOTIFICATION_PARTITION_MONTHS_AHEAD ahead. Rows of a new month that already
+    landed in the default partition are moved into it before it is attached.
+    The default partition stays locked from the move until the caller commits:
+    a row inserted in between would land there and make the ATTACH fail.
+    """
+    current = month_start(now or datetime.now(timezone.utc))
+    existing = await list_partitions(db)
+    created = []
+    for offset in range(settings.NOTIFICATION_PARTITION_MONTHS_AHEAD + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        await db.execute(text(f"CREATE TABLE {name} (LIKE notifications INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        # ATTACH takes ACCESS EXCLUSIVE on the default partition anyway; taking
+        # it before the move closes the gap (a weaker lock would need an upgrade)
+        await db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE"))
+        await db.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= '{start}' AND created_at < '{end}' RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await db.execute(text(
+            f"ALTER TABLE notifications ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        created.append(name)
+    return created
+
+
+def archive_statement(read_cutoff: datetime, unread_cutoff: datetime, limit: int):
+    """
+    Move up to ``limit`` expired notifications to notifications_archive in one
+    statement; yields ``(user_id, unread, total)`` per affected user
+    """
+    expired = (
+        select(Notification.id, Notification.created_at)
+        .where(or_(
+            and_(Notification.is_read == True, Notification.created_at < read_cutoff),
+            Notification.created_at < unread_cutoff,
+        ))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(Notification)
+        .where(tuple_(Notification.id, Notification.created_at).in_(expired))
+        .returning(*(Notification.__table__.c[name] for name in ARCHIVED_COLUMNS))
+        .cte("moved")
+    )
+    archived = (
+        insert(NotificationArchive)
+        .from_select(ARCHIVED_COLUMNS, select(*(moved.c[name] for name in ARCHIVED_COLUMNS)))
+        .cte("archived")
+    )
+    return (
+        select(
+            moved.c.user_id,
+            func.count().filter(moved.c.is_read == False).label("unread"),
+            func.count().label("total"),
+        )
+        .group_by(moved.c.user_id)
+        .add_cte(archived)
+    )
+
+
+async def archive_batch(db: AsyncSession, read_cutoff: datetime, unread_cutoff: datetime, limit: int) -> int:
+    """Archive one batch; returns the number of notifications moved"""
+    result = await db.execute(archive_statement(read_cutoff, unread_cutoff, limit))
+    moved = 0
+    users_by_unread: Dict[int, List[UUID]] = defaultdict(list)
+    for user_id, unread, total in result.all():
+        moved += total
+        if unread:
+            users_by_unread[unread].append(user_id)
+    # Archived unread notifications no longer count towards the badge
+    for unread, user_ids in users_by_unread.items():
+        await adjust_unread_counts(db, user_ids, notifications=-unread)
+    return moved
+
+
+async def drop_expired_partitions(db: AsyncSession, unread_cutoff: datetime) -> List[str]:
+    """Detach and drop monthly partitions that end before the cutoff and are empty"""
+    dropped = []
+    for month, name in sorted((await list_partitions(db)).items()):
+        if add_months(month, 1) > unread_cutoff:
+            continue
+        result = await db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})"))
+        if result.scalar():
+            continue
+        await db.execute(text(f"ALTER TABLE notifications DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+async def run_retention(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """One pass of the retention job; commits after every step and batch"""
+    now = now or datetime.now(timezone.utc)
+    read_cutoff, unread_cutoff = retention_cutoffs(now)
+    batch_size = settings.NOTIFICATION_ARCHIVE_BATCH_SIZE
+
+    async with AsyncSessionLocal() as db:
+        created = await ensure_partitions(db, now)
+        await db.commit()
+
+        archived = 0
+        while True:
+            moved = await archive_batch(db, read_cutoff, unread_cutoff, batch_size)
+            await db.commit()
+            archived += moved
+            if moved < batch_size:
+                break
+
+        dropped = await drop_expired_partitions(db, unread_cutoff)
+        await db.commit()
+
+    return {"created_partitions": created, "archived": archived, "dropped_partitions": dropped}
@@ -3,16 +3,18 @@ Central RBAC (Role-Based Access Control) module for Pinaka v2
 Provides permission checking, role-based access, and organization scoping
 """
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, FrozenSet, Iterable, Set, Tuple
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from core.database import get_db
-from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum
+from core.access_scope import SCOPE_LEASE, SCOPE_PROPERTY, SCOPE_WORK_ORDER, scoped_ids
+from core.auth_v2 import get_current_principal, get_principal, get_user_roles, Principal, RoleEnum
 from db.models_v2 import (
     User, Property, Unit, Landlord, Tenant, Lease, LeaseTenant, Vendor, 
-    WorkOrder, Organization, UserRole, Role
+    WorkOrder, Organization, UserRole, Role, UserAccessScope
 )
 
 
@@ -205,184 +207,288 @@ PERMISSION_MATRIX: Dict[str, Dict[str, List[str]]] = {
 }
 
 
+# ============================================================================
+# COMPILED PERMISSION MATRIX
+# ============================================================================
+
+# PERMISSION_MATRIX is compiled once at import into integer bitmasks: each
+# (resource, action) pair owns one bit, so a permission guard is a single AND.
+_ACTION_INDEX: Dict[PermissionAction, int] = {action: i for i, action in enumerate(PermissionAction)}
+_RESOURCE_INDEX: Dict[ResourceType, int] = {resource: i for i, resource in enumerate(ResourceType)}
+_ALL_ACTIONS: int = (1 << len(_ACTION_INDEX)) - 1
+
+# (resource, action) -> bit
+PERMISSION_BITS: Dict[Tuple[ResourceType, PermissionAction], int] = {
+    (resource, action): 1 << (_RESOURCE_INDEX[resource] * len(_ACTION_INDEX) + _ACTION_INDEX[action])
+    for resource in ResourceType
+    for action in PermissionAction
+}
+
+
+def permission_bit(resource: ResourceType, action: PermissionAction) -> int:
+    """Bit representing ``action`` on ``resource`` in a permission mask"""
+    return PERMISSION_BITS[(resource, action)]
+
+
+def _compile_actions(actions: List[PermissionAction]) -> int:
+    """Action bitmask for one (role, resource) entry; MANAGE implies every action"""
+    if PermissionAction.MANAGE in actions:
+        return _ALL_ACTIONS
+    mask = 0
+    for action in actions:
+        mask |= 1 << _ACTION_INDEX[action]
+    return mask
+
+
+# (role, resource) -> action bitmask
+COMPILED_PERMISSION_MATRIX: Dict[Tuple[str, ResourceType], int] = {
+    (role, ResourceType(resource)): _compile_actions(actions)
+    for role, resources in PERMISSION_MATRIX.items()
+    for resource, actions in resources.items()
+}
+
+# role -> permission mask across all resources
+ROLE_PERMISSION_MASKS: Dict[str, int] = {}
+for (_role, _resource), _actions_mask in COMPILED_PERMISSION_MATRIX.items():
+    ROLE_PERMISSION_MASKS[_role] = ROLE_PERMISSION_MASKS.get(_role, 0) | (
+        _actions_mask << (_RESOURCE_INDEX[_resource] * len(_ACTION_INDEX))
+    )
+
+
+@lru_cache(maxsize=256)
+def _mask_for_roles(roles: FrozenSet[str]) -> int:
+    mask = 0
+    for role in roles:
+        mask |= ROLE_PERMISSION_MASKS.get(role, 0)
+    return mask
+
+
+def effective_permission_mask(roles: Iterable[str]) -> int:
+    """Union of the permission masks of all of a principal's roles"""
+    return _mask_for_roles(frozenset(roles))
+
+
+def principal_permission_mask(principal: Principal) -> int:
+    """Effective permission mask of a principal, computed once per request"""
+    if principal.permission_mask is None:
+        principal.permission_mask = effective_permission_mask(principal.roles)
+    return principal.permission_mask
+
+
+def has_permission(roles: Iterable[str], action: PermissionAction, resource: ResourceType) -> bool:
+    """
+    Matrix-only permission check (no organization or ownership scoping).
+    
+    Equivalent to scanning PERMISSION_MATRIX for every role, but costs a single AND.
+    """
+    return bool(effective_permission_mask(roles) & permission_bit(resource, action))
+
+
 # ============================================================================
 # PERMISSION EVALUATOR
 # ============================================================================
 
-async def check_permission(
+async def _ownership_scoped_ids(
+    role: str,
+    resource: ResourceType,
+    user: User,
+    ids: List[UUID],
+    db: AsyncSession,
+) -> Optional[Set[UUID]]:
+    """
+    Return the subset of ``ids`` that ``role`` can reach through ownership rules,
+    using a single lookup against the precomputed access scope table.
+    
+    Returns None when the role has no ownership rule for the resource type
+    (i.e. organization scoping alone decides).
+    """
+    # Ownership paths are precomputed in user_access_scopes (see core.access_scope)
+    scope_type = None
+    if resource == ResourceType.PROPERTY:
+        if role == RoleEnum.LANDLORD:
+            # Landlord can only access their own properties
+            scope_type = SCOPE_PROPERTY
+        elif role == RoleEnum.TENANT:
+            # Tenant can only access properties they lease
+            scope_type = SCOPE_PROPERTY
+        else:
+            return None
+    
+    elif resource == ResourceType.WORK_ORDER:
+        if role == RoleEnum.VENDOR:
+            # Vendor can only access work orders assigned to them
+            scope_type = SCOPE_WORK_ORDER
+        elif role == RoleEnum.TENANT:
+            # Tenant can only access work orders they created
+            query = select(WorkOrder.id).where(
+                and_(
+                    WorkOrder.id.in_(ids),
+                    WorkOrder.created_by_user_id == user.id
+                )
+            )
+        else:
+            return None
+    
+    elif resource == ResourceType.LEASE and role == RoleEnum.TENANT:
+        # Tenant can only access their own leases
+        scope_type = SCOPE_LEASE
+    
+    else:
+        return None
+    
+    if scope_type is not None:
+        query = scoped_ids(user.id, role, scope_type).where(UserAccessScope.resource_id.in_(ids))
+    
+    result = await db.execute(query)
+    return set(result.scalars().all())
+
+
+async def get_permitted_resource_ids(
     user: User,
     action: PermissionAction,
     resource: ResourceType,
     db: AsyncSession,
+    resource_ids: List[UUID],
     resource_org_id: Optional[UUID] = None,
     resource_owner_id: Optional[UUID] = None,
-    resource_ids: Optional[List[UUID]] = None,
-    resource_id: Optional[UUID] = None,
-) -> bool:
+) -> Set[UUID]:
     """
-    Central permission evaluator function.
+    Return the subset of ``resource_ids`` the user may perform ``action`` on.
+    
+    Ownership scoping (landlord properties, tenant leases, vendor assignments, ...)
+    is evaluated for the whole set with one query per applicable role, so list and
+    bulk endpoints can authorize a full page in a single round trip.
     
     Args:
         user: Current user
         action: Action to check (CREATE, READ, UPDATE, DELETE, MANAGE)
         resource: Type of resource
         db: Database session
-        resource_org_id: Organization ID of the resource (for org scoping)
-        resource_owner_id: Owner ID of the resource (for ownership checks)
-        resource_ids: List of resource IDs to check (for PM assigned properties, etc.)
-        resource_id: Single resource ID to check
+        resource_ids: Resource IDs to check
+        resource_org_id: Organization ID shared by the resources (for org scoping)
+        resource_owner_id: Owner ID of the resource (unused: ownership is always
+                           verified against the access scope table)
     
     Returns:
-        True if user has permission, False otherwise
+        Set of permitted resource IDs
     """
+    requested = set(resource_ids)
+    if not requested:
+        return set()
+    
     # Get user roles
     user_roles = await get_user_roles(user, db)
     
     # SUPER_ADMIN has all permissions
     if RoleEnum.SUPER_ADMIN in user_roles:
-        return True
+        return requested
+    
+    # No role grants this action on this resource (MANAGE implies all actions)
+    required_bit = permission_bit(resource, action)
+    principal = get_principal(user)
+    user_mask = principal_permission_mask(principal) if principal else effective_permission_mask(user_roles)
+    if not user_mask & required_bit:
+        return set()
+    
+    permitted: Set[UUID] = set()
     
     # Check each role the user has
     for role in user_roles:
-        if role not in PERMISSION_MATRIX:
-            continue
-        
-        role_permissions = PERMISSION_MATRIX[role]
-        if resource not in role_permissions:
-            continue
-        
-        allowed_actions = role_permissions[resource]
-        
-        # Check if action is allowed (MANAGE implies all actions)
-        if PermissionAction.MANAGE in allowed_actions:
-            # MANAGE permission means all actions are allowed, but still need to check scoping
-            pass  # Continue to scoping checks
-        elif action not in allowed_actions:
+        if not ROLE_PERMISSION_MASKS.get(role, 0) & required_bit:
             continue  # This role doesn't allow this action, try next role
         
         # Action is allowed for this role, now check scoping rules
         
-        # Organization scoping
-        if resource_org_id is not None:
-            # SUPER_ADMIN already handled above
-            if role == RoleEnum.PMC_ADMIN:
-                # PMC_ADMIN can only access resources in their organization
-                if user.organization_id != resource_org_id:
-                    continue  # Try next role
-            elif role in [RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR]:
-                # These roles must have matching organization
-                if user.organization_id != resource_org_id:
-                    continue  # Try next role
+        # Organization scoping: all non-super roles must match the resource's organization
+        if resource_org_id is not None and user.organization_id != resource_org_id:
+            continue  # Try next role
         
-        # Ownership/resource-specific scoping
-        if resource == ResourceType.PROPERTY:
-            if role == RoleEnum.PM:
-                # PM can only access assigned properties
-                # TODO: Check if property_id is in user's assigned properties
-                # For now, we'll check organization match
-                if resource_org_id and user.organization_id != resource_org_id:
-                    continue
-            elif role == RoleEnum.LANDLORD:
-                # Landlord can only access their own properties
-                if resource_owner_id and resource_owner_id != user.id:
-                    # Check if user is the landlord for this property
-                    if resource_id:
-                        result = await db.execute(
-                            select(Property).where(
-                                and_(
-                                    Property.id == resource_id,
-                                    Property.landlord_id.in_(
-                                        select(Landlord.id).where(Landlord.user_id == user.id)
-                                    )
-                                )
-                            )
-                        )
-                        if not result.scalar_one_or_none():
-                            continue
-            elif role == RoleEnum.TENANT:
-                # Tenant can only access property they lease
-                if resource_id:
-                    # Check if tenant has a lease for this property
-                    # Check if tenant has a lease for this property
-                    from db.models_v2 import LeaseTenant
-                    result = await db.execute(
-                        select(Lease).join(
-                            LeaseTenant, Lease.id == LeaseTenant.lease_id
-                        ).join(
-                            Tenant, LeaseTenant.tenant_id == Tenant.id
-                        ).where(
-                            and_(
-                                Lease.property_id == resource_id,
-                                Tenant.user_id == user.id
-                            )
-                        )
-                    )
-                    if not result.scalar_one_or_none():
-                        continue
-        
-        elif resource == ResourceType.WORK_ORDER:
-            if role == RoleEnum.VENDOR:
-                # Vendor can only access assigned work orders
-                if resource_id:
-                    result = await db.execute(
-                        select(WorkOrder).where(
-                            and_(
-                                WorkOrder.id == resource_id,
-                                or_(
-                                    WorkOrder.assigned_to_vendor_id == user.id,
-                                    WorkOrder.service_provider_id == user.id
-                                )
-                            )
-                        )
-                    )
-                    if not result.scalar_one_or_none():
-                        continue
-            elif role == RoleEnum.TENANT:
-                # Tenant can only access work orders they created
-                if resource_id:
-                    result = await db.execute(
-                        select(WorkOrder).where(
-                            and_(
-                                WorkOrder.id == resource_id,
-                                WorkOrder.created_by_user_id == user.id
-                            )
-                        )
-                    )
-                    if not result.scalar_one_or_none():
-                        continue
-        
-        elif resource == ResourceType.LEASE:
-            if role == RoleEnum.TENANT:
-                # Tenant can only access their own lease
-                if resource_id:
-                    # Check if tenant has this lease
-                    from db.models_v2 import LeaseTenant
-                    result = await db.execute(
-                        select(Lease).join(
-                            LeaseTenant, Lease.id == LeaseTenant.lease_id
-                        ).join(
-                            Tenant, LeaseTenant.tenant_id == Tenant.id
-                        ).where(
-                            and_(
-                                Lease.id == resource_id,
-                                Tenant.user_id == user.id
-                            )
-                        )
-                    )
-                    if not result.scalar_one_or_none():
-                        continue
+        # Ownership/resource-specific scoping, only for ids not already permitted
+        remaining = requested - permitted
+        scoped = await _ownership_scoped_ids(
+            role, resource, user, list(remaining), db
+        )
+        permitted |= remaining if scoped is None else scoped
         
-        # If we get here, permission is granted for this role
+        if permitted == requested:
+            break
+    
+    return permitted
+
+
+async def check_permission(
+    user: User,
+    action: PermissionAction,
+    resource: ResourceType,
+    db: AsyncSession,
+    resource_org_id: Optional[UUID] = None,
+    resource_owner_id: Optional[UUID] = None,
+    resource_ids: Optional[List[UUID]] = None,
+    resource_id: Optional[UUID] = None,
+) -> bool:
+    """
+    Central permission evaluator function.
+    
+    Args:
+        user: Current user
+        action: Action to check (CREATE, READ, UPDATE, DELETE, MANAGE)
+        resource: Type of resource
+        db: Database session
+        resource_org_id: Organization ID of the resource (for org scoping)
+        resource_owner_id: Owner ID of the resource (for ownership checks)
+        resource_ids: List of resource IDs to check; permission requires access to all
+                      of them (checked with set-based queries, see get_permitted_resource_ids)
+        resource_id: Single resource ID to check
+    
+    Returns:
+        True if user has permission, False otherwise
+    """
+    ids: List[UUID] = list(resource_ids or [])
+    if resource_id is not None:
+        ids.append(resource_id)
+    
+    if ids:
+        permitted = await get_permitted_resource_ids(
+            user, action, resource, db, ids,
+            resource_org_id=resource_org_id,
+            resource_owner_id=resource_owner_id,
+        )
+        return permitted == set(ids)
+    
+    # No specific resources: role matrix and organization scoping only
+    user_roles = await get_user_roles(user, db)
+    
+    # SUPER_ADMIN has all permissions
+    if RoleEnum.SUPER_ADMIN in user_roles:
         return True
     
-    # No role granted permission
-    return False
+    required_bit = permission_bit(resource, action)
+    principal = get_principal(user)
+    user_mask = principal_permission_mask(principal) if principal else effective_permission_mask(user_roles)
+    if not user_mask & required_bit:
+        return False
+    
+    if resource_org_id is not None and user.organization_id != resource_org_id:
+        return False
+    
+    return True
 
 
 # ============================================================================
 # FASTAPI DEPENDENCY FACTORY
 # ============================================================================
 
+def _path_params_as_uuids(request: Request) -> Dict[str, Any]:
+    """Return route path parameters, converting UUID-shaped values to UUID"""
+    params: Dict[str, Any] = {}
+    for name, value in request.path_params.items():
+        try:
+            params[name] = UUID(str(value))
+        except ValueError:
+            params[name] = value
+    return params
+
+
 def require_permission(
     action: PermissionAction,
     resource: ResourceType,
@@ -405,11 +511,24 @@ def require_permission(
             ...
         ):
     """
+    required_bit = permission_bit(resource, action)
+    
     async def permission_checker(
-        current_user: User = Depends(get_current_user_v2),
+        request: Request,
+        principal: Principal = Depends(get_current_principal),
         db: AsyncSession = Depends(get_db),
-        **kwargs  # Capture route parameters
     ) -> User:
+        current_user = principal.user
+        
+        # Matrix check first: a single AND against the principal's mask
+        if not principal.is_super_admin and not principal_permission_mask(principal) & required_bit:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission denied: {action.value} on {resource.value}",
+            )
+        
+        kwargs = _path_params_as_uuids(request)
+        
         # Extract resource context
         resource_org_id = None
         resource_owner_id = None
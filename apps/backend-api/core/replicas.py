@@ -0,0 +1,194 @@
+"""
+Read-replica routing
+
+GET endpoints that tolerate slightly stale data depend on ``get_read_db``
+instead of ``get_db``. Their sessions are served by a read replica when one is
+configured, healthy and within REPLICA_MAX_LAG_SECONDS of the primary;
+otherwise they fall back to the primary.
+
+Users who just wrote (any successful non-GET request) keep reading from the
+primary for REPLICA_READ_YOUR_WRITES_SECONDS so they see their own changes.
+The write time goes back to the client in the LAST_WRITE_COOKIE cookie, so the
+next read is pinned whichever worker serves it; clients that drop cookies are
+only pinned on the worker that handled the write (recent_writers).
+"""
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from fastapi import Depends, Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from core.auth_v2 import Principal, get_current_principal
+from core.cache import TTLCache
+from core.config import settings
+from core.database import (
+    AsyncSessionLocal,
+    create_pooled_engine,
+    create_session_factory,
+    normalize_database_url,
+    pool_stats,
+)
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class Replica:
+    """A read replica engine plus its last measured lag"""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = create_session_factory(engine)
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = float("-inf")
+        self.error: Optional[str] = None
+        self.reads = 0
+        self._lock = asyncio.Lock()
+
+    async def measure_lag(self) -> float:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(REPLICA_LAG_SQL)
+            return float(result.scalar() or 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "lag_seconds": self.lag_seconds,
+            "error": self.error,
+            "reads": self.reads,
+            "pool": pool_stats(self.engine),
+        }
+
+
+class ReplicaRouter:
+    """
+    Picks a replica for each read session (round robin), skipping replicas that
+    are unreachable or lag more than ``max_lag`` seconds.
+    """
+
+    def __init__(self, replicas: List[Replica], max_lag: float, check_interval: float):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary_reads = 0
+        self._next = itertools.cycle(range(len(replicas))) if replicas else None
+
+    async def _refresh(self, replica: Replica) -> None:
+        """Re-measure the replica's lag if the last measurement is too old"""
+        if time.monotonic() - replica.checked_at < self.check_interval:
+            return
+        async with replica._lock:
+            if time.monotonic() - replica.checked_at < self.check_interval:
+                return
+            try:
+                # A replica that cannot answer within the tolerated lag is treated as lagging
+                replica.lag_seconds = await asyncio.wait_for(replica.measure_lag(), timeout=self.max_lag)
+                replica.error = None
+            except Exception as e:
+                replica.lag_seconds = None
+                replica.error = f"{type(e).__name__}: {e}"
+            replica.checked_at = time.monotonic()
+
+    def _is_usable(self, replica: Replica) -> bool:
+        return replica.error is None and replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag
+
+    async def choose(self) -> Optional[Replica]:
+        """Return a usable replica, or None to read from the primary"""
+        if self._next is None:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            await self._refresh(replica)
+            if self._is_usable(replica):
+                replica.reads += 1
+                return replica
+        self.primary_reads += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "primary_reads": self.primary_reads,
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+
+replica_router = ReplicaRouter(
+    [
+        Replica(f"replica_{index}", create_pooled_engine(normalize_database_url(url), f"replica_{index}"))
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
+
+# Users who recently wrote, pinned to the primary for read-your-writes
+# (per worker; the cookie below covers the other workers)
+recent_writers = TTLCache(
+    "recent_writers",
+    maxsize=settings.IDENTITY_CACHE_MAX_ENTRIES,
+    ttl=settings.REPLICA_READ_YOUR_WRITES_SECONDS,
+)
+
+# Cookie holding the epoch time of the client's last successful write
+LAST_WRITE_COOKIE = "pinaka_last_write"
+
+
+def note_write(user_id: UUID, response: Response) -> None:
+    """Pin the user's subsequent reads to the primary, on every worker"""
+    if not replica_router.replicas:
+        return
+    recent_writers.set(user_id, True)
+    window = settings.REPLICA_READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        LAST_WRITE_COOKIE, f"{time.time():.3f}",
+        max_age=max(1, int(window)), httponly=True, samesite="lax",
+    )
+
+
+def wrote_recently(user_id: UUID, request: Request) -> bool:
+    """Whether reads must go to the primary to include the user's own writes"""
+    if recent_writers.get(user_id) is not None:
+        return True
+    try:
+        written_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    # The writing worker's clock may be ahead of ours, so the write can seem to
+    # be slightly in the future. Only pins to the primary, so a forged value
+    # costs a replica read at most
+    elapsed = time.time() - written_at
+    return -settings.REPLICA_CLOCK_SKEW_SECONDS <= elapsed <= settings.REPLICA_READ_YOUR_WRITES_SECONDS
+
+
+async def get_read_db(
+    request: Request,
+    principal: Principal = Depends(get_current_principal),
+) -> AsyncSession:
+    """Dependency for read-only sessions (replica when available, else primary)"""
+    replica = None
+    if replica_router.replicas and not wrote_recently(principal.user_id, request):
+        replica = await replica_router.choose()
+    session_factory = replica.session_factory if replica else AsyncSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def dispose_replicas() -> None:
+    """Close replica connection pools (application shutdown)"""
+    for replica in replica_router.replicas:
+        await replica.engine.dispose()
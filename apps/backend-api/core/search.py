@@ -0,0 +1,178 @@
+"""
+Full-text search helpers
+
+Searchable tables carry a generated ``search_vector`` tsvector column (see
+db/models_v2.py and migration 011) backed by a GIN index. User input is
+turned into a prefix tsquery so type-ahead matches partial words:
+
+    tsquery = prefix_tsquery("123 mapl")     # '123:* & mapl:*'
+    condition, rank = text_match(Property.search_vector, tsquery)
+    select(Property).where(condition).order_by(rank.desc())
+
+``SearchMode.SIMILARITY`` instead matches names, emails and addresses with
+pg_trgm (GIN ``gin_trgm_ops`` indexes, migration 012), which tolerates
+misspellings and matches substrings anywhere in the value.
+
+Results are cached per worker in ``search_cache``. Handlers that write a
+searched entity call ``invalidate_search_cache(organization_id)`` after
+committing.
+"""
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Hashable, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import func, literal, or_
+from sqlalchemy.dialects.postgresql import to_tsquery
+from core.cache import TTLCache
+from core.config import settings
+
+# Text search configuration used by the generated columns. 'simple' does not
+# stem, so a prefix typed by the user matches the stored lexemes directly.
+SEARCH_CONFIG = "simple"
+
+# Upper bound on terms taken from a query (each one is an index probe)
+MAX_QUERY_TERMS = 8
+
+# Shorter input yields no trigram, so the trigram index cannot be used
+MIN_SIMILARITY_QUERY = 3
+
+# Shortest hex prefix accepted for id lookups
+MIN_ID_PREFIX = 4
+
+# Role scope of results that are not restricted to one organization
+ALL_ORGANIZATIONS = "all"
+
+_TERM_RE = re.compile(r"\w+")
+_HEX_RE = re.compile(r"^[0-9a-f]+$")
+
+
+class SearchMode(str, Enum):
+    """How global search matches text (``mode`` query parameter)"""
+    FULLTEXT = "fulltext"
+    SIMILARITY = "similarity"
+
+
+@dataclass(frozen=True)
+class SearchTerms:
+    """A user query prepared for each matching strategy"""
+    q: str
+    tsquery: Optional[str]
+    similarity: Optional[str] = None  # set in SIMILARITY mode when long enough
+
+    @property
+    def empty(self) -> bool:
+        return self.tsquery is None and self.similarity is None
+
+
+def build_search_terms(q: str, mode: SearchMode = SearchMode.FULLTEXT) -> SearchTerms:
+    similarity = normalize_similarity_query(q) if mode == SearchMode.SIMILARITY else None
+    return SearchTerms(q=q, tsquery=prefix_tsquery(q), similarity=similarity)
+
+
+def prefix_tsquery(q: str) -> Optional[str]:
+    """
+    Build a tsquery matching every term of ``q`` as a prefix.
+
+    Only word characters are kept, so tsquery operators in user input can
+    never reach to_tsquery. Returns None when nothing searchable is left.
+    """
+    terms = _TERM_RE.findall(q.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def text_match(vector_column, tsquery: str):
+    """``(vector @@ query, ts_rank(vector, query))`` for a prefix tsquery"""
+    query = to_tsquery(SEARCH_CONFIG, tsquery)
+    return vector_column.bool_op("@@")(query), func.ts_rank(vector_column, query)
+
+
+def normalize_similarity_query(q: str) -> Optional[str]:
+    """Collapse whitespace; None when too short for a trigram lookup"""
+    normalized = " ".join(q.lower().split())
+    if len(normalized) < MIN_SIMILARITY_QUERY:
+        return None
+    return normalized
+
+
+def similarity_match(columns: Sequence, q: str):
+    """
+    ``(condition, rank)`` for fuzzy matching ``q`` against ``columns``.
+
+    A row matches when a column contains ``q`` (ILIKE) or contains a word
+    similar to it (``q <% column``, pg_trgm word similarity), both answered
+    by the column's trigram index. Rank is the best word similarity.
+    """
+    term = literal(q)
+    condition = or_(*(
+        or_(column.icontains(q, autoescape=True), term.op("<%")(column))
+        for column in columns
+    ))
+    rank = func.greatest(*(func.coalesce(func.word_similarity(term, column), 0) for column in columns))
+    return condition, rank
+
+
+def uuid_prefix_range(q: str) -> Optional[Tuple[UUID, UUID]]:
+    """
+    Inclusive id range covered by a (possibly partial) UUID typed by the user.
+
+    Lets id lookups use the primary key index instead of casting every id to
+    text. Returns None when ``q`` is not a hex prefix of at least
+    MIN_ID_PREFIX characters.
+    """
+    digits = q.strip().lower().replace("-", "")
+    if len(digits) < MIN_ID_PREFIX or len(digits) > 32 or not _HEX_RE.match(digits):
+        return None
+    return UUID(digits.ljust(32, "0")), UUID(digits.ljust(32, "f"))
+
+
+# Search results keyed by search_cache_key(...)
+search_cache = TTLCache(
+    "search",
+    maxsize=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+)
+
+
+def search_cache_key(
+    organization_id: Optional[UUID],
+    role_scope: str,
+    type: Optional[str],
+    mode: SearchMode,
+    q: str,
+    limit: int,
+) -> Hashable:
+    """
+    Cache key for one search. ``role_scope`` must capture everything besides
+    the organization that changes which rows the caller may see.
+    """
+    return (organization_id, role_scope, type or "*", mode.value, " ".join(q.lower().split()), limit)
+
+
+# Bumped by every invalidation; a search that started before a write must not
+# store its (possibly stale) results after that write's invalidation
+_cache_generation = 0
+
+
+def search_cache_generation() -> int:
+    return _cache_generation
+
+
+def store_search_results(key: Hashable, results, generation: int) -> None:
+    """Cache results unless an invalidation happened since ``generation`` was read"""
+    if generation == _cache_generation:
+        search_cache.set(key, results)
+
+
+def invalidate_search_cache(organization_id: Optional[UUID]) -> int:
+    """
+    Drop cached searches that may include rows of the organization: its own
+    entries and unscoped (super admin) ones. Returns the number removed.
+    """
+    global _cache_generation
+    _cache_generation += 1
+    return search_cache.invalidate_where(
+        lambda key: key[0] == organization_id or key[1] == ALL_ORGANIZATIONS
+    )
@@ -0,0 +1,354 @@
+"""
+Attachment storage backends
+
+Routers talk to ``attachment_storage`` through the StorageBackend interface
+(put/get/stream/delete/presign) and never touch paths or buckets directly.
+
+- LocalStorage: files under ATTACHMENT_LOCAL_DIR (development, single host)
+- S3Storage: any S3-compatible object store (AWS S3, MinIO, ...). Requests
+  are signed with AWS Signature V4 over httpx, so no SDK is required. Downloads
+  can redirect to presigned URLs so file bytes bypass the API workers.
+
+Select with ATTACHMENT_STORAGE_BACKEND=local|s3.
+"""
+import datetime
+import hashlib
+import hmac
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, Optional
+from urllib.parse import quote, urlsplit
+import httpx
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+
+STREAM_CHUNK_BYTES = 256 * 1024
+
+
+class StorageError(Exception):
+    """A storage backend request failed"""
+
+
+def content_disposition(file_name: str) -> str:
+    """``attachment`` Content-Disposition that survives non-ASCII names"""
+    return f"attachment; filename*=utf-8''{quote(file_name, safe='')}"
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every attachment storage driver"""
+
+    # Directory for in-progress uploads before put_file()
+    staging_dir: Path
+
+    @abstractmethod
+    async def put_file(self, key: str, source: Path, content_type: Optional[str] = None) -> None:
+        """Store the file at ``source`` under ``key``; the source file is consumed"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether an object is stored under ``key``"""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Whole object (small files only)"""
+
+    @abstractmethod
+    def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Object bytes ``start``..``end`` (inclusive; None = to the end) in chunks"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove the object (no error if it does not exist)"""
+
+    async def presign(self, key: str, file_name: str, content_type: Optional[str] = None) -> Optional[str]:
+        """Time-limited download URL, or None when the backend cannot serve directly"""
+        return None
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path of the object for backends that have one"""
+        return None
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalStorage(StorageBackend):
+    """Objects are files under ``root`` (the key is the relative path)"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        # Same filesystem as the objects, so put_file() is a rename
+        self.staging_dir = root / ".tmp"
+
+    def local_path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise StorageError(f"Invalid storage key: {key}")
+        return path
+
+    async def put_file(self, key: str, source: Path, content_type: Optional[str] = None) -> None:
+        destination = self.local_path(key)
+
+        def move():
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, destination)
+
+        await run_in_threadpool(move)
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self.local_path(key).exists)
+
+    async def get(self, key: str) -> bytes:
+        return await run_in_threadpool(self.local_path(key).read_bytes)
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        buffer: BinaryIO = await run_in_threadpool(open, self.local_path(key), "rb")
+        try:
+            await run_in_threadpool(buffer.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = STREAM_CHUNK_BYTES if remaining is None else min(STREAM_CHUNK_BYTES, remaining)
+                chunk = await run_in_threadpool(buffer.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await run_in_threadpool(buffer.close)
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.local_path(key).unlink, True)
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+
+class SigV4Signer:
+    """AWS Signature Version 4 for S3 (header and query-string/presigned auth)"""
+
+    def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+
+    def _scope(self, date: str) -> str:
+        return f"{date}/{self.region}/{self.service}/aws4_request"
+
+    def _signature(self, date: str, amz_date: str, canonical_request: str) -> str:
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            self._scope(date),
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        key = _hmac(("AWS4" + self.secret_key).encode(), date)
+        for part in (self.region, self.service, "aws4_request"):
+            key = _hmac(key, part)
+        return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _canonical_request(method: str, url: str, query: Dict[str, str], headers: Dict[str, str], payload_hash: str):
+        parts = urlsplit(url)
+        canonical_query = "&".join(
+            f"{_uri_encode(name)}={_uri_encode(value)}" for name, value in sorted(query.items())
+        )
+        lowered = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()}
+        signed_headers = ";".join(sorted(lowered))
+        canonical_headers = "".join(f"{name}:{lowered[name]}\n" for name in sorted(lowered))
+        request = "\n".join([
+            method,
+            parts.path or "/",  # already URI-encoded by object_url()
+            canonical_query,
+            canonical_headers,
+            signed_headers,
+            payload_hash,
+        ])
+        return request, signed_headers
+
+    def sign_headers(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        payload_hash: str = UNSIGNED_PAYLOAD,
+        now: Optional[datetime.datetime] = None,
+    ) -> Dict[str, str]:
+        """Headers (including Authorization) for a header-signed request"""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        signed = dict(headers or {})
+        signed["host"] = urlsplit(url).netloc
+        signed["x-amz-content-sha256"] = payload_hash
+        signed["x-amz-date"] = amz_date
+        canonical_request, signed_headers = self._canonical_request(method, url, {}, signed, payload_hash)
+        signature = self._signature(date, amz_date, canonical_request)
+        signed["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{self._scope(date)},"
+            f"SignedHeaders={signed_headers},Signature={signature}"
+        )
+        del signed["host"]  # httpx sets Host itself
+        return signed
+
+    def presign(
+        self,
+        method: str,
+        url: str,
+        expires: int,
+        params: Optional[Dict[str, str]] = None,
+        now: Optional[datetime.datetime] = None,
+    ) -> str:
+        """Presigned URL (query-string auth) valid for ``expires`` seconds"""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        query = dict(params or {})
+        query.update({
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{self._scope(date)}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires),
+            "X-Amz-SignedHeaders": "host",
+        })
+        canonical_request, _ = self._canonical_request(
+            method, url, query, {"host": urlsplit(url).netloc}, UNSIGNED_PAYLOAD
+        )
+        query["X-Amz-Signature"] = self._signature(date, amz_date, canonical_request)
+        return url + "?" + "&".join(
+            f"{_uri_encode(name)}={_uri_encode(value)}" for name, value in sorted(query.items())
+        )
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage (path-style URLs: ``{endpoint}/{bucket}/{key}``,
+    which AWS S3 and MinIO both accept).
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        presign_expires: int = 300,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.signer = SigV4Signer(access_key, secret_key, region)
+        self.presign_expires = presign_expires
+        self.staging_dir = Path(tempfile.gettempdir()) / "attachment-uploads"
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0))
+        return self._client
+
+    def object_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key, safe='/-_.~')}"
+
+    async def _request(self, method: str, key: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> httpx.Response:
+        url = self.object_url(key)
+        response = await self.client.request(
+            method, url, headers=self.signer.sign_headers(method, url, headers), **kwargs
+        )
+        return response
+
+    async def put_file(self, key: str, source: Path, content_type: Optional[str] = None) -> None:
+        size = await run_in_threadpool(lambda: source.stat().st_size)
+        headers = {"content-length": str(size)}
+        if content_type:
+            headers["content-type"] = content_type
+
+        async def body():
+            buffer = await run_in_threadpool(open, source, "rb")
+            try:
+                while chunk := await run_in_threadpool(buffer.read, STREAM_CHUNK_BYTES):
+                    yield chunk
+            finally:
+                await run_in_threadpool(buffer.close)
+
+        try:
+            response = await self._request("PUT", key, headers, content=body())
+            if response.status_code >= 300:
+                raise StorageError(f"PUT {key} failed with {response.status_code}")
+        finally:
+            await run_in_threadpool(source.unlink, True)
+
+    async def exists(self, key: str) -> bool:
+        response = await self._request("HEAD", key)
+        if response.status_code == 404:
+            return False
+        if response.status_code >= 300:
+            raise StorageError(f"HEAD {key} failed with {response.status_code}")
+        return True
+
+    async def get(self, key: str) -> bytes:
+        response = await self._request("GET", key)
+        if response.status_code >= 300:
+            raise StorageError(f"GET {key} failed with {response.status_code}")
+        return response.content
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        url = self.object_url(key)
+        headers = {}
+        if start or end is not None:
+            headers["range"] = f"bytes={start}-{'' if end is None else end}"
+        request = self.client.build_request("GET", url, headers=self.signer.sign_headers("GET", url, headers))
+        response = await self.client.send(request, stream=True)
+        try:
+            if response.status_code >= 300:
+                raise StorageError(f"GET {key} failed with {response.status_code}")
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_BYTES):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def delete(self, key: str) -> None:
+        response = await self._request("DELETE", key)
+        if response.status_code >= 300 and response.status_code != 404:
+            raise StorageError(f"DELETE {key} failed with {response.status_code}")
+
+    async def presign(self, key: str, file_name: str, content_type: Optional[str] = None) -> str:
+        params = {"response-content-disposition": content_disposition(file_name)}
+        if content_type:
+            params["response-content-type"] = content_type
+        return self.signer.presign("GET", self.object_url(key), self.presign_expires, params)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_storage() -> StorageBackend:
+    """Storage backend selected by ATTACHMENT_STORAGE_BACKEND"""
+    if settings.ATTACHMENT_STORAGE_BACKEND == "s3":
+        return S3Storage(
+            endpoint_url=settings.ATTACHMENT_S3_ENDPOINT_URL,
+            bucket=settings.ATTACHMENT_S3_BUCKET,
+            access_key=settings.ATTACHMENT_S3_ACCESS_KEY_ID,
+            secret_key=settings.ATTACHMENT_S3_SECRET_ACCESS_KEY,
+            region=settings.ATTACHMENT_S3_REGION,
+            presign_expires=settings.ATTACHMENT_PRESIGN_EXPIRES_SECONDS,
+        )
+    return LocalStorage(Path(settings.ATTACHMENT_LOCAL_DIR))
+
+
+attachment_storage = create_storage()
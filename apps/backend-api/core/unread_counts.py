@@ -0,0 +1,107 @@
+"""
+Maintained unread counters (notification and message badges)
+
+Badge counts are read on every page load, so they are kept in counters
+instead of counting rows: ``user_unread_counts`` per user and
+``conversation_participants.unread_count`` per conversation. Writers adjust
+them in their own transaction and drop the cached value after committing:
+
+    await adjust_unread_counts(db, [notification.user_id], notifications=1)
+    await db.commit()
+    invalidate_unread_counts([notification.user_id])
+
+Counter rows are created on first use and never go below zero.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+from uuid import UUID
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import TTLCache
+from core.config import settings
+from db.models_v2 import ConversationParticipant, UserUnreadCount
+
+unread_count_cache = TTLCache(
+    "unread_counts",
+    maxsize=settings.UNREAD_COUNT_CACHE_MAX_ENTRIES,
+    ttl=settings.UNREAD_COUNT_CACHE_TTL_SECONDS,
+)
+
+
+async def get_unread_counts(db: AsyncSession, user_id: UUID) -> Dict[str, int]:
+    """``{"notifications": n, "messages": m}`` for the user (primary key lookup, cached)"""
+    counts = unread_count_cache.get(user_id)
+    if counts is not None:
+        return counts
+    
+    result = await db.execute(
+        select(UserUnreadCount.notifications, UserUnreadCount.messages)
+        .where(UserUnreadCount.user_id == user_id)
+    )
+    row = result.one_or_none()
+    counts = {"notifications": row[0] if row else 0, "messages": row[1] if row else 0}
+    unread_count_cache.set(user_id, counts)
+    return counts
+
+
+async def adjust_unread_counts(
+    db: AsyncSession,
+    user_ids: Iterable[UUID],
+    notifications: int = 0,
+    messages: int = 0,
+) -> None:
+    """Add the deltas to each user's counters (upsert, clamped at zero)"""
+    # Sorted, so concurrent adjustments lock counter rows in the same order
+    user_ids = sorted(set(user_ids), key=str)
+    if not user_ids or (notifications == 0 and messages == 0):
+        return
+    
+    statement = insert(UserUnreadCount).values([
+        {"user_id": user_id, "notifications": max(notifications, 0), "messages": max(messages, 0)}
+        for user_id in user_ids
+    ])
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[UserUnreadCount.user_id],
+        set_={
+            "notifications": func.greatest(UserUnreadCount.notifications + notifications, 0),
+            "messages": func.greatest(UserUnreadCount.messages + messages, 0),
+        },
+    ))
+
+
+async def record_message(db: AsyncSession, conversation_id: UUID, sender_user_id: UUID) -> List[UUID]:
+    """
+    Count a new message as unread for every other participant. Returns the
+    recipients (whose cached counts must be invalidated after commit).
+    """
+    result = await db.execute(
+        update(ConversationParticipant)
+        .where(
+            ConversationParticipant.conversation_id == conversation_id,
+            ConversationParticipant.user_id != sender_user_id,
+        )
+        .values(unread_count=ConversationParticipant.unread_count + 1)
+        .returning(ConversationParticipant.user_id)
+    )
+    recipients = list(result.scalars().all())
+    await adjust_unread_counts(db, recipients, messages=1)
+    return recipients
+
+
+async def mark_conversation_read(db: AsyncSession, participant: ConversationParticipant) -> None:
+    """Reset the participant's unread messages and take them off the user's total"""
+    result = await db.execute(
+        select(ConversationParticipant.unread_count)
+        .where(ConversationParticipant.id == participant.id)
+        .with_for_update()
+    )
+    unread = result.scalar() or 0
+    participant.unread_count = 0
+    participant.last_read_at = datetime.now(timezone.utc)
+    await adjust_unread_counts(db, [participant.user_id], messages=-unread)
+
+
+def invalidate_unread_counts(user_ids: Iterable[UUID]) -> None:
+    for user_id in user_ids:
+        unread_count_cache.invalidate(user_id)
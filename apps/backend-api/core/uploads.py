@@ -0,0 +1,141 @@
+"""
+Streaming attachment uploads
+
+Request bodies are consumed in chunks and written to a temporary file in a
+worker thread (file I/O and hashing never run on the event loop). Size and
+SHA-256 are computed while streaming, and the size limit is enforced as the
+bytes arrive:
+
+    limit = await upload_limit(db, organization_id)
+    received = await receive_stream(upload_chunks(file), attachment_storage.staging_dir, limit)
+    # received.path, received.size, received.sha256
+    await reserve_quota(db, organization_id, received.size)  # then insert and commit
+
+upload_limit() is only an early check: concurrent uploads all see the same
+usage. reserve_quota() re-checks under a per-organization lock held until the
+transaction that records the attachment commits.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional
+from uuid import UUID
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from db.models_v2 import Attachment
+
+QUOTA_EXCEEDED = "Organization attachment storage quota exceeded"
+
+@dataclass(frozen=True)
+class UploadLimit:
+    """Maximum accepted bytes for one upload and the error reported past it"""
+    max_bytes: int
+    detail: str
+
+
+@dataclass(frozen=True)
+class ReceivedFile:
+    """A fully received upload in a temporary file"""
+    path: Path
+    size: int
+    sha256: str
+
+
+async def upload_limit(db: AsyncSession, organization_id: Optional[UUID]) -> UploadLimit:
+    """
+    Bytes the organization may upload now: the per-file limit, reduced to the
+    remaining organization quota when ATTACHMENT_ORG_QUOTA_BYTES is set.
+    """
+    file_limit = UploadLimit(
+        settings.ATTACHMENT_MAX_FILE_BYTES,
+        f"File exceeds the maximum size of {settings.ATTACHMENT_MAX_FILE_BYTES} bytes",
+    )
+    if settings.ATTACHMENT_ORG_QUOTA_BYTES <= 0 or organization_id is None:
+        return file_limit
+
+    remaining = max(settings.ATTACHMENT_ORG_QUOTA_BYTES - await _used_bytes(db, organization_id), 0)
+    if remaining < file_limit.max_bytes:
+        return UploadLimit(remaining, QUOTA_EXCEEDED)
+    return file_limit
+
+
+async def reserve_quota(db: AsyncSession, organization_id: Optional[UUID], size: int) -> None:
+    """
+    Check that ``size`` more bytes fit in the organization quota, and keep
+    other uploads of the organization waiting here until the caller's
+    transaction ends (record the attachment before committing). Raises 413.
+    """
+    if settings.ATTACHMENT_ORG_QUOTA_BYTES <= 0 or organization_id is None:
+        return
+
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"attachment_quota:{organization_id}"))))
+    if await _used_bytes(db, organization_id) + size > settings.ATTACHMENT_ORG_QUOTA_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=QUOTA_EXCEEDED,
+        )
+
+
+async def _used_bytes(db: AsyncSession, organization_id: UUID) -> int:
+    result = await db.execute(
+        select(func.coalesce(func.sum(Attachment.file_size_bytes), 0))
+        .where(Attachment.organization_id == organization_id)
+    )
+    return int(result.scalar() or 0)
+
+
+async def upload_chunks(upload: UploadFile, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Read a multipart UploadFile in chunks"""
+    chunk_size = chunk_size or settings.ATTACHMENT_UPLOAD_CHUNK_BYTES
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+def _open_temp_file(directory: Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(fd, "wb"), Path(name)
+
+
+def _write_chunk(buffer: BinaryIO, digest, chunk: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so hashing runs in parallel too
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+def _discard(buffer: BinaryIO, path: Path) -> None:
+    buffer.close()
+    path.unlink(missing_ok=True)
+
+
+async def receive_stream(chunks: AsyncIterator[bytes], directory: Path, limit: UploadLimit) -> ReceivedFile:
+    """
+    Write ``chunks`` to a new temporary file under ``directory``.
+
+    Raises 413 as soon as more than ``limit.max_bytes`` have arrived; the
+    partial file is removed on any failure. The caller owns the returned file
+    (move it into storage or unlink it).
+    """
+    buffer, path = await run_in_threadpool(_open_temp_file, directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > limit.max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=limit.detail,
+                )
+            await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+        await run_in_threadpool(buffer.close)
+    except BaseException:
+        await run_in_threadpool(_discard, buffer, path)
+        raise
+
+    return ReceivedFile(path=path, size=size, sha256=digest.hexdigest())
@@ -2,11 +2,11 @@
 SQLAlchemy models for v2 database schema
 All tables use UUID primary keys and snake_case naming
 """
-from sqlalchemy import Column, String, Boolean, Integer, Numeric, Date, DateTime, Text, ForeignKey, Index, UniqueConstraint, BigInteger
+from sqlalchemy import Column, String, Boolean, Integer, Numeric, Date, DateTime, Text, ForeignKey, Index, UniqueConstraint, BigInteger, Computed
 import sqlalchemy as sa
 from sqlalchemy.sql import text as sa_text
-from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from core.database import Base
 import uuid
@@ -122,6 +122,12 @@ class Landlord(Base):
     status = Column(Text, server_default='active', nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
+    # Full-text search document (generated; GIN indexed, used by /search)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', coalesce(email, '') || ' ' || translate(coalesce(email, ''), '@.+_-', '     ')), 'B')",
+        persisted=True,
+    )))
+    
     # Relationships
     user = relationship("User")
     organization = relationship("Organization", back_populates="landlords")
@@ -131,6 +137,9 @@ class Landlord(Base):
     __table_args__ = (
         Index('idx_landlords_organization_id', 'organization_id'),
         Index('idx_landlords_user_id', 'user_id'),
+        Index('idx_landlords_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('idx_landlords_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_landlords_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
     )
 
 
@@ -147,6 +156,12 @@ class Tenant(Base):
     status = Column(Text, server_default='active', nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
+    # Full-text search document (generated; GIN indexed, used by /search)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', coalesce(email, '') || ' ' || translate(coalesce(email, ''), '@.+_-', '     ')), 'B')",
+        persisted=True,
+    )))
+    
     # Relationships
     user = relationship("User")
     organization = relationship("Organization", back_populates="tenants")
@@ -156,6 +171,9 @@ class Tenant(Base):
     __table_args__ = (
         Index('idx_tenants_organization_id', 'organization_id'),
         Index('idx_tenants_user_id', 'user_id'),
+        Index('idx_tenants_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('idx_tenants_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_tenants_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
     )
 
 
@@ -174,6 +192,12 @@ class Vendor(Base):
     status = Column(Text, server_default='active', nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
+    # Full-text search document (generated; GIN indexed, used by /search)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', company_name), 'A') || setweight(to_tsvector('simple', coalesce(contact_name, '')), 'B') || setweight(to_tsvector('simple', coalesce(email, '') || ' ' || translate(coalesce(email, ''), '@.+_-', '     ')), 'C')",
+        persisted=True,
+    )))
+    
     # Relationships
     user = relationship("User")
     organization = relationship("Organization", back_populates="vendors")
@@ -182,6 +206,8 @@ class Vendor(Base):
     __table_args__ = (
         Index('idx_vendors_organization_id', 'organization_id'),
         Index('idx_vendors_user_id', 'user_id'),
+        Index('idx_vendors_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('idx_vendors_company_name_trgm', 'company_name', postgresql_using='gin', postgresql_ops={'company_name': 'gin_trgm_ops'}),
     )
 
 
@@ -202,6 +228,12 @@ class Property(Base):
     status = Column(Text, server_default='active', nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
+    # Full-text search document (generated; GIN indexed, used by /search)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || setweight(to_tsvector('simple', address_line1), 'B') || setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(postal_code, '')), 'C')",
+        persisted=True,
+    )))
+    
     # Relationships
     organization = relationship("Organization", back_populates="properties")
     landlord = relationship("Landlord", back_populates="properties")
@@ -211,6 +243,10 @@ class Property(Base):
     __table_args__ = (
         Index('idx_properties_org_landlord', 'organization_id', 'landlord_id'),
         Index('idx_properties_organization_id', 'organization_id'),
+        Index('idx_properties_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('idx_properties_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_properties_address_line1_trgm', 'address_line1', postgresql_using='gin', postgresql_ops={'address_line1': 'gin_trgm_ops'}),
+        Index('idx_properties_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
     )
 
 
@@ -307,6 +343,12 @@ class WorkOrder(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
+    # Full-text search document (generated; GIN indexed, used by /search)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+        persisted=True,
+    )))
+    
     # Relationships
     organization = relationship("Organization", back_populates="work_orders")
     property = relationship("Property", back_populates="work_orders")
@@ -322,6 +364,8 @@ class WorkOrder(Base):
         Index('idx_work_orders_property_status', 'property_id', 'status'),
         Index('idx_work_orders_tenant_id', 'tenant_id'),
         Index('idx_work_orders_created_by', 'created_by_user_id'),
+        Index('idx_work_orders_org_created_id', 'organization_id', 'created_at', 'id'),
+        Index('idx_work_orders_search_vector', 'search_vector', postgresql_using='gin'),
     )
 
 
@@ -347,6 +391,26 @@ class WorkOrderAssignment(Base):
     )
 
 
+class UserAccessScope(Base):
+    """
+    Precomputed row-level access scope: which properties, units, leases and
+    work orders a user reaches through their landlord, tenant or vendor record.
+    Maintained incrementally by core.access_scope on lease, assignment and
+    property writes.
+    """
+    __tablename__ = "user_access_scopes"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    role = Column(Text, primary_key=True)  # 'landlord', 'tenant', 'vendor'
+    resource_type = Column(Text, primary_key=True)  # 'property', 'unit', 'lease', 'work_order'
+    resource_id = Column(UUID(as_uuid=True), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_user_access_scopes_resource', 'resource_type', 'resource_id'),
+    )
+
+
 class WorkOrderComment(Base):
     """Work Order Comment model"""
     __tablename__ = "work_order_comments"
@@ -374,10 +438,11 @@ class Attachment(Base):
     organization_id = Column(UUID(as_uuid=True), ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
     entity_type = Column(Text, nullable=False)  # 'work_order', 'message', 'lease', 'property', etc.
     entity_id = Column(UUID(as_uuid=True), nullable=False)
-    storage_key = Column(Text, nullable=False)  # local file path now, S3 key later
+    storage_key = Column(Text, nullable=False)  # blobs/ab/cd/{sha256}, shared by rows with identical content
     file_name = Column(Text, nullable=False)
     mime_type = Column(Text, nullable=True)
     file_size_bytes = Column(BigInteger, nullable=True)
+    content_sha256 = Column(Text, nullable=True)  # hex digest computed while uploading
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
@@ -385,11 +450,17 @@ class Attachment(Base):
     
     __table_args__ = (
         Index('idx_attachments_org_entity', 'organization_id', 'entity_type', 'entity_id'),
+        Index('idx_attachments_storage_key', 'storage_key'),
+        Index('idx_attachments_org_content', 'organization_id', 'content_sha256'),
     )
 
 
 class Notification(Base):
-    """Notification model"""
+    """
+    Notification model. The table is partitioned by month on created_at
+    (migration 017), so its database primary key is (id, created_at); old rows
+    are moved to notifications_archive by core.notification_retention.
+    """
     __tablename__ = "notifications"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa_text('gen_random_uuid()'))
@@ -408,9 +479,71 @@ class Notification(Base):
     
     __table_args__ = (
         Index('idx_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+        Index('idx_notifications_user_created_id', 'user_id', 'created_at', 'id'),
     )
 
 
+class NotificationArchive(Base):
+    """Notifications past retention, moved out of the partitioned notifications table"""
+    __tablename__ = "notifications_archive"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    entity_type = Column(Text, nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    type = Column(Text, nullable=False)
+    is_read = Column(Boolean, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    read_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_notifications_archive_user_created', 'user_id', 'created_at'),
+    )
+
+
+class NotificationJob(Base):
+    """
+    Background delivery of a notification to a large audience. Recipients are
+    processed in user id order; last_user_id records progress, committed with
+    each chunk of inserted notifications.
+    """
+    __tablename__ = "notification_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa_text('gen_random_uuid()'))
+    organization_id = Column(UUID(as_uuid=True), ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    created_by_user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    audience = Column(JSONB, nullable=False)
+    entity_type = Column(Text, nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    type = Column(Text, nullable=False)
+    status = Column(Text, server_default='queued', nullable=False)  # 'queued', 'running', 'completed', 'failed'
+    recipient_count = Column(Integer, nullable=True)  # audience size when the job was queued
+    sent_count = Column(Integer, server_default='0', nullable=False)
+    last_user_id = Column(UUID(as_uuid=True), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index('idx_notification_jobs_org_created', 'organization_id', 'created_at'),
+    )
+
+
+class UserUnreadCount(Base):
+    """
+    Maintained unread counters per user (badge counts). Updated by
+    core.unread_counts in the same transaction as the notification/message
+    writes, so reads never count rows.
+    """
+    __tablename__ = "user_unread_counts"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    notifications = Column(Integer, server_default='0', nullable=False)
+    messages = Column(Integer, server_default='0', nullable=False)  # sum of conversation_participants.unread_count
+
+
 class AuditLog(Base):
     """Audit Log model"""
     __tablename__ = "audit_logs"
@@ -431,6 +564,7 @@ class AuditLog(Base):
     __table_args__ = (
         Index('idx_audit_logs_org_created', 'organization_id', 'created_at'),
         Index('idx_audit_logs_actor_created', 'actor_user_id', 'created_at'),
+        Index('idx_audit_logs_created_id', 'created_at', 'id'),
     )
 
 
@@ -498,6 +632,7 @@ class ConversationParticipant(Base):
     conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id', ondelete='CASCADE'), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     last_read_at = Column(DateTime(timezone=True), nullable=True)
+    unread_count = Column(Integer, server_default='0', nullable=False)  # messages from others since last_read_at
     joined_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
@@ -527,7 +662,7 @@ class Message(Base):
     sender = relationship("User", foreign_keys=[sender_user_id])
     
     __table_args__ = (
-        Index('idx_messages_conversation_created', 'conversation_id', 'created_at'),
+        Index('idx_messages_conversation_created_id', 'conversation_id', 'created_at', 'id'),
         Index('idx_messages_sender', 'sender_user_id'),
     )
 
@@ -629,6 +764,7 @@ class RentPayment(Base):
     
     __table_args__ = (
         Index('idx_rent_payments_lease_date', 'lease_id', 'payment_date'),
+        Index('idx_rent_payments_org_created_id', 'organization_id', 'created_at', 'id'),
         Index('idx_rent_payments_tenant', 'tenant_id'),
         Index('idx_rent_payments_status', 'status'),
     )
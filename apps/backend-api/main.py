@@ -3,13 +3,19 @@ Pinaka FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from core.config import settings
+from core.crud_helpers import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_MODE_HEADER
 from core.database import engine, Base
+from core.derivatives import shutdown_derivative_pool
+from core.notification_broadcast import resume_notification_jobs
+from core.notification_hub import notification_hub
+from core.replicas import dispose_replicas, note_write
+from core.storage import attachment_storage
 from routers import health
 from routers import auth_v2, organizations, properties, work_orders, attachments
 from routers import landlords, tenants, leases, units, notifications, audit_logs, users
@@ -28,10 +34,17 @@ async def lifespan(app: FastAPI):
         # await conn.run_sync(Base.metadata.create_all)
         pass
     
+    # Continue broadcasts interrupted by the previous shutdown
+    await resume_notification_jobs()
+    
     yield
     
     # Shutdown
+    await notification_hub.close()
     await engine.dispose()
+    await dispose_replicas()
+    await attachment_storage.close()
+    shutdown_derivative_pool()
 
 
 app = FastAPI(
@@ -51,8 +64,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_MODE_HEADER,
+        "ETag", "Last-Modified", "Accept-Ranges", "Content-Range", "Content-Disposition",
+    ],
 )
 
+
+@app.middleware("http")
+async def track_writes_for_replica_routing(request: Request, call_next):
+    """Pin users to the primary for a short while after a successful write"""
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        principal = getattr(request.state, "principal", None)
+        if principal is not None:
+            note_write(principal.user_id, response)
+    return response
+
+
 # Setup exception handlers
 setup_exception_handlers(app)
 
@@ -1,24 +1,123 @@
 """
 Attachment endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import select, delete
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
-import os
-import shutil
 from pathlib import Path
+from core.config import settings
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
-from schemas.attachment import Attachment, AttachmentCreate
+from core.attachment_groups import MAX_BATCH_ENTITIES, attachment_groups, attachment_summaries
+from core.attachment_blobs import content_storage_key, count_references, find_readable_content, lock_storage_key
+from core.derivatives import (
+    DERIVATIVE_MIME_TYPE,
+    AttachmentVariant,
+    DerivativeError,
+    derivative_storage_keys,
+    ensure_derivative,
+    is_derivable,
+    schedule_derivatives,
+)
+from core.http_cache import http_date, is_not_modified, requested_range, strong_etag
+from core.storage import StorageError, attachment_storage, content_disposition
+from core.uploads import UploadLimit, receive_stream, reserve_quota, upload_chunks, upload_limit
+from schemas.attachment import Attachment, AttachmentCreate, AttachmentFromContent, AttachmentGroup
 from db.models_v2 import Attachment as AttachmentModel, User, Organization
 
 router = APIRouter(prefix="/attachments", tags=["attachments"])
 
-# Local storage directory (will be configurable later)
-UPLOAD_DIR = Path("uploads")
+logger = logging.getLogger(__name__)
+
+# Attachment content never changes, but access can be revoked: cache privately and revalidate hourly
+DOWNLOAD_CACHE_CONTROL = "private, max-age=3600"
+
+
+def _attachment_etag(attachment: AttachmentModel, variant: AttachmentVariant = AttachmentVariant.ORIGINAL) -> str:
+    """Strong validator from metadata: content hash, or size + creation time for unhashed rows"""
+    if attachment.content_sha256:
+        validator = attachment.content_sha256
+    else:
+        validator = f"{attachment.file_size_bytes}-{int(attachment.created_at.timestamp())}"
+    if variant != AttachmentVariant.ORIGINAL:
+        validator = f"{validator}-{variant.value}"
+    return strong_etag(validator)
+
+
+def _check_declared_size(declared_size: Optional[int], limit: UploadLimit) -> None:
+    """Reject uploads whose declared size is already over the limit"""
+    if declared_size is not None and declared_size > limit.max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=limit.detail,
+        )
+
+
+async def _place_blob(source: Path, storage_key: str, mime_type: Optional[str]) -> bool:
+    """Store an upload at its content address; returns False if the content was already stored"""
+    if await attachment_storage.exists(storage_key):
+        await run_in_threadpool(source.unlink, True)
+        return False
+    await attachment_storage.put_file(storage_key, source, mime_type)
+    return True
+
+
+async def _store_upload(
+    chunks: AsyncIterator[bytes],
+    limit: UploadLimit,
+    org_id: UUID,
+    entity_type: str,
+    entity_id: UUID,
+    file_name: str,
+    mime_type: Optional[str],
+    db: AsyncSession,
+) -> AttachmentModel:
+    """Stream an upload to disk, store it by content hash, then record it"""
+    received = await receive_stream(chunks, attachment_storage.staging_dir, limit)
+    
+    # Identical content is stored once: blobs/ab/cd/{sha256}
+    storage_key = content_storage_key(received.sha256)
+    try:
+        await lock_storage_key(db, storage_key)
+        placed = await _place_blob(received.path, storage_key, mime_type)
+    except BaseException:
+        received.path.unlink(missing_ok=True)
+        raise
+    
+    # Final quota check, serialized with the organization's other uploads until commit
+    try:
+        await reserve_quota(db, org_id, received.size)
+    except HTTPException:
+        # No row references a blob placed by this request (the key is still locked)
+        if placed:
+            await attachment_storage.delete(storage_key)
+        raise
+    
+    # Create attachment record
+    attachment = AttachmentModel(
+        organization_id=org_id,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        storage_key=storage_key,
+        file_name=Path(file_name).name or "upload",
+        mime_type=mime_type,
+        file_size_bytes=received.size,
+        content_sha256=received.sha256,
+    )
+    db.add(attachment)
+    await db.commit()
+    await db.refresh(attachment)
+    
+    # Thumbnails are ready before the gallery asks for them
+    if placed:
+        schedule_derivatives(attachment_storage, storage_key, mime_type)
+    
+    return attachment
 
 
 @router.get("", response_model=List[Attachment])
@@ -46,6 +145,34 @@ async def list_attachments(
     return attachments
 
 
+@router.get("/batch", response_model=Dict[UUID, AttachmentGroup])
+async def list_attachments_batch(
+    entity_type: str,
+    entity_ids: List[UUID] = Query(..., description=f"Entity ids (repeat the parameter, up to {MAX_BATCH_ENTITIES})"),
+    counts_only: bool = Query(False, description="Return only count, total size and latest upload per entity"),
+    current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Attachments of many entities of one type in a single query, keyed by
+    entity id. Every requested id is present in the response.
+    """
+    if len(entity_ids) > MAX_BATCH_ENTITIES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_BATCH_ENTITIES} entity ids per request",
+        )
+    
+    user_roles = await get_user_roles(current_user, db)
+    
+    # Filter by organization
+    organization_id = None if RoleEnum.SUPER_ADMIN in user_roles else current_user.organization_id
+    
+    if counts_only:
+        return await attachment_summaries(db, entity_type, entity_ids, organization_id)
+    return await attachment_groups(db, entity_type, entity_ids, organization_id)
+
+
 @router.post("", response_model=Attachment, status_code=status.HTTP_201_CREATED)
 async def upload_attachment(
     entity_type: str,
@@ -64,27 +191,85 @@ async def upload_attachment(
             detail="Organization required",
         )
     
-    # Create storage path: uploads/{organization_id}/{entity_type}/{entity_id}/{filename}
-    storage_path = UPLOAD_DIR / str(org_id) / entity_type / str(entity_id)
-    storage_path.mkdir(parents=True, exist_ok=True)
+    # Size and quota limits are enforced while the file is read in chunks
+    limit = await upload_limit(db, org_id)
+    _check_declared_size(file.size, limit)
+    
+    return await _store_upload(
+        upload_chunks(file), limit, org_id, entity_type, entity_id,
+        file.filename or "upload", file.content_type, db,
+    )
+
+
+@router.post("/stream", response_model=Attachment, status_code=status.HTTP_201_CREATED)
+async def upload_attachment_stream(
+    request: Request,
+    entity_type: str,
+    entity_id: UUID,
+    file_name: str,
+    current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload attachment from the raw request body (Content-Type is the file's
+    MIME type). The body is streamed straight to storage without multipart
+    buffering, so size limits apply as the bytes arrive.
+    """
+    user_roles = await get_user_roles(current_user, db)
+    org_id = current_user.organization_id
+    
+    if RoleEnum.SUPER_ADMIN not in user_roles and not org_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Organization required",
+        )
+    
+    limit = await upload_limit(db, org_id)
+    content_length = request.headers.get("content-length")
+    _check_declared_size(int(content_length) if content_length and content_length.isdigit() else None, limit)
     
-    # Save file
-    file_path = storage_path / file.filename
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    return await _store_upload(
+        request.stream(), limit, org_id, entity_type, entity_id,
+        file_name, request.headers.get("content-type"), db,
+    )
+
+
+@router.post("/from-content", response_model=Attachment, status_code=status.HTTP_201_CREATED)
+async def create_attachment_from_content(
+    attachment_data: AttachmentFromContent,
+    current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Attach content the caller can already read (an attachment of their
+    organization on an entity they may read), identified by its SHA-256,
+    without sending the bytes again. Returns 404 otherwise; the client then
+    uploads the file normally.
+    """
+    org_id = current_user.organization_id
+    existing = await find_readable_content(db, current_user, attachment_data.content_sha256, attachment_data.file_size_bytes)
+    
+    if not existing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found",
+        )
     
-    # Get file size
-    file_size = file_path.stat().st_size
+    # Counts against the quota like an upload of the same size
+    limit = await upload_limit(db, org_id)
+    _check_declared_size(existing.file_size_bytes, limit)
     
-    # Create attachment record
+    await lock_storage_key(db, existing.storage_key)
+    await reserve_quota(db, org_id, existing.file_size_bytes or 0)
     attachment = AttachmentModel(
         organization_id=org_id,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        storage_key=str(file_path.relative_to(UPLOAD_DIR)),  # Relative path for S3 migration
-        file_name=file.filename,
-        mime_type=file.content_type,
-        file_size_bytes=file_size,
+        entity_type=attachment_data.entity_type,
+        entity_id=attachment_data.entity_id,
+        storage_key=existing.storage_key,
+        file_name=Path(attachment_data.file_name).name or existing.file_name,
+        mime_type=attachment_data.mime_type or existing.mime_type,
+        file_size_bytes=existing.file_size_bytes,
+        content_sha256=existing.content_sha256,
     )
     db.add(attachment)
     await db.commit()
@@ -96,10 +281,19 @@ async def upload_attachment(
 @router.get("/{attachment_id}/download")
 async def download_attachment(
     attachment_id: UUID,
+    request: Request,
+    variant: AttachmentVariant = AttachmentVariant.ORIGINAL,
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
     db: AsyncSession = Depends(get_db)
 ):
-    """Download attachment file"""
+    """
+    Download attachment file. Supports conditional GET (If-None-Match /
+    If-Modified-Since -> 304, answered from metadata only) and single byte
+    ranges (Range / If-Range -> 206).
+    
+    ``variant=thumbnail|preview`` serves a downscaled JPEG of an image
+    attachment, rendered on first request if it does not exist yet.
+    """
     result = await db.execute(
         select(AttachmentModel).where(AttachmentModel.id == attachment_id)
     )
@@ -121,19 +315,83 @@ async def download_attachment(
                 detail="Access denied",
             )
     
-    # Build full file path
-    file_path = UPLOAD_DIR / attachment.storage_key
+    if variant != AttachmentVariant.ORIGINAL and not is_derivable(attachment.mime_type):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Variants are only available for image attachments",
+        )
+    
+    etag = _attachment_etag(attachment, variant)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(attachment.created_at),
+        "Cache-Control": DOWNLOAD_CACHE_CONTROL,
+    }
+    
+    if is_not_modified(request.headers, etag, attachment.created_at):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    if not file_path.exists():
+    storage_key = attachment.storage_key
+    file_name = attachment.file_name
+    media_type = attachment.mime_type or "application/octet-stream"
+    size = attachment.file_size_bytes
+    if variant != AttachmentVariant.ORIGINAL:
+        try:
+            storage_key = await ensure_derivative(attachment_storage, attachment.storage_key, variant)
+        except DerivativeError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Attachment is not a readable image",
+            )
+        if storage_key is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found",
+            )
+        file_name = f"{Path(attachment.file_name).stem}-{variant.value}.jpg"
+        media_type = DERIVATIVE_MIME_TYPE
+        size = None
+    
+    # Object stores serve the bytes directly through a short-lived URL
+    if settings.ATTACHMENT_DOWNLOAD_REDIRECT:
+        url = await attachment_storage.presign(storage_key, file_name, media_type)
+        if url:
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    
+    if not await attachment_storage.exists(storage_key):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found",
         )
     
-    return FileResponse(
-        path=str(file_path),
-        filename=attachment.file_name,
-        media_type=attachment.mime_type or "application/octet-stream",
+    headers["Content-Disposition"] = content_disposition(file_name)
+    if size is not None:
+        headers["Accept-Ranges"] = "bytes"
+        byte_range = requested_range(request.headers, size, etag, attachment.created_at)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                attachment_storage.stream(storage_key, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers,
+            )
+        headers["Content-Length"] = str(size)
+    
+    file_path = attachment_storage.local_path(storage_key)
+    if file_path:
+        return FileResponse(
+            path=str(file_path),
+            media_type=media_type,
+            headers=headers,
+        )
+    
+    return StreamingResponse(
+        attachment_storage.stream(storage_key),
+        media_type=media_type,
+        headers=headers,
     )
 
 
@@ -165,16 +423,34 @@ async def delete_attachment(
                 detail="Access denied",
             )
     
-    # Delete file
-    file_path = UPLOAD_DIR / attachment.storage_key
-    if file_path.exists():
-        file_path.unlink()
-    
-    # Delete record
-    from sqlalchemy import delete
-    from db.models_v2 import Attachment as AttachmentModel
+    # Delete record; the file goes only when no other attachment shares its content
+    storage_key = attachment.storage_key
+    await lock_storage_key(db, storage_key)
     await db.execute(delete(AttachmentModel).where(AttachmentModel.id == attachment_id))
+    orphaned = await count_references(db, storage_key) == 0
     await db.commit()
     
+    # Objects are removed only once the row is gone for good
+    if orphaned:
+        await _delete_unreferenced_blob(db, storage_key)
+    
     return None
 
+
+async def _delete_unreferenced_blob(db: AsyncSession, storage_key: str) -> None:
+    """
+    Remove a blob and its derivatives if still unreferenced. Re-checked under
+    the key's lock: an upload of the same content may have reused it since.
+    Failures are logged, leaving an orphaned object rather than failing the request.
+    """
+    await lock_storage_key(db, storage_key)
+    try:
+        if await count_references(db, storage_key) == 0:
+            for key in [storage_key, *derivative_storage_keys(storage_key)]:
+                try:
+                    await attachment_storage.delete(key)
+                except (StorageError, OSError):
+                    logger.exception("Failed to delete attachment object %s", key)
+    finally:
+        await db.commit()
+
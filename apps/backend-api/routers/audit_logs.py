@@ -1,15 +1,16 @@
 """
 Audit Log endpoints (super_admin only)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 from core.database import get_db
+from core.replicas import get_read_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
-from core.crud_helpers import apply_pagination
+from core.crud_helpers import apply_pagination, set_next_cursor, execute_page, TotalCountMode
 from schemas.audit_log import AuditLog, AuditLogCreate
 from db.models_v2 import AuditLog as AuditLogModel, User
 
@@ -18,14 +19,17 @@ router = APIRouter(prefix="/audit-logs", tags=["audit-logs"])
 
 @router.get("", response_model=List[AuditLog])
 async def list_audit_logs(
+    response: Response,
     organization_id: Optional[UUID] = None,
     actor_user_id: Optional[UUID] = None,
     entity_type: Optional[str] = None,
     action: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN], require_organization=False)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List audit logs (super_admin only) with pagination"""
     query = select(AuditLogModel)
@@ -40,11 +44,13 @@ async def list_audit_logs(
     if action:
         query = query.where(AuditLogModel.action == action)
     
-    query = apply_pagination(query, page, limit, AuditLogModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, AuditLogModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     audit_logs = result.scalars().all()
     
+    set_next_cursor(response, audit_logs, limit)
     return audit_logs
 
 
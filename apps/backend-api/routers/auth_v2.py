@@ -11,7 +11,10 @@ from core.auth_v2 import (
     get_password_hash,
     create_access_token,
     get_current_user_v2,
+    get_current_principal_from_db,
     get_user_roles,
+    compute_role_version,
+    Principal,
     RoleEnum,
 )
 from schemas.auth import Token, CurrentUser
@@ -58,13 +61,14 @@ async def login_v2(
     # Get user roles
     roles = await get_user_roles(user, db)
     
-    # Create JWT token
+    # Create JWT token (rv lets read endpoints trust the roles claim statelessly)
     access_token = create_access_token(
         data={
             "sub": str(user.id),
             "email": user.email,
             "roles": roles,
             "organization_id": str(user.organization_id) if user.organization_id else None,
+            "rv": compute_role_version(user.status, roles, user.organization_id),
         },
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
@@ -74,23 +78,16 @@ async def login_v2(
 
 @router.get("/me", response_model=CurrentUser)
 async def get_me_v2(
-    current_user: User = Depends(get_current_user_v2),
-    db: AsyncSession = Depends(get_db)
+    principal: Principal = Depends(get_current_principal_from_db),
 ):
     """Get current user information"""
-    # Get user roles with role details
-    result = await db.execute(
-        select(UserRole)
-        .options(selectinload(UserRole.role))
-        .where(UserRole.user_id == current_user.id)
-    )
-    user_roles = result.scalars().all()
+    current_user = principal.user
     
-    roles = [ur.role for ur in user_roles]
+    # Role details were loaded together with the user when resolving the principal
+    roles = [ur.role for ur in current_user.user_roles if ur.role is not None]
     
     return CurrentUser(
         user=current_user,
         roles=roles,
-        organization_id=current_user.organization_id,
+        organization_id=principal.organization_id,
     )
-
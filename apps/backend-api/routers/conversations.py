@@ -1,16 +1,24 @@
 """
 Conversation and Message endpoints (v2)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, or_, true
+from sqlalchemy.orm import aliased
 from typing import List, Optional
 from uuid import UUID
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
-from core.crud_helpers import apply_pagination
-from schemas.conversation import Conversation, ConversationCreate, ConversationUpdate, Message, MessageCreate
+from core.crud_helpers import apply_pagination, set_next_cursor, execute_page, TotalCountMode
+from core.unread_counts import invalidate_unread_counts, mark_conversation_read, record_message
+from schemas.conversation import (
+    Conversation,
+    ConversationCreate,
+    ConversationSummary,
+    ConversationUpdate,
+    Message,
+    MessageCreate,
+)
 from db.models_v2 import (
     Conversation as ConversationModel,
     ConversationParticipant as ParticipantModel,
@@ -22,17 +30,40 @@ from db.models_v2 import (
 router = APIRouter(prefix="/conversations", tags=["conversations"])
 
 
-@router.get("", response_model=List[Conversation])
+def _latest_message(conversation_id):
+    """Newest message of a conversation (one probe of idx_messages_conversation_created_id)"""
+    return select(MessageModel).where(
+        MessageModel.conversation_id == conversation_id
+    ).order_by(
+        MessageModel.created_at.desc(), MessageModel.id.desc()
+    ).limit(1)
+
+
+def _summary(conversation, unread_count: int, last_message) -> ConversationSummary:
+    return ConversationSummary(
+        **Conversation.model_validate(conversation).model_dump(),
+        last_message=last_message,
+        unread_count=unread_count,
+    )
+
+
+@router.get("", response_model=List[ConversationSummary])
 async def list_conversations(
+    response: Response,
     organization_id: Optional[UUID] = Query(None),
     entity_type: Optional[str] = Query(None),
     entity_id: Optional[UUID] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
     db: AsyncSession = Depends(get_db)
 ):
-    """List conversations (user sees only conversations they're part of) with pagination"""
+    """
+    List conversations (user sees only conversations they're part of) with
+    pagination, each with its last message and the user's unread count
+    """
     user_roles = await get_user_roles(current_user, db)
     
     # Get conversations where user is a participant
@@ -40,8 +71,6 @@ async def list_conversations(
         ParticipantModel, ConversationModel.id == ParticipantModel.conversation_id
     ).where(
         ParticipantModel.user_id == current_user.id
-    ).options(
-        selectinload(ConversationModel.messages)
     )
     
     # Filter by organization
@@ -57,15 +86,23 @@ async def list_conversations(
     if entity_id:
         query = query.where(ConversationModel.entity_id == entity_id)
     
-    query = apply_pagination(query, page, limit, ConversationModel.created_at.desc())
+    count_query = query
     
-    result = await db.execute(query)
-    conversations = result.scalars().unique().all()
+    # Only the latest message per conversation, however long the history
+    last_message = aliased(MessageModel, _latest_message(ConversationModel.id).lateral("last_message"))
+    query = query.add_columns(
+        ParticipantModel.unread_count, last_message
+    ).outerjoin(last_message, true())
+    query = apply_pagination(query, page, limit, ConversationModel.created_at.desc(), cursor)
+    
+    result = await execute_page(db, query, response, count_query, include_total)
+    rows = result.all()
     
-    return conversations
+    set_next_cursor(response, [row[0] for row in rows], limit)
+    return [_summary(conversation, unread_count, message) for conversation, unread_count, message in rows]
 
 
-@router.get("/{conversation_id}", response_model=Conversation)
+@router.get("/{conversation_id}", response_model=ConversationSummary)
 async def get_conversation(
     conversation_id: UUID,
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
@@ -83,19 +120,17 @@ async def get_conversation(
     if not participant:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
     
-    query = select(ConversationModel).where(
-        ConversationModel.id == conversation_id
-    ).options(
-        selectinload(ConversationModel.messages)
-    )
-    
+    query = select(ConversationModel).where(ConversationModel.id == conversation_id)
     result = await db.execute(query)
     conversation = result.scalar_one_or_none()
     
     if not conversation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
     
-    return conversation
+    result = await db.execute(_latest_message(conversation_id))
+    last_message = result.scalar_one_or_none()
+    
+    return _summary(conversation, participant.unread_count, last_message)
 
 
 @router.post("", response_model=Conversation, status_code=status.HTTP_201_CREATED)
@@ -209,19 +244,52 @@ async def create_message(
     )
     
     db.add(message)
+    recipients = await record_message(db, conversation_id, current_user.id)
     await db.commit()
+    invalidate_unread_counts(recipients)
     await db.refresh(message)
     
     return message
 
 
+@router.post("/{conversation_id}/read", status_code=status.HTTP_204_NO_CONTENT)
+async def mark_conversation_as_read(
+    conversation_id: UUID,
+    current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark every message in the conversation as read for the current user"""
+    participant_query = select(ParticipantModel).where(
+        ParticipantModel.conversation_id == conversation_id,
+        ParticipantModel.user_id == current_user.id
+    )
+    participant_result = await db.execute(participant_query)
+    participant = participant_result.scalar_one_or_none()
+    
+    if not participant:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    
+    await mark_conversation_read(db, participant)
+    await db.commit()
+    invalidate_unread_counts([current_user.id])
+    
+    return None
+
+
 @router.get("/{conversation_id}/messages", response_model=List[Message])
 async def list_messages(
     conversation_id: UUID,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (older messages)"),
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
     db: AsyncSession = Depends(get_db)
 ):
-    """List messages in conversation"""
+    """
+    List messages in conversation, newest first. Pages through older messages
+    with the X-Next-Cursor header, so each page costs the same however long the
+    conversation is.
+    """
     # Check if user is a participant
     participant_query = select(ParticipantModel).where(
         ParticipantModel.conversation_id == conversation_id,
@@ -233,12 +301,12 @@ async def list_messages(
     if not participant:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
     
-    query = select(MessageModel).where(
-        MessageModel.conversation_id == conversation_id
-    ).order_by(MessageModel.created_at)
+    query = select(MessageModel).where(MessageModel.conversation_id == conversation_id)
+    query = apply_pagination(query, 1, limit, MessageModel.created_at.desc(), cursor)
     
     result = await db.execute(query)
     messages = result.scalars().all()
     
+    set_next_cursor(response, messages, limit)
     return messages
 
@@ -1,7 +1,7 @@
 """
 Form endpoints (v2)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -10,7 +10,7 @@ from uuid import UUID
 from datetime import datetime
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
-from core.crud_helpers import apply_pagination
+from core.crud_helpers import apply_pagination, set_next_cursor, execute_page, TotalCountMode
 from schemas.form import Form, FormCreate, FormUpdate, FormSignature, FormSignatureCreate
 from db.models_v2 import (
     Form as FormModel,
@@ -24,12 +24,15 @@ router = APIRouter(prefix="/forms", tags=["forms"])
 
 @router.get("", response_model=List[Form])
 async def list_forms(
+    response: Response,
     organization_id: Optional[UUID] = Query(None),
     form_type: Optional[str] = Query(None),
     entity_type: Optional[str] = Query(None),
     entity_id: Optional[UUID] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT], require_organization=True)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -53,11 +56,13 @@ async def list_forms(
     if entity_id:
         query = query.where(FormModel.entity_id == entity_id)
     
-    query = apply_pagination(query, page, limit, FormModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, FormModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     forms = result.scalars().all()
     
+    set_next_cursor(response, forms, limit)
     return forms
 
 
@@ -2,8 +2,14 @@
 Health check endpoints
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from datetime import datetime
+from core.auth_v2 import RoleEnum, identity_cache, require_role_v2, role_version_cache
+from core.search import search_cache
+from core.unread_counts import unread_count_cache
+from core.notification_hub import notification_hub
+from core.database import engine, pool_stats
+from core.replicas import recent_writers, replica_router
 
 router = APIRouter()
 
@@ -27,3 +33,23 @@ async def readiness_check():
         "timestamp": datetime.utcnow().isoformat(),
     }
 
+
+
+@router.get("/metrics", dependencies=[Depends(require_role_v2([RoleEnum.SUPER_ADMIN]))])
+async def metrics():
+    """In-process cache and resource metrics for this worker (super admins only)"""
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "caches": {
+            "identity": identity_cache.stats(),
+            "role_versions": role_version_cache.stats(),
+            "recent_writers": recent_writers.stats(),
+            "search": search_cache.stats(),
+            "unread_counts": unread_count_cache.stats(),
+        },
+        "database_pools": {
+            "primary": pool_stats(engine),
+        },
+        "read_replicas": replica_router.stats(),
+        "notification_streams": notification_hub.stats(),
+    }
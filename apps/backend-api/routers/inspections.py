@@ -1,7 +1,7 @@
 """
 Inspection endpoints (v2)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
@@ -9,7 +9,7 @@ from uuid import UUID
 from datetime import date
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
-from core.crud_helpers import apply_pagination
+from core.crud_helpers import apply_pagination, set_next_cursor, execute_page, TotalCountMode
 from schemas.inspection import Inspection, InspectionCreate, InspectionUpdate
 from db.models_v2 import Inspection as InspectionModel, User, Organization
 
@@ -18,11 +18,14 @@ router = APIRouter(prefix="/inspections", tags=["inspections"])
 
 @router.get("", response_model=List[Inspection])
 async def list_inspections(
+    response: Response,
     organization_id: Optional[UUID] = Query(None),
     property_id: Optional[UUID] = Query(None),
     status_filter: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT], require_organization=True)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -44,11 +47,13 @@ async def list_inspections(
     if status_filter:
         query = query.where(InspectionModel.status == status_filter)
     
-    query = apply_pagination(query, page, limit, InspectionModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, InspectionModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     inspections = result.scalars().all()
     
+    set_next_cursor(response, inspections, limit)
     return inspections
 
 
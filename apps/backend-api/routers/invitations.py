@@ -1,7 +1,7 @@
 """
 Invitation endpoints (v2)
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
@@ -10,7 +10,7 @@ from datetime import datetime, timedelta
 import secrets
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
-from core.crud_helpers import apply_pagination
+from core.crud_helpers import apply_pagination, set_next_cursor, execute_page, TotalCountMode
 from schemas.invitation import Invitation, InvitationCreate, InvitationUpdate
 from db.models_v2 import Invitation as InvitationModel, User, Organization
 
@@ -19,10 +19,13 @@ router = APIRouter(prefix="/invitations", tags=["invitations"])
 
 @router.get("", response_model=List[Invitation])
 async def list_invitations(
+    response: Response,
     organization_id: Optional[UUID] = Query(None),
     status_filter: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD], require_organization=True)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -42,11 +45,13 @@ async def list_invitations(
     if status_filter:
         query = query.where(InvitationModel.status == status_filter)
     
-    query = apply_pagination(query, page, limit, InvitationModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, InvitationModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     invitations = result.scalars().all()
     
+    set_next_cursor(response, invitations, limit)
     return invitations
 
 
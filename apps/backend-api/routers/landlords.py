@@ -1,7 +1,7 @@
 """
 Landlord endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from typing import List, Optional
@@ -9,13 +9,18 @@ from uuid import UUID
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum
 from core.rbac import require_permission, PermissionAction, ResourceType
+from core.access_scope import refresh_access_scopes
+from core.search import invalidate_search_cache
 from core.crud_helpers import (
     apply_organization_filter,
     check_organization_access,
     verify_organization_access_for_create,
     get_entity_or_404,
     update_entity_fields,
-    apply_pagination
+    apply_pagination,
+    set_next_cursor,
+    execute_page,
+    TotalCountMode,
 )
 from schemas.landlord import Landlord, LandlordCreate, LandlordUpdate
 from db.models_v2 import Landlord as LandlordModel, User, Organization
@@ -25,9 +30,12 @@ router = APIRouter(prefix="/landlords", tags=["landlords"])
 
 @router.get("", response_model=List[Landlord])
 async def list_landlords(
+    response: Response,
     organization_id: Optional[UUID] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_permission(PermissionAction.READ, ResourceType.LANDLORD)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -36,11 +44,13 @@ async def list_landlords(
     
     query = select(LandlordModel)
     query = await apply_organization_filter(query, LandlordModel, current_user, user_roles, organization_id)
-    query = apply_pagination(query, page, limit, LandlordModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, LandlordModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     landlords = result.scalars().all()
     
+    set_next_cursor(response, landlords, limit)
     return landlords
 
 
@@ -65,6 +75,7 @@ async def create_landlord(
     landlord = LandlordModel(**landlord_data.dict())
     db.add(landlord)
     await db.commit()
+    invalidate_search_cache(landlord.organization_id)
     await db.refresh(landlord)
     
     return landlord
@@ -98,9 +109,14 @@ async def update_landlord(
     
     # Update fields
     update_data = landlord_data.dict(exclude_unset=True)
+    previous_user_id = landlord.user_id
     await update_entity_fields(landlord, update_data)
     
+    # Re-linking the record to another user moves its access scope
+    if "user_id" in update_data:
+        await refresh_access_scopes(db, [previous_user_id, landlord.user_id])
     await db.commit()
+    invalidate_search_cache(landlord.organization_id)
     await db.refresh(landlord)
     
     return landlord
@@ -118,7 +134,9 @@ async def delete_landlord(
     await check_organization_access(landlord, current_user, user_roles)
     
     await db.execute(delete(LandlordModel).where(LandlordModel.id == landlord_id))
+    await refresh_access_scopes(db, [landlord.user_id])
     await db.commit()
+    invalidate_search_cache(landlord.organization_id)
     
     return None
 
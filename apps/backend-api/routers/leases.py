@@ -1,7 +1,7 @@
 """
 Lease endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
 from sqlalchemy.orm import selectinload
@@ -10,21 +10,26 @@ from uuid import UUID
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
 from core.rbac import require_permission, PermissionAction, ResourceType
-from core.crud_helpers import apply_organization_filter, apply_pagination
+from core.crud_helpers import apply_organization_filter, apply_pagination, set_next_cursor, execute_page, TotalCountMode
+from core.access_scope import SCOPE_LEASE, join_access_scope, lease_scope_user_ids, refresh_access_scopes, scoped_ids
+from core.search import invalidate_search_cache
 from schemas.lease import Lease, LeaseCreate, LeaseUpdate, LeaseWithTenants, LeaseRenewalRequest, LeaseTerminationRequest
-from db.models_v2 import Lease as LeaseModel, LeaseTenant, Unit, Property, Tenant, User, Landlord
+from db.models_v2 import Lease as LeaseModel, LeaseTenant, Unit, Property, Tenant, User, Landlord, UserAccessScope
 
 router = APIRouter(prefix="/leases", tags=["leases"])
 
 
 @router.get("", response_model=List[Lease])
 async def list_leases(
+    response: Response,
     organization_id: Optional[UUID] = None,
     unit_id: Optional[UUID] = None,
     tenant_id: Optional[UUID] = None,
     landlord_id: Optional[UUID] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_permission(PermissionAction.READ, ResourceType.LEASE)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -44,7 +49,9 @@ async def list_leases(
     if unit_id:
         query = query.where(LeaseModel.unit_id == unit_id)
     if tenant_id:
-        query = query.where(LeaseModel.tenant_id == tenant_id)
+        query = query.where(
+            LeaseModel.id.in_(select(LeaseTenant.lease_id).where(LeaseTenant.tenant_id == tenant_id))
+        )
     if landlord_id:
         query = query.where(LeaseModel.landlord_id == landlord_id)
     
@@ -53,29 +60,22 @@ async def list_leases(
         # Non-super users can only see their organization's leases
         query = query.where(LeaseModel.organization_id == current_user.organization_id)
         
-        # Tenants can only see their own leases
+        # Tenants can only see their own leases (precomputed access scope)
         if RoleEnum.TENANT in user_roles:
-            # Get tenant record for current user
-            tenant_result = await db.execute(
-                select(Tenant).where(Tenant.user_id == current_user.id)
-            )
-            tenant = tenant_result.scalar_one_or_none()
-            if tenant:
-                query = query.where(LeaseModel.tenant_id == tenant.id)
-            else:
-                # No tenant record, return empty
-                return []
+            query = join_access_scope(query, LeaseModel.id, current_user.id, RoleEnum.TENANT, SCOPE_LEASE)
     else:
         # Super admin can filter by organization_id if provided
         if organization_id:
             query = query.where(LeaseModel.organization_id == organization_id)
     
     # Apply pagination
-    query = apply_pagination(query, page, limit, LeaseModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, LeaseModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     leases = result.scalars().all()
     
+    set_next_cursor(response, leases, limit)
     return leases
 
 
@@ -131,7 +131,9 @@ async def create_lease(
     )
     db.add(lease_tenant)
     
+    await refresh_access_scopes(db, await lease_scope_user_ids(db, lease.id))
     await db.commit()
+    invalidate_search_cache(lease.organization_id)
     await db.refresh(lease)
     
     return lease
@@ -175,11 +177,10 @@ async def get_lease(
         
         # Tenants can only see their own leases
         if RoleEnum.TENANT in user_roles:
-            tenant_result = await db.execute(
-                select(Tenant).where(Tenant.user_id == current_user.id)
+            scope_result = await db.execute(
+                scoped_ids(current_user.id, RoleEnum.TENANT, SCOPE_LEASE).where(UserAccessScope.resource_id == lease.id)
             )
-            tenant = tenant_result.scalar_one_or_none()
-            if not tenant or lease.tenant_id != tenant.id:
+            if scope_result.scalar_one_or_none() is None:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Access denied",
@@ -222,7 +223,10 @@ async def update_lease(
     for field, value in update_data.items():
         setattr(lease, field, value)
     
+    if "landlord_id" in update_data:
+        await refresh_access_scopes(db, await lease_scope_user_ids(db, lease.id))
     await db.commit()
+    invalidate_search_cache(lease.organization_id)
     await db.refresh(lease)
     
     return lease
@@ -256,8 +260,11 @@ async def delete_lease(
                 detail="Access denied",
             )
     
+    scope_user_ids = await lease_scope_user_ids(db, lease_id)
     await db.execute(delete(LeaseModel).where(LeaseModel.id == lease_id))
+    await refresh_access_scopes(db, scope_user_ids)
     await db.commit()
+    invalidate_search_cache(lease.organization_id)
     
     return None
 
@@ -346,6 +353,7 @@ async def renew_lease(
         lease.status = 'terminated'
     
     await db.commit()
+    invalidate_search_cache(lease.organization_id)
     await db.refresh(lease)
     
     return lease
@@ -1,44 +1,116 @@
 """
 Notification endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 from datetime import datetime
+from core.config import settings
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum
-from schemas.notification import Notification, NotificationCreate, NotificationUpdate
-from db.models_v2 import Notification as NotificationModel, User
+from core.crud_helpers import apply_pagination, set_next_cursor, execute_page, TotalCountMode
+from core.notification_broadcast import count_recipients, schedule_notification_job, send_broadcast
+from core.notification_hub import format_sse, notification_hub, publish_event
+from core.notification_retention import live_window_start
+from core.unread_counts import adjust_unread_counts, get_unread_counts, invalidate_unread_counts
+from schemas.notification import (
+    Notification,
+    NotificationBroadcast,
+    NotificationBroadcastResult,
+    NotificationCreate,
+    NotificationJob,
+    NotificationUpdate,
+    UnreadCounts,
+)
+from db.models_v2 import Notification as NotificationModel, NotificationJob as NotificationJobModel, User
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
 @router.get("", response_model=List[Notification])
 async def list_notifications(
+    response: Response,
     is_read: Optional[bool] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(get_current_user_v2),
     db: AsyncSession = Depends(get_db)
 ):
     """List notifications for current user with pagination"""
-    query = select(NotificationModel).where(NotificationModel.user_id == current_user.id)
+    # The created_at bound lets Postgres skip partitions past retention
+    query = select(NotificationModel).where(
+        NotificationModel.user_id == current_user.id,
+        NotificationModel.created_at >= live_window_start()
+    )
     
     if is_read is not None:
         query = query.where(NotificationModel.is_read == is_read)
     
     # Apply pagination
-    offset = (page - 1) * limit
-    query = query.order_by(NotificationModel.created_at.desc()).offset(offset).limit(limit)
+    count_query = query
+    query = apply_pagination(query, page, limit, NotificationModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     notifications = result.scalars().all()
     
+    set_next_cursor(response, notifications, limit)
     return notifications
 
 
+async def _event_stream(user_id: UUID) -> AsyncIterator[str]:
+    """SSE messages for one client until it disconnects (the response task is then cancelled)"""
+    queue = notification_hub.subscribe(user_id)
+    try:
+        # Reconnect delay for EventSource clients; also flushes the headers
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.NOTIFICATION_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            data = message["data"]
+            yield format_sse(message["event"], data, data.get("id"))
+    finally:
+        notification_hub.unsubscribe(user_id, queue)
+
+
+@router.get("/unread-count", response_model=UnreadCounts)
+async def get_unread_count(
+    current_user: User = Depends(get_current_user_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    """Unread notification and message counts (maintained counters, no row counting)"""
+    return await get_unread_counts(db, current_user.id)
+
+
+@router.get("/stream")
+async def stream_notifications(
+    current_user: User = Depends(get_current_user_v2),
+):
+    """
+    Server-Sent Events stream of the current user's notification changes
+    (``notification``, ``notification_read``, ``notifications_read_all``,
+    ``resync``). Replaces polling: fetch the list once after connecting and
+    again on ``resync``. Holds no database connection while open.
+    """
+    return StreamingResponse(
+        _event_stream(current_user.id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable response buffering in nginx-style proxies
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.post("", response_model=Notification, status_code=status.HTTP_201_CREATED)
 async def create_notification(
     notification_data: NotificationCreate,
@@ -57,12 +129,100 @@ async def create_notification(
     
     notification = NotificationModel(**notification_data.dict())
     db.add(notification)
-    await db.commit()
+    await db.flush()
     await db.refresh(notification)
     
+    # Delivered to the recipient's open streams when the insert commits
+    await publish_event(
+        db, notification.user_id, "notification",
+        Notification.model_validate(notification).model_dump(mode="json"),
+    )
+    if not notification.is_read:
+        await adjust_unread_counts(db, [notification.user_id], notifications=1)
+    await db.commit()
+    invalidate_unread_counts([notification.user_id])
+    
     return notification
 
 
+@router.post("/broadcast", response_model=NotificationBroadcastResult, status_code=status.HTTP_201_CREATED)
+async def broadcast_notification(
+    broadcast: NotificationBroadcast,
+    response: Response,
+    current_user: User = Depends(get_current_user_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Notify every user of an audience. Small audiences are sent within the
+    request (201, ``completed``); larger ones are queued as a background job
+    (202, ``queued``) that can be polled at ``/notifications/jobs/{job_id}``.
+    """
+    user_roles = await get_user_roles(current_user, db)
+    
+    if not any(role in [RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM] for role in user_roles):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins and PMs can broadcast notifications",
+        )
+    
+    if RoleEnum.SUPER_ADMIN not in user_roles:
+        if broadcast.audience.organization_id != current_user.organization_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied",
+            )
+    
+    recipient_count = await count_recipients(db, broadcast.audience)
+    
+    if recipient_count <= settings.NOTIFICATION_BROADCAST_INLINE_LIMIT:
+        user_ids = await send_broadcast(db, broadcast)
+        await db.commit()
+        invalidate_unread_counts(user_ids)
+        return NotificationBroadcastResult(status="completed", recipient_count=len(user_ids))
+    
+    job = NotificationJobModel(
+        organization_id=broadcast.audience.organization_id,
+        created_by_user_id=current_user.id,
+        audience=broadcast.audience.model_dump(mode="json"),
+        entity_type=broadcast.entity_type,
+        entity_id=broadcast.entity_id,
+        type=broadcast.type,
+        status="queued",
+        recipient_count=recipient_count,
+        sent_count=0,
+    )
+    db.add(job)
+    await db.commit()
+    schedule_notification_job(job.id)
+    
+    response.status_code = status.HTTP_202_ACCEPTED
+    return NotificationBroadcastResult(status="queued", recipient_count=recipient_count, job_id=job.id)
+
+
+@router.get("/jobs/{job_id}", response_model=NotificationJob)
+async def get_notification_job(
+    job_id: UUID,
+    current_user: User = Depends(get_current_user_v2),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress of a queued broadcast"""
+    user_roles = await get_user_roles(current_user, db)
+    
+    query = select(NotificationJobModel).where(NotificationJobModel.id == job_id)
+    if RoleEnum.SUPER_ADMIN not in user_roles:
+        query = query.where(NotificationJobModel.organization_id == current_user.organization_id)
+    result = await db.execute(query)
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification job not found",
+        )
+    
+    return job
+
+
 @router.patch("/{notification_id}/read", response_model=Notification)
 async def mark_notification_read(
     notification_id: UUID,
@@ -73,7 +233,8 @@ async def mark_notification_read(
     result = await db.execute(
         select(NotificationModel).where(
             NotificationModel.id == notification_id,
-            NotificationModel.user_id == current_user.id
+            NotificationModel.user_id == current_user.id,
+            NotificationModel.created_at >= live_window_start()
         )
     )
     notification = result.scalar_one_or_none()
@@ -84,10 +245,29 @@ async def mark_notification_read(
             detail="Notification not found",
         )
     
-    notification.is_read = True
-    notification.read_at = datetime.utcnow()
+    if notification.is_read:
+        return notification
     
+    # Conditional update: of concurrent requests, only one decrements the counter
+    read_at = datetime.utcnow()
+    result = await db.execute(
+        update(NotificationModel)
+        .where(
+            NotificationModel.id == notification_id,
+            NotificationModel.created_at == notification.created_at,
+            NotificationModel.is_read == False
+        )
+        .values(is_read=True, read_at=read_at)
+    )
+    if result.rowcount:
+        # Other open tabs/devices update their badges
+        await publish_event(
+            db, current_user.id, "notification_read",
+            {"id": str(notification.id), "read_at": read_at.isoformat()},
+        )
+        await adjust_unread_counts(db, [current_user.id], notifications=-1)
     await db.commit()
+    invalidate_unread_counts([current_user.id])
     await db.refresh(notification)
     
     return notification
@@ -99,15 +279,21 @@ async def mark_all_notifications_read(
     db: AsyncSession = Depends(get_db)
 ):
     """Mark all notifications as read for current user"""
-    await db.execute(
+    read_at = datetime.utcnow()
+    result = await db.execute(
         update(NotificationModel)
         .where(
             NotificationModel.user_id == current_user.id,
+            NotificationModel.created_at >= live_window_start(),
             NotificationModel.is_read == False
         )
-        .values(is_read=True, read_at=datetime.utcnow())
+        .values(is_read=True, read_at=read_at)
     )
+    await publish_event(db, current_user.id, "notifications_read_all", {"read_at": read_at.isoformat()})
+    # By the rows actually updated, so notifications created concurrently stay counted
+    await adjust_unread_counts(db, [current_user.id], notifications=-result.rowcount)
     await db.commit()
+    invalidate_unread_counts([current_user.id])
     
     return None
 
@@ -122,7 +308,8 @@ async def get_notification(
     result = await db.execute(
         select(NotificationModel).where(
             NotificationModel.id == notification_id,
-            NotificationModel.user_id == current_user.id
+            NotificationModel.user_id == current_user.id,
+            NotificationModel.created_at >= live_window_start()
         )
     )
     notification = result.scalar_one_or_none()
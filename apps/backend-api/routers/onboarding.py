@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from core.database import get_db
-from core.auth_v2 import get_current_user_v2
+from core.auth_v2 import get_current_user_v2, get_current_principal_from_db, invalidate_identity, Principal
 from schemas.user import OnboardingUpdate
 from db.models_v2 import User
 from uuid import UUID
@@ -15,10 +15,10 @@ router = APIRouter(prefix="/onboarding", tags=["onboarding"])
 
 @router.get("/status")
 async def get_onboarding_status(
-    current_user: User = Depends(get_current_user_v2),
-    db: AsyncSession = Depends(get_db)
+    principal: Principal = Depends(get_current_principal_from_db),
 ):
     """Get current user's onboarding status"""
+    current_user = principal.user
     return {
         "onboarding_completed": current_user.onboarding_completed,
         "onboarding_step": current_user.onboarding_step,
@@ -63,6 +63,7 @@ async def update_onboarding_status(
         .values(**update_data)
     )
     await db.commit()
+    invalidate_identity(current_user.id)
     
     # Refresh user object
     result = await db.execute(
@@ -92,6 +93,7 @@ async def complete_onboarding(
         )
     )
     await db.commit()
+    invalidate_identity(current_user.id)
     
     return {
         "onboarding_completed": True,
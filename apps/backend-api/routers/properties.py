@@ -1,13 +1,14 @@
 """
 Property endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from uuid import UUID
 from core.database import get_db
+from core.replicas import get_read_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum
 from core.rbac import require_permission, PermissionAction, ResourceType
 from core.crud_helpers import (
@@ -16,8 +17,13 @@ from core.crud_helpers import (
     verify_organization_access_for_create,
     get_entity_or_404,
     update_entity_fields,
-    apply_pagination
+    apply_pagination,
+    set_next_cursor,
+    execute_page,
+    TotalCountMode,
 )
+from core.access_scope import property_scope_user_ids, refresh_access_scopes
+from core.search import invalidate_search_cache
 from schemas.property import Property, PropertyCreate, PropertyUpdate
 from db.models_v2 import Property as PropertyModel, User, Organization, Landlord, Unit
 
@@ -26,11 +32,14 @@ router = APIRouter(prefix="/properties", tags=["properties"])
 
 @router.get("", response_model=List[Property])
 async def list_properties(
+    response: Response,
     organization_id: Optional[UUID] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_permission(PermissionAction.READ, ResourceType.PROPERTY)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List properties (scoped by organization) with pagination"""
     user_roles = await get_user_roles(current_user, db)
@@ -43,11 +52,13 @@ async def list_properties(
         # selectinload(PropertyModel.units),
     )
     query = await apply_organization_filter(query, PropertyModel, current_user, user_roles, organization_id)
-    query = apply_pagination(query, page, limit, PropertyModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, PropertyModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     properties = result.scalars().all()
     
+    set_next_cursor(response, properties, limit)
     return properties
 
 
@@ -71,7 +82,10 @@ async def create_property(
     
     property_obj = PropertyModel(**property_data.dict())
     db.add(property_obj)
+    await db.flush()
+    await refresh_access_scopes(db, await property_scope_user_ids(db, property_obj.id))
     await db.commit()
+    invalidate_search_cache(property_obj.organization_id)
     await db.refresh(property_obj)
     
     return property_obj
@@ -1,13 +1,31 @@
 """
 Global search endpoint - searches across multiple entities
+
+Matching uses the GIN-indexed ``search_vector`` columns (prefix tsquery, ranked
+with ts_rank) instead of ILIKE scans; leases are found by id prefix or by
+their property. ``mode=similarity`` matches names, emails and addresses
+fuzzily through trigram indexes instead.
+
+Entity types are searched concurrently, each on its own pooled connection
+and within SEARCH_ENTITY_TIMEOUT_SECONDS; types that miss the deadline are
+reported in ``timed_out`` and the rest are returned.
+
+Complete responses are cached (core.search.search_cache) per organization,
+role scope, type, mode and normalized query, so repeated type-ahead prefixes
+skip the database until a write to a searched entity invalidates them.
 """
+import asyncio
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from typing import Optional
-from uuid import UUID
-from core.database import get_db
-from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
+from sqlalchemy import select
+from typing import List, Optional
+from core.config import settings
+from core.replicas import get_read_db
+from core.auth_v2 import get_user_roles, RoleEnum, require_role_v2
+from core.search import (
+    ALL_ORGANIZATIONS, SearchMode, SearchTerms, build_search_terms, search_cache, search_cache_generation,
+    search_cache_key, similarity_match, store_search_results, text_match, uuid_prefix_range,
+)
 from db.models_v2 import (
     Property, Unit, Lease, WorkOrder, Tenant, Landlord, Vendor
 )
@@ -15,93 +33,200 @@ from db.models_v2 import User
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+# Trigram-indexed columns used in similarity mode (migration 012); other
+# entities keep full-text matching in that mode
+SIMILARITY_COLUMNS = {
+    Property: (Property.name, Property.address_line1, Property.city),
+    Tenant: (Tenant.name, Tenant.email),
+    Landlord: (Landlord.name, Landlord.email),
+    Vendor: (Vendor.company_name,),
+}
+
+
+def _scope_to_organization(query, model, current_user: User, user_roles: List[str]):
+    if RoleEnum.SUPER_ADMIN not in user_roles:
+        query = query.where(model.organization_id == current_user.organization_id)
+    return query
+
+
+def _role_scope(current_user: User, user_roles: List[str]) -> str:
+    """What, besides the organization, determines the rows a search may return"""
+    if RoleEnum.SUPER_ADMIN in user_roles:
+        return ALL_ORGANIZATIONS
+    if RoleEnum.TENANT in user_roles:
+        # Tenants only see their own work orders
+        return f"tenant:{current_user.id}"
+    return "organization"
+
+
+def _match(model, terms: SearchTerms):
+    """``(condition, rank)`` for the model, or None when the query has nothing to match"""
+    if terms.similarity and model in SIMILARITY_COLUMNS:
+        return similarity_match(SIMILARITY_COLUMNS[model], terms.similarity)
+    if terms.tsquery:
+        return text_match(model.search_vector, terms.tsquery)
+    return None
+
+
+async def _search_properties(db: AsyncSession, terms: SearchTerms, current_user: User, user_roles: List[str], limit: int) -> List[dict]:
+    match = _match(Property, terms)
+    if match is None:
+        return []
+    condition, rank = match
+    query = _scope_to_organization(select(Property), Property, current_user, user_roles)
+    query = query.where(condition).order_by(rank.desc(), Property.id).limit(limit)
+    result = await db.execute(query)
+    return [{"id": str(p.id), "name": p.name or p.address_line1, "address": p.address_line1} for p in result.scalars().all()]
+
+
+async def _search_tenants(db: AsyncSession, terms: SearchTerms, current_user: User, user_roles: List[str], limit: int) -> List[dict]:
+    match = _match(Tenant, terms)
+    if match is None:
+        return []
+    condition, rank = match
+    query = _scope_to_organization(select(Tenant), Tenant, current_user, user_roles)
+    query = query.where(condition).order_by(rank.desc(), Tenant.id).limit(limit)
+    result = await db.execute(query)
+    return [{"id": str(t.id), "name": t.name, "email": t.email} for t in result.scalars().all()]
+
+
+async def _search_landlords(db: AsyncSession, terms: SearchTerms, current_user: User, user_roles: List[str], limit: int) -> List[dict]:
+    match = _match(Landlord, terms)
+    if match is None:
+        return []
+    condition, rank = match
+    query = _scope_to_organization(select(Landlord), Landlord, current_user, user_roles)
+    query = query.where(condition).order_by(rank.desc(), Landlord.id).limit(limit)
+    result = await db.execute(query)
+    return [{"id": str(l.id), "name": l.name, "email": l.email} for l in result.scalars().all()]
+
+
+async def _search_vendors(db: AsyncSession, terms: SearchTerms, current_user: User, user_roles: List[str], limit: int) -> List[dict]:
+    match = _match(Vendor, terms)
+    if match is None:
+        return []
+    condition, rank = match
+    query = _scope_to_organization(select(Vendor), Vendor, current_user, user_roles)
+    query = query.where(condition).order_by(rank.desc(), Vendor.id).limit(limit)
+    result = await db.execute(query)
+    return [{"id": str(v.id), "name": v.company_name, "email": v.email} for v in result.scalars().all()]
+
+
+async def _search_leases(db: AsyncSession, terms: SearchTerms, current_user: User, user_roles: List[str], limit: int) -> List[dict]:
+    query = _scope_to_organization(select(Lease), Lease, current_user, user_roles)
+    id_range = uuid_prefix_range(terms.q)
+    if id_range:
+        # Lease id (or id prefix): primary key range scan
+        query = query.where(Lease.id.between(*id_range)).order_by(Lease.id)
+    else:
+        # Otherwise match the lease's property
+        match = _match(Property, terms)
+        if match is None:
+            return []
+        condition, rank = match
+        query = (
+            query.join(Unit, Unit.id == Lease.unit_id)
+            .join(Property, Property.id == Unit.property_id)
+            .where(condition)
+            .order_by(rank.desc(), Lease.id)
+        )
+    result = await db.execute(query.limit(limit))
+    return [{"id": str(l.id), "rent_amount": float(l.rent_amount)} for l in result.scalars().all()]
+
+
+async def _search_work_orders(db: AsyncSession, terms: SearchTerms, current_user: User, user_roles: List[str], limit: int) -> List[dict]:
+    match = _match(WorkOrder, terms)
+    if match is None:
+        return []
+    condition, rank = match
+    query = _scope_to_organization(select(WorkOrder), WorkOrder, current_user, user_roles)
+    if RoleEnum.TENANT in user_roles:
+        query = query.where(WorkOrder.tenant_id == current_user.id)
+    query = query.where(condition).order_by(rank.desc(), WorkOrder.id).limit(limit)
+    result = await db.execute(query)
+    return [{"id": str(wo.id), "title": wo.title, "status": wo.status} for wo in result.scalars().all()]
+
+
+ENTITY_SEARCHES = {
+    "properties": _search_properties,
+    "tenants": _search_tenants,
+    "landlords": _search_landlords,
+    "vendors": _search_vendors,
+    "leases": _search_leases,
+    "work_orders": _search_work_orders,
+}
+
+
+async def _run_entity_search(db: AsyncSession, search, terms: SearchTerms, current_user: User, user_roles: List[str], limit: int) -> Optional[List[dict]]:
+    """Run one entity search on its own session; None if it exceeds the time budget"""
+    async with AsyncSession(db.bind) as session:
+        try:
+            return await asyncio.wait_for(
+                search(session, terms, current_user, user_roles, limit),
+                timeout=settings.SEARCH_ENTITY_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            return None
+
 
 @router.get("")
 async def global_search(
-    q: str = Query(..., description="Search query"),
-    type: Optional[str] = Query(None, description="Filter by entity type: properties, tenants, landlords, leases, work_orders"),
+    q: str = Query(..., description="Search query (each word is matched as a prefix)"),
+    type: Optional[str] = Query(None, description="Filter by entity type: properties, tenants, landlords, vendors, leases, work_orders"),
     limit: int = Query(10, ge=1, le=50),
+    mode: SearchMode = Query(SearchMode.FULLTEXT, description="fulltext: word prefixes ranked by ts_rank; similarity: fuzzy name/email/address matching ranked by trigram similarity"),
     current_user: User = Depends(require_role_v2([RoleEnum.SUPER_ADMIN, RoleEnum.PMC_ADMIN, RoleEnum.PM, RoleEnum.LANDLORD, RoleEnum.TENANT, RoleEnum.VENDOR], require_organization=True)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Global search across entities"""
+    """Global search across entities, best matches first"""
     user_roles = await get_user_roles(current_user, db)
-    search_lower = q.lower()
+    terms = build_search_terms(q, mode)
     results = {}
-    
-    # Search properties
-    if not type or type == "properties":
-        query = select(Property)
-        if RoleEnum.SUPER_ADMIN not in user_roles:
-            query = query.where(Property.organization_id == current_user.organization_id)
-        query = query.where(
-            or_(
-                Property.name.ilike(f"%{search_lower}%"),
-                Property.address_line1.ilike(f"%{search_lower}%"),
-                Property.city.ilike(f"%{search_lower}%"),
-            )
-        ).limit(limit)
-        prop_result = await db.execute(query)
-        results["properties"] = [{"id": str(p.id), "name": p.name or p.address_line1, "address": p.address_line1} for p in prop_result.scalars().all()]
-    
-    # Search tenants
-    if not type or type == "tenants":
-        query = select(Tenant)
-        if RoleEnum.SUPER_ADMIN not in user_roles:
-            query = query.where(Tenant.organization_id == current_user.organization_id)
-        query = query.where(
-            or_(
-                Tenant.name.ilike(f"%{search_lower}%"),
-                Tenant.email.ilike(f"%{search_lower}%"),
-            )
-        ).limit(limit)
-        tenant_result = await db.execute(query)
-        results["tenants"] = [{"id": str(t.id), "name": t.name, "email": t.email} for t in tenant_result.scalars().all()]
-    
-    # Search landlords
-    if not type or type == "landlords":
-        query = select(Landlord)
-        if RoleEnum.SUPER_ADMIN not in user_roles:
-            query = query.where(Landlord.organization_id == current_user.organization_id)
-        query = query.where(
-            or_(
-                Landlord.name.ilike(f"%{search_lower}%"),
-                Landlord.email.ilike(f"%{search_lower}%"),
-            )
-        ).limit(limit)
-        landlord_result = await db.execute(query)
-        results["landlords"] = [{"id": str(l.id), "name": l.name, "email": l.email} for l in landlord_result.scalars().all()]
-    
-    # Search leases
-    if not type or type == "leases":
-        query = select(Lease)
-        if RoleEnum.SUPER_ADMIN not in user_roles:
-            query = query.where(Lease.organization_id == current_user.organization_id)
-        # Search by lease ID (partial match)
-        if search_lower.replace("-", "").isalnum():
-            query = query.where(Lease.id.cast(str).ilike(f"%{search_lower}%"))
-        lease_result = await db.execute(query.limit(limit))
-        results["leases"] = [{"id": str(l.id), "rent_amount": float(l.rent_amount)} for l in lease_result.scalars().all()]
-    
-    # Search work orders
-    if not type or type == "work_orders" or type == "maintenance":
-        query = select(WorkOrder)
-        if RoleEnum.SUPER_ADMIN not in user_roles:
-            query = query.where(WorkOrder.organization_id == current_user.organization_id)
-        if RoleEnum.TENANT in user_roles:
-            query = query.where(WorkOrder.tenant_id == current_user.id)
-        query = query.where(
-            or_(
-                WorkOrder.title.ilike(f"%{search_lower}%"),
-                WorkOrder.description.ilike(f"%{search_lower}%"),
-            )
-        ).limit(limit)
-        wo_result = await db.execute(query)
-        results["work_orders"] = [{"id": str(wo.id), "title": wo.title, "status": wo.status} for wo in wo_result.scalars().all()]
-    
+
+    if terms.empty:
+        # Nothing searchable (only punctuation/whitespace)
+        return {
+            "success": True,
+            "query": q,
+            "results": results,
+            "partial": False,
+            "timed_out": [],
+        }
+
+    cache_key = search_cache_key(current_user.organization_id, _role_scope(current_user, user_roles), type, mode, q, limit)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return {
+            "success": True,
+            "query": q,
+            "results": cached,
+            "partial": False,
+            "timed_out": [],
+        }
+
+    generation = search_cache_generation()
+    searches = {
+        entity: search for entity, search in ENTITY_SEARCHES.items()
+        if not type or type == entity or (type == "maintenance" and entity == "work_orders")
+    }
+    outcomes = await asyncio.gather(*(
+        _run_entity_search(db, search, terms, current_user, user_roles, limit)
+        for search in searches.values()
+    ))
+    timed_out = []
+    for entity, items in zip(searches, outcomes):
+        if items is None:
+            timed_out.append(entity)
+        else:
+            results[entity] = items
+
+    if not timed_out:
+        store_search_results(cache_key, results, generation)
+
     return {
         "success": True,
         "query": q,
-        "results": results
+        "results": results,
+        "partial": bool(timed_out),
+        "timed_out": timed_out,
     }
-
@@ -1,7 +1,7 @@
 """
 Tenant endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
 from sqlalchemy.orm import selectinload
@@ -11,13 +11,18 @@ from uuid import UUID
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum
 from core.rbac import require_permission, PermissionAction, ResourceType
+from core.access_scope import refresh_access_scopes
+from core.search import invalidate_search_cache
 from core.crud_helpers import (
     apply_organization_filter,
     check_organization_access,
     verify_organization_access_for_create,
     get_entity_or_404,
     update_entity_fields,
-    apply_pagination
+    apply_pagination,
+    set_next_cursor,
+    execute_page,
+    TotalCountMode,
 )
 from schemas.tenant import Tenant, TenantCreate, TenantUpdate, TenantApprovalRequest, TenantRejectionRequest
 from db.models_v2 import Tenant as TenantModel, User, Organization, Landlord, Lease, LeaseTenant, Property, Unit
@@ -27,9 +32,12 @@ router = APIRouter(prefix="/tenants", tags=["tenants"])
 
 @router.get("", response_model=List[Tenant])
 async def list_tenants(
+    response: Response,
     organization_id: Optional[UUID] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_permission(PermissionAction.READ, ResourceType.TENANT)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -42,11 +50,13 @@ async def list_tenants(
         selectinload(TenantModel.user),
     )
     query = await apply_organization_filter(query, TenantModel, current_user, user_roles, organization_id)
-    query = apply_pagination(query, page, limit, TenantModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, TenantModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     tenants = result.scalars().all()
     
+    set_next_cursor(response, tenants, limit)
     return tenants
 
 
@@ -71,6 +81,7 @@ async def create_tenant(
     tenant = TenantModel(**tenant_data.dict())
     db.add(tenant)
     await db.commit()
+    invalidate_search_cache(tenant.organization_id)
     await db.refresh(tenant)
     
     return tenant
@@ -114,9 +125,14 @@ async def update_tenant(
     
     # Update fields
     update_data = tenant_data.dict(exclude_unset=True)
+    previous_user_id = tenant.user_id
     await update_entity_fields(tenant, update_data)
     
+    # Re-linking the record to another user moves its access scope
+    if "user_id" in update_data:
+        await refresh_access_scopes(db, [previous_user_id, tenant.user_id])
     await db.commit()
+    invalidate_search_cache(tenant.organization_id)
     await db.refresh(tenant)
     
     return tenant
@@ -134,7 +150,9 @@ async def delete_tenant(
     await check_organization_access(tenant, current_user, user_roles)
     
     await db.execute(delete(TenantModel).where(TenantModel.id == tenant_id))
+    await refresh_access_scopes(db, [tenant.user_id])
     await db.commit()
+    invalidate_search_cache(tenant.organization_id)
     
     return None
 
@@ -1,7 +1,7 @@
 """
 Unit endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
@@ -10,7 +10,8 @@ from uuid import UUID
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum
 from core.rbac import require_permission, PermissionAction, ResourceType
-from core.crud_helpers import apply_pagination
+from core.crud_helpers import apply_pagination, set_next_cursor, execute_page, TotalCountMode
+from core.access_scope import refresh_access_scopes, unit_scope_user_ids
 from schemas.unit import Unit, UnitCreate, UnitUpdate
 from db.models_v2 import Unit as UnitModel, Property, User
 
@@ -19,9 +20,12 @@ router = APIRouter(prefix="/units", tags=["units"])
 
 @router.get("", response_model=List[Unit])
 async def list_units(
+    response: Response,
     property_id: Optional[UUID] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_permission(PermissionAction.READ, ResourceType.UNIT)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -42,11 +46,13 @@ async def list_units(
         # Join with properties to filter by organization
         query = query.join(Property).where(Property.organization_id == current_user.organization_id)
     
-    query = apply_pagination(query, page, limit, UnitModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, UnitModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     units = result.scalars().all()
     
+    set_next_cursor(response, units, limit)
     return units
 
 
@@ -81,6 +87,8 @@ async def create_unit(
     
     unit = UnitModel(**unit_data.dict())
     db.add(unit)
+    await db.flush()
+    await refresh_access_scopes(db, await unit_scope_user_ids(db, unit.id))
     await db.commit()
     await db.refresh(unit)
     
@@ -199,7 +207,9 @@ async def delete_unit(
                 detail="Access denied",
             )
     
+    scope_user_ids = await unit_scope_user_ids(db, unit_id)
     await db.execute(delete(UnitModel).where(UnitModel.id == unit_id))
+    await refresh_access_scopes(db, scope_user_ids)
     await db.commit()
     
     return None
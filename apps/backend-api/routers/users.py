@@ -9,7 +9,7 @@ from typing import List, Optional
 from uuid import UUID
 
 from core.database import get_db
-from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
+from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2, invalidate_identity
 from core.rbac import require_permission, PermissionAction, ResourceType
 from schemas.user import UserCreate, UserUpdate, UserWithRoles
 from db.models_v2 import User as UserModel, UserRole, Role as RoleModel
@@ -205,6 +205,7 @@ async def update_user(
         )
         await db.commit()
         await db.refresh(user)
+        invalidate_identity(user_id)
     
     # Get roles
     roles_result = await db.execute(
@@ -243,6 +244,7 @@ async def update_current_user(
         )
         await db.commit()
         await db.refresh(current_user)
+        invalidate_identity(current_user.id)
     
     # Get roles
     roles_result = await db.execute(
@@ -295,5 +297,6 @@ async def delete_user(
         .values(status='suspended')
     )
     await db.commit()
+    invalidate_identity(user_id)
     
     return {"message": "User deleted successfully"}
@@ -1,7 +1,7 @@
 """
 Vendor endpoints (v2) - using v2 auth and models
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from typing import List, Optional
@@ -9,11 +9,16 @@ from uuid import UUID
 from core.database import get_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum
 from core.rbac import require_permission, PermissionAction, ResourceType
+from core.access_scope import refresh_access_scopes
+from core.search import invalidate_search_cache
 from core.crud_helpers import (
     apply_organization_filter,
     get_entity_or_404,
     update_entity_fields,
-    apply_pagination
+    apply_pagination,
+    set_next_cursor,
+    execute_page,
+    TotalCountMode,
 )
 from schemas.vendor_v2 import VendorResponse, VendorCreate, VendorUpdate
 from db.models_v2 import Vendor as VendorModel, User, Organization
@@ -23,11 +28,14 @@ router = APIRouter(prefix="/vendors", tags=["vendors"])
 
 @router.get("", response_model=List[VendorResponse])
 async def list_vendors(
+    response: Response,
     organization_id: Optional[UUID] = Query(None),
     search: Optional[str] = Query(None),
     status_filter: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
     current_user: User = Depends(require_permission(PermissionAction.READ, ResourceType.VENDOR)),
     db: AsyncSession = Depends(get_db)
 ):
@@ -50,11 +58,13 @@ async def list_vendors(
             )
         )
     
-    query = apply_pagination(query, page, limit, VendorModel.created_at.desc())
+    count_query = query
+    query = apply_pagination(query, page, limit, VendorModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     vendors = result.scalars().all()
     
+    set_next_cursor(response, vendors, limit)
     return vendors
 
 
@@ -96,6 +106,7 @@ async def create_vendor(
     vendor = VendorModel(**vendor_dict)
     db.add(vendor)
     await db.commit()
+    invalidate_search_cache(vendor.organization_id)
     await db.refresh(vendor)
     
     return vendor
@@ -121,9 +132,14 @@ async def update_vendor(
     
     # Update fields
     update_data = vendor_data.dict(exclude_unset=True)
+    previous_user_id = vendor.user_id
     await update_entity_fields(vendor, update_data)
     
+    # Re-linking the record to another user moves its access scope
+    if "user_id" in update_data:
+        await refresh_access_scopes(db, [previous_user_id, vendor.user_id])
     await db.commit()
+    invalidate_search_cache(vendor.organization_id)
     await db.refresh(vendor)
     
     return vendor
@@ -148,6 +164,7 @@ async def delete_vendor(
     
     vendor.status = 'inactive'
     await db.commit()
+    invalidate_search_cache(vendor.organization_id)
     
     return None
 
@@ -1,16 +1,20 @@
 """
 Work Order endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from uuid import UUID
 from core.database import get_db
+from core.replicas import get_read_db
 from core.auth_v2 import get_current_user_v2, get_user_roles, RoleEnum, require_role_v2
 from core.rbac import require_permission, PermissionAction, ResourceType
-from core.crud_helpers import apply_organization_filter, apply_pagination
+from core.crud_helpers import apply_organization_filter, apply_pagination, set_next_cursor, execute_page, TotalCountMode
+from core.attachment_groups import attachment_summaries
+from core.access_scope import SCOPE_WORK_ORDER, join_access_scope, refresh_access_scopes, work_order_scope_user_ids
+from core.search import invalidate_search_cache
 from schemas.work_order import WorkOrder, WorkOrderCreate, WorkOrderUpdate, WorkOrderApprovalRequest, WorkOrderMarkViewedRequest, WorkOrderAssignVendorRequest
 from schemas.work_order_comment import WorkOrderComment, WorkOrderCommentCreate
 from db.models_v2 import (
@@ -29,13 +33,17 @@ router = APIRouter(prefix="/work-orders", tags=["work-orders"])
 
 @router.get("", response_model=List[WorkOrder])
 async def list_work_orders(
+    response: Response,
     organization_id: Optional[UUID] = None,
     property_id: Optional[UUID] = None,
     status_filter: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header (keyset pagination)"),
+    include_total: Optional[TotalCountMode] = Query(None, description="Return the total in X-Total-Count (exact or estimated)"),
+    include_attachments: bool = Query(False, description="Embed attachment_summary (count, total size) per work order"),
     current_user: User = Depends(require_permission(PermissionAction.READ, ResourceType.WORK_ORDER)),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List work orders (scoped by organization and role) with pagination"""
     user_roles = await get_user_roles(current_user, db)
@@ -48,41 +56,42 @@ async def list_work_orders(
         selectinload(WorkOrderModel.unit),
     )
     
-    # Build count query with same filters
-    count_query = select(func.count()).select_from(WorkOrderModel)
-    
-    # Filter by organization (note: count_query not used, but keeping for potential future use)
+    # Filter by organization
     query = await apply_organization_filter(query, WorkOrderModel, current_user, user_roles, organization_id)
     
     # Additional filters
     if property_id:
         query = query.where(WorkOrderModel.property_id == property_id)
-        count_query = count_query.where(WorkOrderModel.property_id == property_id)
     
     if status_filter:
         query = query.where(WorkOrderModel.status == status_filter)
-        count_query = count_query.where(WorkOrderModel.status == status_filter)
     
     # Role-based filtering
     if RoleEnum.TENANT in user_roles:
         # Tenants see only their own work orders
         query = query.where(WorkOrderModel.tenant_id == current_user.id)
-        count_query = count_query.where(WorkOrderModel.tenant_id == current_user.id)
     elif RoleEnum.VENDOR in user_roles:
-        # Vendors see only assigned work orders (via assignments table)
-        vendor_subquery = select(Vendor.id).where(Vendor.user_id == current_user.id)
-        assignment_subquery = select(WorkOrderAssignment.work_order_id).where(
-            WorkOrderAssignment.vendor_id.in_(vendor_subquery)
-        )
-        query = query.where(WorkOrderModel.id.in_(assignment_subquery))
-        count_query = count_query.where(WorkOrderModel.id.in_(assignment_subquery))
+        # Vendors see only assigned work orders (precomputed access scope)
+        query = join_access_scope(query, WorkOrderModel.id, current_user.id, RoleEnum.VENDOR, SCOPE_WORK_ORDER)
     
-    # Apply pagination
-    query = apply_pagination(query, page, limit, WorkOrderModel.created_at.desc())
+    # Apply pagination (count_query is the unpaginated query, for include_total)
+    count_query = query
+    query = apply_pagination(query, page, limit, WorkOrderModel.created_at.desc(), cursor)
     
-    result = await db.execute(query)
+    result = await execute_page(db, query, response, count_query, include_total)
     work_orders = result.scalars().all()
     
+    set_next_cursor(response, work_orders, limit)
+    
+    # One grouped query for the whole page instead of a request per row
+    if include_attachments:
+        organization_id = None if RoleEnum.SUPER_ADMIN in user_roles else current_user.organization_id
+        summaries = await attachment_summaries(db, "work_order", [wo.id for wo in work_orders], organization_id)
+        return [
+            WorkOrder.model_validate(wo).model_copy(update={"attachment_summary": summaries[wo.id]})
+            for wo in work_orders
+        ]
+    
     return work_orders
 
 
@@ -119,7 +128,10 @@ async def create_work_order(
         created_by_user_id=current_user.id,
     )
     db.add(work_order)
+    await db.flush()
+    await refresh_access_scopes(db, await work_order_scope_user_ids(db, work_order.id))
     await db.commit()
+    invalidate_search_cache(work_order.organization_id)
     await db.refresh(work_order)
     
     return work_order
@@ -203,6 +215,7 @@ async def update_work_order(
         setattr(work_order, field, value)
     
     await db.commit()
+    invalidate_search_cache(work_order.organization_id)
     await db.refresh(work_order)
     
     return work_order
@@ -315,6 +328,7 @@ async def approve_work_order(
     # For now, we'll just update the status
     
     await db.commit()
+    invalidate_search_cache(work_order.organization_id)
     await db.refresh(work_order)
     
     return work_order
@@ -377,7 +391,9 @@ async def assign_vendor_to_work_order(
     if work_order.status == 'new':
         work_order.status = 'waiting_on_vendor'
     
+    await refresh_access_scopes(db, await work_order_scope_user_ids(db, work_order_id))
     await db.commit()
+    invalidate_search_cache(work_order.organization_id)
     await db.refresh(work_order)
     await db.refresh(assignment)
     
@@ -1,8 +1,8 @@
 """
 Pydantic schemas for Attachment
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -18,14 +18,31 @@ class AttachmentCreate(AttachmentBase):
     entity_id: UUID
 
 
+class AttachmentFromContent(AttachmentCreate):
+    """Attach already-uploaded content by digest (no file bytes)"""
+    content_sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$")
+
+
 class Attachment(AttachmentBase):
     id: UUID
     organization_id: UUID
     entity_type: str
     entity_id: UUID
     storage_key: str
+    content_sha256: Optional[str] = None
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+
+
+class AttachmentSummary(BaseModel):
+    """Attachment totals for one entity"""
+    count: int = 0
+    total_size_bytes: int = 0
+    latest_created_at: Optional[datetime] = None
+
+
+class AttachmentGroup(AttachmentSummary):
+    attachments: Optional[List[Attachment]] = None  # None when only counts were requested
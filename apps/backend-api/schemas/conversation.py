@@ -49,8 +49,13 @@ class Conversation(ConversationBase):
     status: str = "active"
     created_at: datetime
     updated_at: datetime
-    messages: Optional[List[Message]] = []
     
     class Config:
         from_attributes = True
 
+
+class ConversationSummary(Conversation):
+    """Conversation with its latest message; messages are paged via /conversations/{id}/messages"""
+    last_message: Optional[Message] = None
+    unread_count: int = 0  # messages from others the current user has not read
+
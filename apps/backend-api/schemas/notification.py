@@ -1,8 +1,8 @@
 """
 Pydantic schemas for Notification
 """
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -33,3 +33,47 @@ class Notification(NotificationBase):
     class Config:
         from_attributes = True
 
+
+
+class UnreadCounts(BaseModel):
+    """Badge counts for the current user"""
+    notifications: int
+    messages: int  # unread messages across all conversations
+
+
+class NotificationAudience(BaseModel):
+    """Recipients of a broadcast; every given filter must match"""
+    organization_id: UUID
+    property_id: Optional[UUID] = None  # users linked to the property (landlord, tenants, assigned vendors)
+    roles: Optional[List[Literal["pmc_admin", "pm", "landlord", "tenant", "vendor"]]] = None
+    user_ids: Optional[List[UUID]] = Field(None, max_length=10000)
+
+
+class NotificationBroadcast(BaseModel):
+    audience: NotificationAudience
+    entity_type: str
+    entity_id: UUID
+    type: str
+
+
+class NotificationBroadcastResult(BaseModel):
+    status: str  # 'completed' (sent within the request) or 'queued' (see job_id)
+    recipient_count: int
+    job_id: Optional[UUID] = None
+
+
+class NotificationJob(BaseModel):
+    id: UUID
+    organization_id: UUID
+    entity_type: str
+    entity_id: UUID
+    type: str
+    status: str  # 'queued', 'running', 'completed', 'failed'
+    recipient_count: Optional[int] = None
+    sent_count: int
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
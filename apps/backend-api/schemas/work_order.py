@@ -6,7 +6,7 @@ from typing import Optional, List
 from datetime import datetime, date
 from uuid import UUID
 from schemas.work_order_comment import WorkOrderComment
-# from schemas.attachment import Attachment  # Not used yet
+from schemas.attachment import AttachmentSummary
 
 
 class WorkOrderBase(BaseModel):
@@ -42,7 +42,7 @@ class WorkOrder(WorkOrderBase):
     updated_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     comments: Optional[List[WorkOrderComment]] = []
-    # attachments: Optional[List[Attachment]] = []  # Removed - not loaded in queries yet
+    attachment_summary: Optional[AttachmentSummary] = None  # only with include_attachments=true
     
     class Config:
         from_attributes = True
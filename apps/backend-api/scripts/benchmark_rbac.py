@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: list-scanning permission evaluator vs compiled bitmask matrix
+
+Evaluates every (role set, resource, action) combination with both evaluators,
+verifies they agree, and reports the time per check.
+"""
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from core.auth_v2 import RoleEnum
+    from core.rbac import (
+        PERMISSION_MATRIX,
+        PermissionAction,
+        ResourceType,
+        effective_permission_mask,
+        permission_bit,
+    )
+except ImportError as e:
+    print(f"❌ Error: Missing dependencies. Please install requirements:")
+    print(f"   cd {Path(__file__).parent.parent}")
+    print(f"   pip install -r requirements.txt")
+    print(f"\nOriginal error: {e}")
+    sys.exit(1)
+
+
+ITERATIONS = 200
+
+
+def legacy_has_permission(roles, action, resource) -> bool:
+    """Matrix part of check_permission before compilation (list scans per role)"""
+    for role in roles:
+        if role not in PERMISSION_MATRIX:
+            continue
+        role_permissions = PERMISSION_MATRIX[role]
+        if resource not in role_permissions:
+            continue
+        allowed_actions = role_permissions[resource]
+        if PermissionAction.MANAGE in allowed_actions or action in allowed_actions:
+            return True
+    return False
+
+
+def compiled_has_permission(roles, action, resource) -> bool:
+    """Compiled evaluator including the mask and bit lookups"""
+    return bool(effective_permission_mask(roles) & permission_bit(resource, action))
+
+
+def run_guard(cases) -> float:
+    """
+    Endpoint guard as used by require_permission: the principal's mask is
+    computed once per request and the required bit once per route, so each
+    check is a single AND.
+    """
+    prepared = [
+        (effective_permission_mask(roles), permission_bit(resource, action))
+        for roles, action, resource in cases
+    ]
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for mask, bit in prepared:
+            mask & bit
+    return time.perf_counter() - start
+
+
+def build_cases():
+    """Every single role and every pair of roles, against every resource/action"""
+    roles = [role for role in PERMISSION_MATRIX if role != RoleEnum.SUPER_ADMIN]
+    role_sets = [[role] for role in roles] + [list(pair) for pair in combinations(roles, 2)]
+    return [
+        (role_set, action, resource)
+        for role_set in role_sets
+        for resource in ResourceType
+        for action in PermissionAction
+    ]
+
+
+def run(evaluator, cases) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for roles, action, resource in cases:
+            evaluator(roles, action, resource)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    cases = build_cases()
+
+    mismatches = [
+        case for case in cases
+        if legacy_has_permission(*case) != compiled_has_permission(*case)
+    ]
+    if mismatches:
+        print(f"❌ {len(mismatches)} combinations disagree, e.g. {mismatches[0]}")
+        return 1
+
+    checks = len(cases) * ITERATIONS
+    legacy = run(legacy_has_permission, cases)
+    compiled = run(compiled_has_permission, cases)
+    guard = run_guard(cases)
+
+    print("=" * 60)
+    print(f"RBAC evaluator benchmark ({len(cases)} combinations x {ITERATIONS} iterations)")
+    print("=" * 60)
+    print(f"Legacy (list scans):   {legacy * 1e9 / checks:8.1f} ns/check  ({legacy:.3f}s total)")
+    print(f"Compiled (lookups):    {compiled * 1e9 / checks:8.1f} ns/check  ({compiled:.3f}s total)")
+    print(f"Compiled guard (AND):  {guard * 1e9 / checks:8.1f} ns/check  ({guard:.3f}s total)")
+    print(f"Speedup (lookups):     {legacy / compiled:8.1f}x")
+    print(f"Speedup (guard):       {legacy / guard:8.1f}x")
+    print("✅ Both evaluators agree on every combination")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
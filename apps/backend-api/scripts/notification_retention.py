@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Notification retention job
+Creates upcoming notification partitions, archives expired notifications and
+drops emptied partitions. Schedule daily (e.g. cron: 15 3 * * *).
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+try:
+    from core.config import settings
+    from core.database import engine
+    from core.notification_retention import run_retention
+except ImportError as e:
+    print(f"❌ Error: Missing dependencies. Please install requirements:")
+    print(f"   cd {backend_dir}")
+    print(f"   pip install -r requirements.txt")
+    print(f"\nOriginal error: {e}")
+    sys.exit(1)
+
+
+async def main():
+    print("🗄️  Notification retention")
+    print(f"   Read notifications kept for {settings.NOTIFICATION_RETENTION_DAYS} days, "
+          f"unread for {settings.NOTIFICATION_UNREAD_RETENTION_DAYS} days")
+    try:
+        stats = await run_retention()
+    finally:
+        await engine.dispose()
+
+    print(f"  ✅ Partitions created: {', '.join(stats['created_partitions']) or 'none'}")
+    print(f"  ✅ Notifications archived: {stats['archived']}")
+    print(f"  ✅ Partitions dropped: {', '.join(stats['dropped_partitions']) or 'none'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
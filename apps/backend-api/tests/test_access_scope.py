@@ -0,0 +1,97 @@
+"""
+Tests for precomputed access scopes
+"""
+
+import uuid
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from core.access_scope import (
+    SCOPE_LEASE,
+    join_access_scope,
+    lease_scope_user_ids,
+    refresh_access_scopes,
+)
+from core.auth_v2 import RoleEnum
+from db.models_v2 import Lease
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Records flushes and executed statements"""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.statements = []
+        self.flushes = 0
+
+    async def flush(self):
+        self.flushes += 1
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_refresh_replaces_rows_for_affected_users_only():
+    """A refresh should delete and re-derive the given users' rows in two statements"""
+    db = FakeSession()
+
+    await refresh_access_scopes(db, [uuid.uuid4(), None, uuid.uuid4()])
+
+    assert db.flushes == 1
+    assert len(db.statements) == 2
+    delete_sql, insert_sql = (compile_sql(statement) for statement in db.statements)
+    assert delete_sql.startswith("DELETE FROM user_access_scopes WHERE user_access_scopes.user_id IN")
+    assert insert_sql.startswith("INSERT INTO user_access_scopes")
+    assert "UNION" in insert_sql
+
+
+@pytest.mark.asyncio
+async def test_refresh_without_users_is_a_no_op():
+    """Writes that touch no linked users should not issue any statement"""
+    db = FakeSession()
+
+    await refresh_access_scopes(db, [None])
+
+    assert db.statements == []
+    assert db.flushes == 0
+
+
+@pytest.mark.asyncio
+async def test_lease_scope_user_ids_includes_current_holders_and_parties():
+    """Affected users come from existing scope rows plus the lease's landlord and tenants"""
+    landlord_user_id = uuid.uuid4()
+    db = FakeSession(rows=[landlord_user_id, None])
+
+    user_ids = await lease_scope_user_ids(db, uuid.uuid4())
+
+    assert user_ids == {landlord_user_id}
+    sql = compile_sql(db.statements[0])
+    assert "FROM user_access_scopes" in sql
+    assert "JOIN leases" in sql
+    assert "JOIN lease_tenants" in sql
+
+
+def test_join_access_scope_is_a_single_join():
+    """Row-level scoping should be one join on the scope primary key"""
+    query = join_access_scope(select(Lease.id), Lease.id, uuid.uuid4(), RoleEnum.TENANT, SCOPE_LEASE)
+
+    sql = compile_sql(query)
+    assert sql.count("JOIN") == 1
+    assert "JOIN user_access_scopes ON user_access_scopes.resource_id = leases.id" in sql
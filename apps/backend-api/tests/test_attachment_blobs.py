@@ -0,0 +1,154 @@
+"""
+Tests for content-addressed attachment storage
+"""
+
+import hashlib
+import uuid
+import pytest
+from sqlalchemy.dialects import postgresql
+from core import attachment_blobs
+from core.attachment_blobs import content_storage_key, count_references, find_readable_content, lock_storage_key
+from db.models_v2 import Attachment, User
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class FakeSession:
+    """Records flushes and executed statements"""
+
+    def __init__(self, value=None):
+        self.value = value
+        self.statements = []
+        self.flushes = 0
+
+    async def flush(self):
+        self.flushes += 1
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.value)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_identical_content_shares_a_storage_key():
+    """The key depends only on the digest, not on names or entities"""
+    digest = hashlib.sha256(b"lease.pdf bytes").hexdigest()
+
+    assert content_storage_key(digest) == f"blobs/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+@pytest.mark.asyncio
+async def test_count_references_flushes_pending_deletes():
+    """The reference count must see the row deleted earlier in the transaction"""
+    db = FakeSession(value=0)
+
+    assert await count_references(db, "blobs/ab/cd/abcd") == 0
+    assert db.flushes == 1
+    assert "WHERE attachments.storage_key =" in compile_sql(db.statements[0])
+
+
+@pytest.mark.asyncio
+async def test_lock_storage_key_takes_transaction_advisory_lock():
+    """Uploads and deletes of one key serialize on a transaction-scoped lock"""
+    db = FakeSession()
+
+    await lock_storage_key(db, "blobs/ab/cd/abcd")
+
+    assert "pg_advisory_xact_lock(hashtext(" in compile_sql(db.statements[0])
+
+
+class CandidatesResult(FakeResult):
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._value
+
+
+class CandidatesSession(FakeSession):
+    """Answers the content lookup with the given attachments"""
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return CandidatesResult(self.value)
+
+
+@pytest.mark.asyncio
+async def test_content_lookup_is_limited_to_the_organization():
+    """Digests must not reveal content uploaded by other organizations"""
+    db = CandidatesSession(value=[])
+    digest = "a" * 64
+
+    assert await find_readable_content(db, User(id=uuid.uuid4(), organization_id=uuid.uuid4()), digest, 10) is None
+    sql = compile_sql(db.statements[0])
+    assert "attachments.organization_id =" in sql
+    assert "attachments.content_sha256 =" in sql
+    assert "attachments.file_size_bytes =" in sql
+
+
+@pytest.mark.asyncio
+async def test_content_is_only_reused_from_entities_the_user_can_read(monkeypatch):
+    """Knowing another user's digest must not turn into a copy of their file"""
+    user = User(id=uuid.uuid4(), organization_id=uuid.uuid4())
+    digest = "a" * 64
+    hidden_lease, readable_property = uuid.uuid4(), uuid.uuid4()
+    candidates = [
+        Attachment(entity_type="lease", entity_id=hidden_lease, storage_key=content_storage_key(digest)),
+        Attachment(entity_type="message_draft", entity_id=uuid.uuid4(), storage_key=content_storage_key(digest)),
+        Attachment(entity_type="property", entity_id=readable_property, storage_key=content_storage_key(digest)),
+    ]
+    checked = []
+
+    async def permitted(user, action, resource, db, resource_ids, resource_org_id=None):
+        checked.append(resource.value)
+        return {readable_property} & set(resource_ids)
+
+    monkeypatch.setattr(attachment_blobs, "get_permitted_resource_ids", permitted)
+    db = CandidatesSession(value=candidates)
+
+    assert await find_readable_content(db, user, digest, None) is candidates[2]
+    # Unknown entity types are never trusted
+    assert checked == ["lease", "property"]
+
+    candidates.pop()
+    assert await find_readable_content(db, user, digest, None) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_blob_delete_is_logged_after_the_row_commit(monkeypatch, caplog):
+    """The row deletion is already committed; a storage failure must not fail the request"""
+    from core.storage import StorageError
+    from routers import attachments
+
+    class CommittingSession(FakeSession):
+        commits = 0
+
+        async def commit(self):
+            self.commits += 1
+
+    deleted = []
+
+    async def delete(key):
+        deleted.append(key)
+        raise StorageError("bucket unavailable")
+
+    monkeypatch.setattr(attachments.attachment_storage, "delete", delete)
+    db = CommittingSession(value=0)
+
+    await attachments._delete_unreferenced_blob(db, "blobs/ab/cd/abcd")
+
+    assert deleted[0] == "blobs/ab/cd/abcd" and len(deleted) > 1
+    assert db.commits == 1
+    assert "Failed to delete attachment object blobs/ab/cd/abcd" in caplog.text
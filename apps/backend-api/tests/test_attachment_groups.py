@@ -0,0 +1,97 @@
+"""
+Tests for batched attachment listing
+"""
+
+import datetime
+import uuid
+import pytest
+from sqlalchemy.dialects import postgresql
+from core.attachment_groups import attachment_groups, attachment_summaries
+from db.models_v2 import Attachment
+
+ORG_ID = uuid.uuid4()
+FIRST, SECOND, EMPTY = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+NOW = datetime.datetime(2024, 12, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def scalars(self):
+        return iter(self._rows)
+
+
+class FakeSession:
+    """Returns canned rows and records executed statements"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def make_attachment(entity_id, size, minutes=0):
+    return Attachment(
+        id=uuid.uuid4(),
+        organization_id=ORG_ID,
+        entity_type="work_order",
+        entity_id=entity_id,
+        storage_key="blobs/ab/cd/abcd",
+        file_name="photo.jpg",
+        mime_type="image/jpeg",
+        file_size_bytes=size,
+        created_at=NOW + datetime.timedelta(minutes=minutes),
+    )
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_aggregated_in_one_grouped_query():
+    """Every requested id is present, including ones without attachments"""
+    db = FakeSession([(FIRST, 2, 300, NOW), (SECOND, 1, 50, NOW)])
+
+    summaries = await attachment_summaries(db, "work_order", [FIRST, SECOND, EMPTY], ORG_ID)
+
+    assert len(db.statements) == 1
+    sql = compile_sql(db.statements[0])
+    assert "attachments.entity_id IN" in sql
+    assert "attachments.organization_id =" in sql
+    assert "GROUP BY attachments.entity_id" in sql
+    assert summaries[FIRST].count == 2 and summaries[FIRST].total_size_bytes == 300
+    assert summaries[SECOND].count == 1
+    assert summaries[EMPTY].count == 0 and summaries[EMPTY].latest_created_at is None
+
+
+@pytest.mark.asyncio
+async def test_summaries_without_ids_skip_the_query():
+    db = FakeSession([])
+
+    assert await attachment_summaries(db, "work_order", [], ORG_ID) == {}
+    assert db.statements == []
+
+
+@pytest.mark.asyncio
+async def test_groups_split_one_query_by_entity():
+    rows = [make_attachment(FIRST, 100), make_attachment(FIRST, None, minutes=5), make_attachment(SECOND, 40)]
+    db = FakeSession(rows)
+
+    groups = await attachment_groups(db, "work_order", [FIRST, SECOND, EMPTY, FIRST], None)
+
+    assert len(db.statements) == 1
+    assert "attachments.organization_id" not in compile_sql(db.statements[0]).split("WHERE")[1]
+    assert list(groups) == [FIRST, SECOND, EMPTY]
+    assert groups[FIRST].count == 2
+    assert groups[FIRST].total_size_bytes == 100
+    assert groups[FIRST].latest_created_at == NOW + datetime.timedelta(minutes=5)
+    assert [a.id for a in groups[SECOND].attachments] == [rows[2].id]
+    assert groups[EMPTY].attachments == []
@@ -0,0 +1,102 @@
+"""
+Tests for v2 authentication helpers
+"""
+
+import uuid
+import pytest
+from fastapi import HTTPException
+from core.auth_v2 import (
+    Principal,
+    RoleEnum,
+    compute_role_version,
+    get_principal,
+    get_user_roles,
+    invalidate_identity,
+    require_role_v2,
+    role_version_cache,
+    _principal_from_claims,
+)
+from db.models_v2 import User
+
+
+def make_principal(roles, organization_id=None):
+    """Build a principal around a transient user"""
+    user = User(id=uuid.uuid4(), email="user@pinaka.com", status="active", organization_id=organization_id)
+    principal = Principal(user=user, roles=roles, organization_id=organization_id)
+    user._principal = principal
+    return principal
+
+
+@pytest.mark.asyncio
+async def test_get_user_roles_reuses_principal():
+    """get_user_roles should not touch the database when a principal is attached"""
+    principal = make_principal([RoleEnum.PM])
+
+    # db=None would fail if a query were issued
+    roles = await get_user_roles(principal.user, None)
+
+    assert roles == [RoleEnum.PM]
+    assert get_principal(principal.user) is principal
+
+
+@pytest.mark.asyncio
+async def test_require_role_v2_uses_principal_roles():
+    """require_role_v2 should authorize from the resolved principal"""
+    checker = require_role_v2([RoleEnum.PMC_ADMIN, RoleEnum.PM], require_organization=True)
+
+    principal = make_principal([RoleEnum.PM], organization_id=uuid.uuid4())
+    assert await checker(principal=principal) is principal.user
+
+    with pytest.raises(HTTPException) as exc:
+        await checker(principal=make_principal([RoleEnum.TENANT], organization_id=uuid.uuid4()))
+    assert exc.value.status_code == 403
+
+    with pytest.raises(HTTPException) as exc:
+        await checker(principal=make_principal([RoleEnum.PM]))
+    assert exc.value.status_code == 403
+
+    # super_admin bypasses role and organization requirements
+    admin = make_principal([RoleEnum.SUPER_ADMIN])
+    assert await checker(principal=admin) is admin.user
+
+
+def test_role_version_changes_with_roles_status_and_organization():
+    """Role version should differ whenever authorization-relevant state changes"""
+    org_id = uuid.uuid4()
+    base = compute_role_version("active", [RoleEnum.PM, RoleEnum.LANDLORD], org_id)
+
+    assert base == compute_role_version("active", [RoleEnum.LANDLORD, RoleEnum.PM], org_id)
+    assert base != compute_role_version("suspended", [RoleEnum.PM, RoleEnum.LANDLORD], org_id)
+    assert base != compute_role_version("active", [RoleEnum.PM], org_id)
+    assert base != compute_role_version("active", [RoleEnum.PM, RoleEnum.LANDLORD], uuid.uuid4())
+
+
+def test_principal_from_claims_requires_current_role_version():
+    """Claims are only trusted while the token's role version is the cached one"""
+    user_id = uuid.uuid4()
+    org_id = uuid.uuid4()
+    version = compute_role_version("active", [RoleEnum.TENANT], org_id)
+    payload = {
+        "sub": str(user_id),
+        "email": "tenant@pinaka.com",
+        "roles": [RoleEnum.TENANT],
+        "organization_id": str(org_id),
+        "rv": version,
+    }
+
+    # Unknown version: must fall back to the database
+    assert _principal_from_claims(payload) is None
+
+    role_version_cache.set(user_id, version)
+    principal = _principal_from_claims(payload)
+    assert principal is not None
+    assert principal.user_id == user_id
+    assert principal.organization_id == org_id
+    assert principal.roles == [RoleEnum.TENANT]
+    assert get_principal(principal.user) is principal
+
+    # Tokens without a role version are never trusted statelessly
+    assert _principal_from_claims({**payload, "rv": None}) is None
+
+    invalidate_identity(user_id)
+    assert _principal_from_claims(payload) is None
@@ -0,0 +1,67 @@
+"""
+Tests for the in-process TTL + LRU cache
+"""
+
+import time
+from core.cache import TTLCache
+
+
+def test_hit_miss_counters():
+    """Lookups should be counted as hits or misses"""
+    cache = TTLCache("test", maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_lru_eviction():
+    """The least recently used entry should be evicted when full"""
+    cache = TTLCache("test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """Expired entries should be treated as misses"""
+    cache = TTLCache("test", maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_invalidation():
+    """Entries can be invalidated individually or by key predicate"""
+    cache = TTLCache("test", maxsize=10, ttl=60)
+    cache.set(("org1", "a"), 1)
+    cache.set(("org1", "b"), 2)
+    cache.set(("org2", "a"), 3)
+
+    cache.invalidate(("org2", "a"))
+    assert cache.get(("org2", "a")) is None
+
+    assert cache.invalidate_where(lambda key: key[0] == "org1") == 2
+    assert len(cache) == 0
+    assert cache.stats()["invalidations"] == 3
+
+
+def test_zero_maxsize_disables_cache():
+    """A cache with maxsize 0 should never store entries"""
+    cache = TTLCache("test", maxsize=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -0,0 +1,120 @@
+"""
+Tests for conversation summaries and message paging
+"""
+
+import datetime
+import uuid
+import pytest
+from fastapi import Response
+from sqlalchemy.dialects import postgresql
+from core.auth_v2 import RoleEnum
+from core.crud_helpers import NEXT_CURSOR_HEADER
+from db.models_v2 import Conversation, ConversationParticipant, Message, User
+from routers import conversations
+
+NOW = datetime.datetime(2024, 12, 1, tzinfo=datetime.timezone.utc)
+ORG_ID = uuid.uuid4()
+USER = User(id=uuid.uuid4(), organization_id=ORG_ID)
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def all(self):
+        return self._value
+
+    def scalars(self):
+        return self
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class FakeSession:
+    """Returns canned results in order and records executed statements"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else None)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def make_conversation():
+    return Conversation(
+        id=uuid.uuid4(), organization_id=ORG_ID, created_by_user_id=USER.id,
+        status="active", created_at=NOW, updated_at=NOW,
+    )
+
+
+def make_message(conversation_id, minutes=0):
+    return Message(
+        id=uuid.uuid4(), conversation_id=conversation_id, sender_user_id=USER.id,
+        body="hello", is_read=False, created_at=NOW + datetime.timedelta(minutes=minutes),
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_joins_only_the_latest_message(monkeypatch):
+    async def roles(user, db):
+        return [RoleEnum.TENANT]
+    monkeypatch.setattr(conversations, "get_user_roles", roles)
+    first, quiet = make_conversation(), make_conversation()
+    message = make_message(first.id)
+    db = FakeSession([(first, 3, message), (quiet, 0, None)])
+
+    summaries = await conversations.list_conversations(
+        Response(), None, None, None, 1, 50, None, None, current_user=USER, db=db
+    )
+
+    sql = compile_sql(db.statements[0])
+    assert "LEFT OUTER JOIN LATERAL (SELECT" in sql
+    assert "WHERE messages.conversation_id = conversations.id ORDER BY messages.created_at DESC" in sql
+    assert sql.count("FROM messages") == 1
+    assert summaries[0].last_message.id == message.id and summaries[0].unread_count == 3
+    assert summaries[1].last_message is None and summaries[1].unread_count == 0
+
+
+@pytest.mark.asyncio
+async def test_get_conversation_uses_the_participant_counter():
+    conversation = make_conversation()
+    participant = ConversationParticipant(conversation_id=conversation.id, user_id=USER.id, unread_count=2)
+    message = make_message(conversation.id)
+    db = FakeSession(participant, conversation, message)
+
+    summary = await conversations.get_conversation(conversation.id, current_user=USER, db=db)
+
+    assert summary.unread_count == 2
+    assert summary.last_message.id == message.id
+    assert "LIMIT" in compile_sql(db.statements[2])
+
+
+@pytest.mark.asyncio
+async def test_messages_are_paged_newest_first():
+    conversation_id = uuid.uuid4()
+    participant = ConversationParticipant(conversation_id=conversation_id, user_id=USER.id)
+    page = [make_message(conversation_id, minutes=-i) for i in range(2)]
+    db = FakeSession(participant, page)
+    response = Response()
+
+    messages = await conversations.list_messages(conversation_id, response, 2, None, current_user=USER, db=db)
+
+    assert messages == page
+    sql = compile_sql(db.statements[1])
+    assert "ORDER BY messages.created_at DESC, messages.id DESC" in sql
+    assert "LIMIT" in sql
+    assert NEXT_CURSOR_HEADER in response.headers
+
+    # The next page seeks past the last message on (created_at, id)
+    db = FakeSession(participant, [])
+    await conversations.list_messages(
+        conversation_id, Response(), 2, response.headers[NEXT_CURSOR_HEADER], current_user=USER, db=db
+    )
+    assert "(messages.created_at, messages.id) <" in compile_sql(db.statements[1])
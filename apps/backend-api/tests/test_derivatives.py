@@ -0,0 +1,105 @@
+"""
+Tests for image attachment derivatives
+"""
+
+import asyncio
+import pytest
+from PIL import Image
+from core.derivatives import (
+    AttachmentVariant,
+    DerivativeError,
+    derivative_storage_key,
+    derivative_storage_keys,
+    ensure_derivative,
+    is_derivable,
+    render_derivative,
+    shutdown_derivative_pool,
+)
+from core.storage import LocalStorage
+
+STORAGE_KEY = "blobs/ab/cd/abcd"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def derivative_pool():
+    yield
+    shutdown_derivative_pool()
+
+
+def save_image(path, size=(1200, 800), mode="RGB", color=(200, 30, 30), exif=None):
+    image = Image.new(mode, size, color)
+    if exif is not None:
+        image.save(path, "JPEG", exif=exif)
+    else:
+        image.save(path, "PNG" if mode == "RGBA" else "JPEG")
+
+
+def test_derivative_keys_sit_next_to_the_blob():
+    assert derivative_storage_key(STORAGE_KEY, AttachmentVariant.THUMBNAIL) == f"{STORAGE_KEY}.thumbnail.jpg"
+    assert derivative_storage_keys(STORAGE_KEY) == [
+        f"{STORAGE_KEY}.thumbnail.jpg",
+        f"{STORAGE_KEY}.preview.jpg",
+    ]
+
+
+def test_is_derivable():
+    assert is_derivable("image/jpeg")
+    assert is_derivable("IMAGE/PNG")
+    assert not is_derivable("application/pdf")
+    assert not is_derivable(None)
+
+
+def test_render_scales_to_fit_and_applies_exif_orientation(tmp_path):
+    """A rotated phone photo should come out upright and within the box"""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 CW
+    save_image(tmp_path / "photo.jpg", size=(1200, 800), exif=exif)
+
+    render_derivative(str(tmp_path / "photo.jpg"), str(tmp_path / "thumb.jpg"), 320, 75)
+
+    with Image.open(tmp_path / "thumb.jpg") as thumb:
+        assert thumb.format == "JPEG"
+        assert thumb.size == (213, 320)
+
+
+def test_render_flattens_transparency(tmp_path):
+    save_image(tmp_path / "logo.png", size=(100, 100), mode="RGBA", color=(0, 0, 0, 0))
+
+    render_derivative(str(tmp_path / "logo.png"), str(tmp_path / "thumb.jpg"), 320, 75)
+
+    with Image.open(tmp_path / "thumb.jpg") as thumb:
+        assert thumb.mode == "RGB"
+        assert thumb.size == (100, 100)  # never upscaled
+        assert thumb.getpixel((50, 50)) >= (250, 250, 250)
+
+
+def test_render_rejects_non_images(tmp_path):
+    (tmp_path / "notes.jpg").write_bytes(b"not an image")
+
+    with pytest.raises(DerivativeError):
+        render_derivative(str(tmp_path / "notes.jpg"), str(tmp_path / "thumb.jpg"), 320, 75)
+
+
+@pytest.mark.asyncio
+async def test_ensure_derivative_renders_once_and_stores_next_to_original(tmp_path):
+    storage = LocalStorage(tmp_path)
+    original = storage.local_path(STORAGE_KEY)
+    original.parent.mkdir(parents=True)
+    save_image(original)
+
+    keys = await asyncio.gather(*(
+        ensure_derivative(storage, STORAGE_KEY, AttachmentVariant.PREVIEW) for _ in range(3)
+    ))
+
+    assert keys == [f"{STORAGE_KEY}.preview.jpg"] * 3
+    with Image.open(storage.local_path(keys[0])) as preview:
+        assert max(preview.size) == 1200  # already within the preview box
+    # Staging files are cleaned up
+    assert list(storage.staging_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_ensure_derivative_without_original(tmp_path):
+    storage = LocalStorage(tmp_path)
+
+    assert await ensure_derivative(storage, STORAGE_KEY, AttachmentVariant.THUMBNAIL) is None
@@ -0,0 +1,75 @@
+"""
+Tests for download validators and byte ranges
+"""
+
+import datetime
+import pytest
+from fastapi import HTTPException
+from core.http_cache import http_date, is_not_modified, requested_range, strong_etag
+
+ETAG = strong_etag("abc123")
+MODIFIED = datetime.datetime(2024, 12, 1, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+
+
+def test_http_date_is_imf_fixdate():
+    assert http_date(MODIFIED) == "Sun, 01 Dec 2024 08:30:15 GMT"
+    assert http_date(MODIFIED.replace(tzinfo=None)) == "Sun, 01 Dec 2024 08:30:15 GMT"
+
+
+def test_if_none_match_uses_weak_comparison():
+    """Matching ETags (weak or not, or *) should yield 304"""
+    assert is_not_modified({"if-none-match": ETAG}, ETAG, MODIFIED)
+    assert is_not_modified({"if-none-match": f'"other", W/{ETAG}'}, ETAG, MODIFIED)
+    assert is_not_modified({"if-none-match": "*"}, ETAG, MODIFIED)
+    assert not is_not_modified({"if-none-match": '"other"'}, ETAG, MODIFIED)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    headers = {"if-none-match": '"other"', "if-modified-since": http_date(MODIFIED)}
+    assert not is_not_modified(headers, ETAG, MODIFIED)
+
+
+def test_if_modified_since_compares_whole_seconds():
+    """Sub-second precision of created_at should not defeat the validator"""
+    assert is_not_modified({"if-modified-since": http_date(MODIFIED)}, ETAG, MODIFIED)
+    earlier = http_date(MODIFIED - datetime.timedelta(seconds=1))
+    assert not is_not_modified({"if-modified-since": earlier}, ETAG, MODIFIED)
+    assert not is_not_modified({"if-modified-since": "not a date"}, ETAG, MODIFIED)
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-200", (800, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+])
+def test_requested_range(header, expected):
+    assert requested_range({"range": header}, 1000, ETAG, MODIFIED) == expected
+
+
+@pytest.mark.parametrize("header", [None, "items=0-10", "bytes=0-10,20-30", "bytes=abc-", "bytes=50-10"])
+def test_unsupported_or_invalid_ranges_send_whole_file(header):
+    headers = {"range": header} if header else {}
+    assert requested_range(headers, 1000, ETAG, MODIFIED) is None
+
+
+def test_unsatisfiable_range_is_416_with_content_range():
+    with pytest.raises(HTTPException) as exc_info:
+        requested_range({"range": "bytes=1000-"}, 1000, ETAG, MODIFIED)
+
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers["Content-Range"] == "bytes */1000"
+
+
+def test_if_range_mismatch_sends_whole_file():
+    """A stale If-Range validator should ignore the Range header"""
+    fresh = {"range": "bytes=0-9", "if-range": ETAG}
+    stale_etag = {"range": "bytes=0-9", "if-range": '"old"'}
+    weak_etag = {"range": "bytes=0-9", "if-range": f"W/{ETAG}"}
+    by_date = {"range": "bytes=0-9", "if-range": http_date(MODIFIED)}
+
+    assert requested_range(fresh, 1000, ETAG, MODIFIED) == (0, 9)
+    assert requested_range(stale_etag, 1000, ETAG, MODIFIED) is None
+    assert requested_range(weak_etag, 1000, ETAG, MODIFIED) is None
+    assert requested_range(by_date, 1000, ETAG, MODIFIED) == (0, 9)
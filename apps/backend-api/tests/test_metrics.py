@@ -0,0 +1,43 @@
+"""
+Tests for in-process metrics
+"""
+
+from core.database import create_pooled_engine, pool_stats
+from core.metrics import Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    """Bucket counts should include every observation at or below the bound"""
+    histogram = Histogram("wait_seconds", buckets=(0.01, 0.1, 1))
+    for value in (0.005, 0.01, 0.05, 0.5, 3):
+        histogram.observe(value)
+
+    stats = histogram.stats()
+    assert stats["count"] == 5
+    assert stats["max"] == 3
+    assert stats["buckets"] == {"le_0.01": 2, "le_0.1": 3, "le_1": 4, "le_inf": 5}
+
+
+def test_pool_stats_reports_configured_pool():
+    """Pool gauges should reflect the configured size before any checkout"""
+    engine = create_pooled_engine("postgresql+asyncpg://user@localhost/test", "test_pool")
+
+    stats = pool_stats(engine)
+    assert stats["name"] == "test_pool"
+    assert stats["checked_out"] == 0
+    assert stats["timeouts"] == 0
+    assert stats["wait_seconds"]["count"] == 0
+
+
+def test_metrics_endpoint_requires_authentication():
+    """Worker internals are not exposed to anonymous callers, unlike the probes"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from routers import health
+
+    app = FastAPI()
+    app.include_router(health.router, prefix="/health")
+    client = TestClient(app)
+
+    assert client.get("/health/").status_code == 200
+    assert client.get("/health/metrics").status_code in (401, 403)
@@ -0,0 +1,183 @@
+"""
+Tests for notification broadcasts
+"""
+
+import datetime
+import json
+import uuid
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import postgresql
+from core import notification_broadcast
+from core.notification_broadcast import recipients_query, send_broadcast, send_broadcast_chunk
+from core.config import settings
+from core.notification_hub import publish_events
+from schemas.notification import NotificationAudience, NotificationBroadcast
+
+ORG_ID = uuid.uuid4()
+PROPERTY_ID = uuid.uuid4()
+NOW = datetime.datetime(2024, 12, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Returns canned results in order and records executed statements"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else [])
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def make_broadcast(**audience) -> NotificationBroadcast:
+    return NotificationBroadcast(
+        audience=NotificationAudience(organization_id=ORG_ID, **audience),
+        entity_type="announcement",
+        entity_id=uuid.uuid4(),
+        type="announcement_published",
+    )
+
+
+def inserted_rows(count):
+    return [SimpleNamespace(id=uuid.uuid4(), user_id=uuid.uuid4(), created_at=NOW) for _ in range(count)]
+
+
+def test_audience_filters_are_combined_in_sql():
+    audience = NotificationAudience(organization_id=ORG_ID, property_id=PROPERTY_ID, roles=["tenant"])
+
+    sql = compile_sql(recipients_query(audience))
+
+    assert "users.organization_id =" in sql
+    assert "users.status !=" in sql
+    assert "EXISTS (SELECT * \nFROM user_access_scopes" in sql
+    assert "roles.name IN" in sql
+    assert "users.id IN" not in sql
+
+
+@pytest.mark.asyncio
+async def test_chunk_is_one_insert_one_upsert_one_notify():
+    rows = inserted_rows(3)
+    db = FakeSession(rows)
+
+    user_ids = await send_broadcast_chunk(db, make_broadcast(), uuid.UUID(int=5), limit=3)
+
+    assert user_ids == sorted(row.user_id for row in rows)
+    insert_sql, upsert_sql, notify_sql = (compile_sql(s) for s in db.statements)
+    assert "INSERT INTO notifications (user_id, organization_id, entity_type, entity_id, type) SELECT" in insert_sql
+    assert "users.id >" in insert_sql
+    assert "ORDER BY users.id" in insert_sql
+    assert "RETURNING notifications.id" in insert_sql
+    assert "INSERT INTO user_unread_counts" in upsert_sql
+    assert "pg_notify" in notify_sql and "VALUES" in notify_sql
+
+
+@pytest.mark.asyncio
+async def test_broadcast_walks_chunks_until_a_short_one(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_BROADCAST_CHUNK_SIZE", 2)
+    # Each chunk executes insert, upsert and notify; only inserts return rows
+    db = FakeSession(inserted_rows(2), [], [], inserted_rows(1), [], [])
+
+    sent = await send_broadcast(db, make_broadcast())
+
+    assert len(sent) == 3
+    inserts = [s for s in db.statements if "INSERT INTO notifications" in compile_sql(s)]
+    assert len(inserts) == 2
+    assert "users.id >" not in compile_sql(inserts[0])
+    assert "users.id >" in compile_sql(inserts[1])
+
+
+@pytest.mark.asyncio
+async def test_publish_events_notifies_each_recipient():
+    db = FakeSession()
+    first, second = uuid.uuid4(), uuid.uuid4()
+
+    await publish_events(db, [(first, "notification", {"id": "n1"}), (second, "notification", {"id": "n2"})])
+    await publish_events(db, [])
+
+    assert len(db.statements) == 1
+    params = db.statements[0].compile(dialect=postgresql.dialect()).params
+    payloads = [json.loads(v) for v in params.values() if isinstance(v, str) and v.startswith("{")]
+    assert [p["user_id"] for p in payloads] == [str(first), str(second)]
+
+
+class JobResult(FakeResult):
+    def scalar_one_or_none(self):
+        return self._rows
+
+
+class JobSession(FakeSession):
+    """FakeSession usable as ``async with AsyncSessionLocal() as db``"""
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return JobResult(self.results.pop(0))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_job_locked_by_another_worker_is_retried(monkeypatch):
+    """A job another session holds is not finished: wait for it instead of stopping"""
+    outcomes = iter([notification_broadcast.JOB_LOCKED, notification_broadcast.CHUNK_SENT, notification_broadcast.JOB_DONE])
+    sleeps = []
+
+    async def run_chunk(job_id):
+        return next(outcomes)
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(notification_broadcast, "_run_job_chunk", run_chunk)
+    monkeypatch.setattr(notification_broadcast.asyncio, "sleep", sleep)
+
+    await notification_broadcast.run_notification_job(uuid.uuid4())
+
+    assert sleeps == [notification_broadcast.JOB_LOCK_RETRY_SECONDS, 0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, outcome", [
+    ("running", notification_broadcast.JOB_LOCKED),
+    ("completed", notification_broadcast.JOB_DONE),
+    (None, notification_broadcast.JOB_DONE),
+])
+async def test_unlockable_job_is_locked_only_while_unfinished(monkeypatch, status, outcome):
+    # The locking select skips the row; the plain status lookup still sees it
+    db = JobSession(None, status)
+    monkeypatch.setattr(notification_broadcast, "AsyncSessionLocal", lambda: db)
+
+    assert await notification_broadcast._run_job_chunk(uuid.uuid4()) == outcome
+    assert "FOR UPDATE SKIP LOCKED" in compile_sql(db.statements[0])
+
+
+@pytest.mark.asyncio
+async def test_unfinished_jobs_are_resumed_on_startup(monkeypatch):
+    job_ids = [uuid.uuid4(), uuid.uuid4()]
+    scheduled = []
+
+    async def unfinished():
+        return job_ids
+
+    monkeypatch.setattr(notification_broadcast, "unfinished_job_ids", unfinished)
+    monkeypatch.setattr(notification_broadcast, "schedule_notification_job", scheduled.append)
+
+    assert await notification_broadcast.resume_notification_jobs() == job_ids
+    assert scheduled == job_ids
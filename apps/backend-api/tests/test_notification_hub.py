@@ -0,0 +1,102 @@
+"""
+Tests for real-time notification fan-out
+"""
+
+import json
+import uuid
+import pytest
+from sqlalchemy.dialects import postgresql
+from core.notification_hub import NOTIFY_CHANNEL, RESYNC_EVENT, NotificationHub, format_sse, publish_event
+
+USER_ID = uuid.uuid4()
+OTHER_USER_ID = uuid.uuid4()
+
+
+class OfflineHub(NotificationHub):
+    """Hub without the LISTEN connection; events are fed through _on_notify"""
+
+    def _ensure_listener(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+def notify_payload(user_id, event, data):
+    return json.dumps({"user_id": str(user_id), "event": event, "data": data})
+
+
+@pytest.mark.asyncio
+async def test_publish_event_sends_pg_notify_with_recipient():
+    """The event rides on the writer's transaction as a NOTIFY"""
+    db = FakeSession()
+
+    await publish_event(db, USER_ID, "notification", {"id": "n1"})
+
+    statement = db.statements[0].compile(dialect=postgresql.dialect())
+    assert "pg_notify" in str(statement)
+    channel, payload = statement.params.values()
+    assert channel == NOTIFY_CHANNEL
+    assert json.loads(payload) == {"user_id": str(USER_ID), "event": "notification", "data": {"id": "n1"}}
+
+
+@pytest.mark.asyncio
+async def test_notify_reaches_every_stream_of_the_user_only():
+    hub = OfflineHub(queue_size=10)
+    first, second = hub.subscribe(USER_ID), hub.subscribe(USER_ID)
+    other = hub.subscribe(OTHER_USER_ID)
+
+    hub._on_notify(None, 1, NOTIFY_CHANNEL, notify_payload(USER_ID, "notification", {"id": "n1"}))
+
+    expected = {"event": "notification", "data": {"id": "n1"}}
+    assert first.get_nowait() == expected
+    assert second.get_nowait() == expected
+    assert other.empty()
+    assert hub.stats()["streams"] == 3
+
+
+@pytest.mark.asyncio
+async def test_malformed_payloads_are_ignored():
+    hub = OfflineHub(queue_size=10)
+    queue = hub.subscribe(USER_ID)
+
+    hub._on_notify(None, 1, NOTIFY_CHANNEL, "not json")
+    hub._on_notify(None, 1, NOTIFY_CHANNEL, json.dumps({"event": "notification"}))
+
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_slow_stream_is_told_to_resync():
+    """A full queue is replaced by a single resync event instead of blocking"""
+    hub = OfflineHub(queue_size=2)
+    queue = hub.subscribe(USER_ID)
+
+    for i in range(3):
+        hub.deliver(USER_ID, {"event": "notification", "data": {"id": str(i)}})
+
+    assert queue.get_nowait() == RESYNC_EVENT
+    assert queue.empty()
+    assert hub.stats()["resyncs"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_forgets_users_without_streams():
+    hub = OfflineHub(queue_size=10)
+    queue = hub.subscribe(USER_ID)
+
+    hub.unsubscribe(USER_ID, queue)
+    hub.deliver(USER_ID, {"event": "notification", "data": {}})
+
+    assert hub.stats()["users"] == 0
+    assert queue.empty()
+
+
+def test_format_sse():
+    assert format_sse("notification", {"id": "n1"}, "n1") == 'id: n1\nevent: notification\ndata: {"id": "n1"}\n\n'
+    assert format_sse("resync", {}) == "event: resync\ndata: {}\n\n"
@@ -0,0 +1,144 @@
+"""
+Tests for notification partitions and retention
+"""
+
+import datetime
+import uuid
+import pytest
+from sqlalchemy.dialects import postgresql
+from core.config import settings
+from core.notification_retention import (
+    add_months,
+    archive_batch,
+    drop_expired_partitions,
+    ensure_partitions,
+    month_start,
+    partition_name,
+    retention_cutoffs,
+)
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2025, 3, 15, 12, 0, tzinfo=UTC)
+USER_ID, OTHER_USER_ID, THIRD_USER_ID = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def all(self):
+        return self._value
+
+    def scalars(self):
+        return iter(self._value)
+
+    def scalar(self):
+        return self._value
+
+
+class FakeSession:
+    """Returns canned results in order and records executed statements"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else None)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_month_arithmetic_is_utc():
+    local = datetime.datetime(2025, 1, 1, 1, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=5)))
+
+    assert month_start(local) == datetime.datetime(2024, 12, 1, tzinfo=UTC)
+    assert add_months(datetime.datetime(2024, 11, 1, tzinfo=UTC), 3) == datetime.datetime(2025, 2, 1, tzinfo=UTC)
+    assert add_months(datetime.datetime(2025, 1, 1, tzinfo=UTC), -1) == datetime.datetime(2024, 12, 1, tzinfo=UTC)
+    assert partition_name(datetime.datetime(2025, 2, 1, tzinfo=UTC)) == "notifications_2025_02"
+
+
+def test_retention_cutoffs():
+    read_cutoff, unread_cutoff = retention_cutoffs(NOW)
+
+    assert read_cutoff == NOW - datetime.timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    assert unread_cutoff == NOW - datetime.timedelta(days=settings.NOTIFICATION_UNREAD_RETENTION_DAYS)
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_creates_missing_months(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_PARTITION_MONTHS_AHEAD", 2)
+    db = FakeSession(["notifications_2025_03", "notifications_2025_04", "notifications_default"])
+
+    created = await ensure_partitions(db, NOW)
+
+    assert created == ["notifications_2025_05"]
+    create_sql, lock_sql, move_sql, attach_sql = (str(s) for s in db.statements[1:])
+    assert create_sql.startswith("CREATE TABLE notifications_2025_05 (LIKE notifications")
+    assert lock_sql == "LOCK TABLE notifications_default IN ACCESS EXCLUSIVE MODE"
+    assert "DELETE FROM notifications_default" in move_sql
+    assert "created_at >= '2025-05-01T00:00:00+00:00' AND created_at < '2025-06-01T00:00:00+00:00'" in move_sql
+    assert attach_sql == (
+        "ALTER TABLE notifications ATTACH PARTITION notifications_2025_05 "
+        "FOR VALUES FROM ('2025-05-01T00:00:00+00:00') TO ('2025-06-01T00:00:00+00:00')"
+    )
+
+
+@pytest.mark.asyncio
+async def test_missing_current_month_takes_rows_from_the_default_partition(monkeypatch):
+    """Catch-up: this month's rows are in the default partition, and writers keep adding them"""
+    monkeypatch.setattr(settings, "NOTIFICATION_PARTITION_MONTHS_AHEAD", 0)
+    db = FakeSession(["notifications_2025_01", "notifications_default"])
+
+    assert await ensure_partitions(db, NOW) == ["notifications_2025_03"]
+
+    statements = [str(s) for s in db.statements[1:]]
+    lock = statements.index("LOCK TABLE notifications_default IN ACCESS EXCLUSIVE MODE")
+    move = next(i for i, sql in enumerate(statements) if sql.startswith("WITH moved AS (DELETE FROM notifications_default"))
+    attach = next(i for i, sql in enumerate(statements) if "ATTACH PARTITION notifications_2025_03" in sql)
+    # Locked before the move; the attach follows in the same transaction
+    assert lock < move < attach == len(statements) - 1
+    assert "INSERT INTO notifications_2025_03 SELECT * FROM moved" in statements[move]
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_moves_rows_and_adjusts_badges():
+    read_cutoff, unread_cutoff = retention_cutoffs(NOW)
+    db = FakeSession([(USER_ID, 2, 5), (OTHER_USER_ID, 0, 3), (THIRD_USER_ID, 2, 2)])
+
+    assert await archive_batch(db, read_cutoff, unread_cutoff, 100) == 10
+
+    sql = compile_sql(db.statements[0])
+    assert "WITH moved AS \n(DELETE FROM notifications" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "INSERT INTO notifications_archive" in sql
+    assert "notifications.is_read = true AND notifications.created_at <" in sql
+    # One counter update for both users with two archived unread notifications
+    assert len(db.statements) == 2
+    params = db.statements[1].compile(dialect=postgresql.dialect()).params
+    assert -2 in params.values()
+    assert {USER_ID, THIRD_USER_ID} <= set(params.values())
+    assert OTHER_USER_ID not in params.values()
+
+
+@pytest.mark.asyncio
+async def test_only_empty_expired_partitions_are_dropped():
+    _, unread_cutoff = retention_cutoffs(NOW)
+    expired = partition_name(add_months(month_start(unread_cutoff), -2))
+    not_empty = partition_name(add_months(month_start(unread_cutoff), -1))
+    current = partition_name(month_start(unread_cutoff))
+    # EXISTS answers per partition; DETACH and DROP return nothing
+    db = FakeSession([expired, not_empty, current, "notifications_default"], False, None, None, True)
+
+    assert await drop_expired_partitions(db, unread_cutoff) == [expired]
+
+    statements = [str(s) for s in db.statements[1:]]
+    assert statements == [
+        f"SELECT EXISTS (SELECT 1 FROM {expired})",
+        f"ALTER TABLE notifications DETACH PARTITION {expired}",
+        f"DROP TABLE {expired}",
+        f"SELECT EXISTS (SELECT 1 FROM {not_empty})",
+    ]
@@ -0,0 +1,145 @@
+"""
+Tests for offset and cursor pagination helpers
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import Column, DateTime, Uuid, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.dialects import postgresql
+from core.crud_helpers import (
+    NEXT_CURSOR_HEADER,
+    TOTAL_COUNT_HEADER,
+    TOTAL_COUNT_MODE_HEADER,
+    TotalCountMode,
+    _Explain,
+    apply_pagination,
+    count_total,
+    decode_cursor,
+    encode_cursor,
+    execute_page,
+    set_next_cursor,
+)
+
+PageBase = declarative_base()
+
+
+class Item(PageBase):
+    __tablename__ = "items"
+
+    id = Column(Uuid, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+async def item_session(tmp_path):
+    """Table with ties on created_at to exercise the id tie-breaker"""
+    # File-backed so concurrent count sessions get their own connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'items.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(PageBase.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    base = datetime(2024, 1, 1)
+    async with session_factory() as session:
+        session.add_all(
+            Item(id=uuid.UUID(int=index), created_at=base + timedelta(minutes=index // 3))
+            for index in range(25)
+        )
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+def test_cursor_round_trip():
+    """Cursors should decode back to the encoded position"""
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    entity_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, entity_id)) == (created_at, entity_id)
+
+
+def test_invalid_cursor_is_rejected():
+    """Malformed cursors should be a 400, not a server error"""
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_next_cursor_only_set_for_full_pages():
+    """A short page means there is nothing after it"""
+    class Row:
+        def __init__(self):
+            self.id = uuid.uuid4()
+            self.created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    response = Response()
+    set_next_cursor(response, [Row(), Row()], limit=3)
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+    rows = [Row(), Row(), Row()]
+    set_next_cursor(response, rows, limit=3)
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == (rows[-1].created_at, rows[-1].id)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_match_offset_pages(item_session):
+    """Walking with cursors should visit the same rows, in the same order, as offsets"""
+    limit = 4
+    order_by = Item.created_at.desc()
+
+    offset_rows = []
+    for page in range(1, 8):
+        result = await item_session.execute(apply_pagination(select(Item), page, limit, order_by))
+        offset_rows.extend(result.scalars().all())
+
+    cursor_rows = []
+    cursor = None
+    while True:
+        result = await item_session.execute(apply_pagination(select(Item), 1, limit, order_by, cursor))
+        rows = result.scalars().all()
+        cursor_rows.extend(rows)
+        response = Response()
+        set_next_cursor(response, rows, limit)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert [row.id for row in cursor_rows] == [row.id for row in offset_rows]
+    assert len(cursor_rows) == 25
+
+
+@pytest.mark.asyncio
+async def test_execute_page_counts_alongside_page_query(item_session):
+    """include_total=exact should report the unpaginated total in headers"""
+    query = select(Item).where(Item.created_at >= datetime(2024, 1, 1, 0, 3))
+    response = Response()
+
+    result = await execute_page(
+        item_session, apply_pagination(query, 1, 5, Item.created_at.desc()), response, query, TotalCountMode.EXACT
+    )
+
+    assert len(result.scalars().all()) == 5
+    assert response.headers[TOTAL_COUNT_HEADER] == "16"
+    assert response.headers[TOTAL_COUNT_MODE_HEADER] == "exact"
+
+
+@pytest.mark.asyncio
+async def test_count_total_skipped_unless_requested(item_session):
+    """No count query should run when include_total is not set"""
+    response = Response()
+
+    await execute_page(item_session, apply_pagination(select(Item), 1, 5, Item.created_at.desc()), response)
+
+    assert await count_total(item_session, select(Item), None) is None
+    assert TOTAL_COUNT_HEADER not in response.headers
+
+
+def test_explain_keeps_bound_parameters():
+    """Estimated counts EXPLAIN the filtered query with its parameters"""
+    sql = str(_Explain(select(Item).where(Item.id == uuid.uuid4())).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "%(id_1)s" in sql
@@ -0,0 +1,151 @@
+"""
+Tests for the RBAC permission matrix
+"""
+
+import uuid
+import pytest
+from core.auth_v2 import Principal, RoleEnum
+from core.rbac import (
+    PERMISSION_MATRIX,
+    PermissionAction,
+    ResourceType,
+    check_permission,
+    effective_permission_mask,
+    get_permitted_resource_ids,
+    has_permission,
+    permission_bit,
+    principal_permission_mask,
+)
+from db.models_v2 import User
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Records executed statements and returns canned rows"""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+
+def make_user(roles, organization_id=None):
+    """Transient user with an attached principal"""
+    user = User(id=uuid.uuid4(), status="active", organization_id=organization_id)
+    user._principal = Principal(user=user, roles=roles, organization_id=organization_id)
+    return user
+
+
+def matrix_allows(role, action, resource):
+    """Reference evaluation straight from PERMISSION_MATRIX"""
+    allowed_actions = PERMISSION_MATRIX.get(role, {}).get(resource, [])
+    return PermissionAction.MANAGE in allowed_actions or action in allowed_actions
+
+
+def test_compiled_matrix_matches_permission_matrix():
+    """Every role/resource/action combination should match the source matrix"""
+    for role in PERMISSION_MATRIX:
+        for resource in ResourceType:
+            for action in PermissionAction:
+                assert has_permission([role], action, resource) == matrix_allows(role, action, resource), (
+                    role, resource, action
+                )
+
+
+def test_multiple_roles_union_permissions():
+    """A principal's mask should grant what any of its roles grants"""
+    roles = [RoleEnum.TENANT, RoleEnum.VENDOR]
+
+    assert has_permission(roles, PermissionAction.UPDATE, ResourceType.VENDOR)  # vendor only
+    assert has_permission(roles, PermissionAction.READ, ResourceType.LEASE)  # tenant only
+    assert not has_permission(roles, PermissionAction.DELETE, ResourceType.PROPERTY)
+
+
+def test_unknown_roles_grant_nothing():
+    """Roles missing from the matrix should contribute no permissions"""
+    assert effective_permission_mask(["unknown_role"]) == 0
+    assert not has_permission([], PermissionAction.READ, ResourceType.PROPERTY)
+
+
+def test_principal_mask_is_computed_once():
+    """The principal's permission mask should be cached on the principal"""
+    user = User(id=uuid.uuid4(), status="active")
+    principal = Principal(user=user, roles=[RoleEnum.PM])
+
+    mask = principal_permission_mask(principal)
+    assert principal.permission_mask == mask
+    assert mask & permission_bit(ResourceType.WORK_ORDER, PermissionAction.CREATE)
+    assert not mask & permission_bit(ResourceType.WORK_ORDER, PermissionAction.DELETE)
+
+
+@pytest.mark.asyncio
+async def test_permitted_ids_use_one_query_per_scoped_role():
+    """Tenant lease scoping should resolve the allowed subset in a single query"""
+    ids = [uuid.uuid4() for _ in range(5)]
+    db = FakeSession(rows=ids[:2])
+    user = make_user([RoleEnum.TENANT])
+
+    permitted = await get_permitted_resource_ids(user, PermissionAction.READ, ResourceType.LEASE, db, ids)
+
+    assert permitted == set(ids[:2])
+    assert len(db.statements) == 1
+    assert not await check_permission(user, PermissionAction.READ, ResourceType.LEASE, db, resource_ids=ids)
+
+
+@pytest.mark.asyncio
+async def test_landlord_ownership_is_checked_for_a_single_id():
+    """A single property id is verified like a batch, with or without an owner id"""
+    foreign_id = uuid.uuid4()
+    db = FakeSession(rows=[])
+    user = make_user([RoleEnum.LANDLORD])
+
+    assert await get_permitted_resource_ids(
+        user, PermissionAction.READ, ResourceType.PROPERTY, db, [foreign_id]
+    ) == set()
+    assert not await check_permission(user, PermissionAction.READ, ResourceType.PROPERTY, db, resource_id=foreign_id)
+    assert len(db.statements) == 2
+    assert "user_access_scopes" in str(db.statements[0])
+
+
+@pytest.mark.asyncio
+async def test_permitted_ids_without_ownership_rules_skip_queries():
+    """Roles scoped only by organization should not query the database"""
+    org_id = uuid.uuid4()
+    ids = [uuid.uuid4() for _ in range(3)]
+    db = FakeSession()
+    user = make_user([RoleEnum.PM], organization_id=org_id)
+
+    assert await get_permitted_resource_ids(
+        user, PermissionAction.READ, ResourceType.LEASE, db, ids, resource_org_id=org_id
+    ) == set(ids)
+    assert await get_permitted_resource_ids(
+        user, PermissionAction.READ, ResourceType.LEASE, db, ids, resource_org_id=uuid.uuid4()
+    ) == set()
+    assert await get_permitted_resource_ids(
+        user, PermissionAction.DELETE, ResourceType.LEASE, db, ids
+    ) == set()
+    assert db.statements == []
+
+
+@pytest.mark.asyncio
+async def test_super_admin_permits_all_ids():
+    """super_admin should be granted every requested id without queries"""
+    ids = [uuid.uuid4() for _ in range(3)]
+    db = FakeSession()
+    user = make_user([RoleEnum.SUPER_ADMIN])
+
+    assert await get_permitted_resource_ids(user, PermissionAction.DELETE, ResourceType.WORK_ORDER, db, ids) == set(ids)
+    assert db.statements == []
@@ -0,0 +1,136 @@
+"""
+Tests for read-replica routing
+"""
+
+import time
+import uuid
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+from core import replicas
+from core.cache import TTLCache
+from core.replicas import (
+    LAST_WRITE_COOKIE,
+    Replica,
+    ReplicaRouter,
+    get_read_db,
+    note_write,
+    recent_writers,
+    replica_router,
+    wrote_recently,
+)
+from core.auth_v2 import Principal, RoleEnum
+from core.database import engine
+from db.models_v2 import User
+
+
+class FakeReplica(Replica):
+    """Replica whose lag is set by the test instead of measured"""
+
+    def __init__(self, name, lag=0.0, error=None):
+        super().__init__(name, engine=None)
+        self.lag = lag
+        self.fail_with = error
+        self.measurements = 0
+
+    async def measure_lag(self):
+        self.measurements += 1
+        if self.fail_with:
+            raise self.fail_with
+        return self.lag
+
+
+def make_request(cookies=None) -> Request:
+    header = "; ".join(f"{name}={value}" for name, value in (cookies or {}).items())
+    return Request({"type": "http", "headers": [(b"cookie", header.encode())] if header else []})
+
+
+@pytest.mark.asyncio
+async def test_router_round_robins_between_healthy_replicas():
+    """Reads should be spread across replicas within the lag threshold"""
+    first, second = FakeReplica("a"), FakeReplica("b")
+    router = ReplicaRouter([first, second], max_lag=5, check_interval=60)
+
+    chosen = [await router.choose() for _ in range(4)]
+
+    assert chosen == [first, second, first, second]
+    # Lag is measured once per check interval, not per read
+    assert first.measurements == 1
+    assert second.measurements == 1
+
+
+@pytest.mark.asyncio
+async def test_router_skips_lagging_and_failing_replicas():
+    """Replicas over the lag threshold or unreachable should be skipped"""
+    lagging = FakeReplica("lagging", lag=30)
+    broken = FakeReplica("broken", error=ConnectionRefusedError("down"))
+    healthy = FakeReplica("healthy", lag=1)
+    router = ReplicaRouter([lagging, broken, healthy], max_lag=5, check_interval=60)
+
+    assert await router.choose() is healthy
+    assert broken.error.startswith("ConnectionRefusedError")
+
+
+@pytest.mark.asyncio
+async def test_router_falls_back_to_primary_when_all_replicas_lag():
+    """With no usable replica the read should go to the primary"""
+    router = ReplicaRouter([FakeReplica("a", lag=10)], max_lag=5, check_interval=60)
+
+    assert await router.choose() is None
+    assert router.primary_reads == 1
+
+
+@pytest.mark.asyncio
+async def test_get_read_db_uses_primary_without_replicas():
+    """Without configured replicas every read session comes from the primary"""
+    user = User(id=uuid.uuid4(), status="active")
+    principal = Principal(user=user, roles=[RoleEnum.PM])
+    assert replica_router.replicas == []
+
+    response = Response()
+    note_write(principal.user_id, response)  # no-op without replicas
+    assert recent_writers.get(principal.user_id) is None
+    assert "set-cookie" not in response.headers
+
+    sessions = get_read_db(make_request(), principal=principal)
+    session = await sessions.__anext__()
+    assert session.bind is engine
+    await sessions.aclose()
+
+
+def test_write_cookie_pins_reads_on_any_worker(monkeypatch):
+    """Another worker has no recent_writers entry, but sees the cookie"""
+    monkeypatch.setattr(replica_router, "replicas", [FakeReplica("a")])
+    now = 1_700_000_000.0
+    monkeypatch.setattr(replicas.time, "time", lambda: now)
+    user_id = uuid.uuid4()
+    response = Response()
+
+    note_write(user_id, response)
+    assert LAST_WRITE_COOKIE in response.headers["set-cookie"]
+    written_at = response.headers["set-cookie"].split(";")[0].split("=")[1]
+
+    monkeypatch.setattr(replicas, "recent_writers", TTLCache("other_worker", maxsize=10, ttl=10))
+    assert wrote_recently(user_id, make_request({LAST_WRITE_COOKIE: written_at}))
+    assert not wrote_recently(user_id, make_request())
+    assert not wrote_recently(user_id, make_request({LAST_WRITE_COOKIE: "garbage"}))
+
+    window = replicas.settings.REPLICA_READ_YOUR_WRITES_SECONDS
+    assert not wrote_recently(user_id, make_request({LAST_WRITE_COOKIE: f"{now - window - 1:.3f}"}))
+
+
+@pytest.mark.parametrize("reader_offset, pinned", [
+    (-1.0, True),     # reading worker's clock behind the writer's, within tolerance
+    (-0.0004, True),  # cookie value rounded up past the read time
+    (-3.0, False),    # beyond REPLICA_CLOCK_SKEW_SECONDS
+    (9.0, True),
+    (11.0, False),    # past REPLICA_READ_YOUR_WRITES_SECONDS
+])
+def test_write_cookie_tolerates_clock_skew(monkeypatch, reader_offset, pinned):
+    written_at = 1_700_000_000.0
+    monkeypatch.setattr(replicas.time, "time", lambda: written_at + reader_offset)
+    monkeypatch.setattr(replicas.settings, "REPLICA_CLOCK_SKEW_SECONDS", 2)
+    monkeypatch.setattr(replicas.settings, "REPLICA_READ_YOUR_WRITES_SECONDS", 10)
+
+    request = make_request({LAST_WRITE_COOKIE: f"{written_at:.3f}"})
+    assert wrote_recently(uuid.uuid4(), request) is pinned
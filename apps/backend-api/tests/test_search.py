@@ -0,0 +1,151 @@
+"""
+Tests for full-text search helpers
+"""
+
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from core.search import (
+    ALL_ORGANIZATIONS,
+    SearchMode,
+    build_search_terms,
+    invalidate_search_cache,
+    prefix_tsquery,
+    search_cache,
+    search_cache_generation,
+    search_cache_key,
+    similarity_match,
+    store_search_results,
+    text_match,
+    uuid_prefix_range,
+)
+from core.config import settings
+from db.models_v2 import Tenant, WorkOrder
+from routers.search import _run_entity_search
+
+
+def test_prefix_tsquery_matches_every_term_as_prefix():
+    """Each word of the query should become an AND-ed prefix term"""
+    assert prefix_tsquery("123 Mapl") == "123:* & mapl:*"
+
+
+def test_prefix_tsquery_drops_tsquery_operators():
+    """Operators typed by the user must not reach to_tsquery"""
+    assert prefix_tsquery("leak & !(roof) | 'x'") == "leak:* & roof:* & x:*"
+    assert prefix_tsquery(" &|!():* ") is None
+
+
+def test_text_match_uses_search_vector_and_ts_rank():
+    """Matching should be an @@ on the indexed column, ranked with ts_rank"""
+    condition, rank = text_match(WorkOrder.search_vector, "leak:*")
+    query = select(WorkOrder.id).where(condition).order_by(rank.desc())
+
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "work_orders.search_vector @@ to_tsquery(" in sql
+    assert "ORDER BY ts_rank(work_orders.search_vector, to_tsquery(" in sql
+
+
+def test_uuid_prefix_range_covers_prefix():
+    """A partial id should map to the inclusive primary key range it covers"""
+    lease_id = uuid.uuid4()
+    low, high = uuid_prefix_range(str(lease_id)[:8].upper())
+
+    assert low <= lease_id <= high
+    assert uuid_prefix_range(str(lease_id)) == (lease_id, lease_id)
+
+
+def test_uuid_prefix_range_rejects_non_ids():
+    """Short or non-hex input is not an id lookup"""
+    assert uuid_prefix_range("abc") is None
+    assert uuid_prefix_range("maple street") is None
+
+
+def test_similarity_match_uses_trigram_operators():
+    """Fuzzy matching should combine escaped ILIKE and word similarity per column"""
+    condition, rank = similarity_match((Tenant.name, Tenant.email), "jon_do")
+    query = select(Tenant.id).where(condition).order_by(rank.desc())
+
+    compiled = query.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "tenants.name ILIKE" in sql
+    assert "<%% tenants.email" in sql
+    assert "ORDER BY greatest(coalesce(word_similarity(" in sql
+    assert "jon/_do" in compiled.params.values()
+
+
+def test_similarity_terms_require_a_trigram():
+    """Too-short input keeps full-text matching even in similarity mode"""
+    assert build_search_terms("  Maple   St ", SearchMode.SIMILARITY).similarity == "maple st"
+    assert build_search_terms("ab", SearchMode.SIMILARITY).similarity is None
+    assert build_search_terms("maple", SearchMode.FULLTEXT).similarity is None
+
+
+class FakeReadSession:
+    bind = None
+
+
+@pytest.mark.asyncio
+async def test_entity_search_over_budget_returns_none(monkeypatch):
+    """A slow entity type is dropped (None) instead of delaying the response"""
+    monkeypatch.setattr(settings, "SEARCH_ENTITY_TIMEOUT_SECONDS", 0.01)
+
+    async def fast_search(session, terms, current_user, user_roles, limit):
+        return [{"id": "1"}]
+
+    async def slow_search(session, terms, current_user, user_roles, limit):
+        await asyncio.sleep(1)
+        return [{"id": "2"}]
+
+    terms = build_search_terms("maple")
+    fast, slow = await asyncio.gather(
+        _run_entity_search(FakeReadSession(), fast_search, terms, None, [], 10),
+        _run_entity_search(FakeReadSession(), slow_search, terms, None, [], 10),
+    )
+
+    assert fast == [{"id": "1"}]
+    assert slow is None
+
+
+def test_search_cache_key_normalizes_query():
+    """Case and whitespace variants of a prefix share one cache entry"""
+    organization_id = uuid.uuid4()
+
+    assert search_cache_key(organization_id, "organization", None, SearchMode.FULLTEXT, " Maple  St", 10) == \
+        search_cache_key(organization_id, "organization", None, SearchMode.FULLTEXT, "maple st", 10)
+    assert search_cache_key(organization_id, "organization", "tenants", SearchMode.FULLTEXT, "maple", 10) != \
+        search_cache_key(organization_id, "organization", None, SearchMode.FULLTEXT, "maple", 10)
+
+
+def test_invalidate_search_cache_is_scoped_to_organization():
+    """A write drops the organization's entries and unscoped ones, nothing else"""
+    search_cache.clear()
+    org_a, org_b = uuid.uuid4(), uuid.uuid4()
+    key_a = search_cache_key(org_a, "organization", None, SearchMode.FULLTEXT, "maple", 10)
+    key_b = search_cache_key(org_b, "organization", None, SearchMode.FULLTEXT, "maple", 10)
+    key_all = search_cache_key(org_b, ALL_ORGANIZATIONS, None, SearchMode.FULLTEXT, "maple", 10)
+    for key in (key_a, key_b, key_all):
+        search_cache.set(key, {"properties": []})
+
+    assert invalidate_search_cache(org_a) == 2
+    assert search_cache.get(key_a) is None
+    assert search_cache.get(key_all) is None
+    assert search_cache.get(key_b) == {"properties": []}
+    search_cache.clear()
+
+
+def test_results_from_before_an_invalidation_are_not_stored():
+    """A search that overlapped a write must not repopulate the cache with stale rows"""
+    search_cache.clear()
+    organization_id = uuid.uuid4()
+    key = search_cache_key(organization_id, "organization", None, SearchMode.FULLTEXT, "maple", 10)
+
+    generation = search_cache_generation()
+    invalidate_search_cache(organization_id)
+    store_search_results(key, {"properties": []}, generation)
+    assert search_cache.get(key) is None
+
+    store_search_results(key, {"properties": []}, search_cache_generation())
+    assert search_cache.get(key) == {"properties": []}
+    search_cache.clear()
@@ -0,0 +1,125 @@
+"""
+Tests for maintained unread counters
+"""
+
+import uuid
+import pytest
+from sqlalchemy.dialects import postgresql
+from core.unread_counts import (
+    adjust_unread_counts,
+    get_unread_counts,
+    invalidate_unread_counts,
+    mark_conversation_read,
+    record_message,
+    unread_count_cache,
+)
+from db.models_v2 import ConversationParticipant
+
+USER_ID = uuid.uuid4()
+OTHER_USER_ID = uuid.uuid4()
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def one_or_none(self):
+        return self._value
+
+    def scalar(self):
+        return self._value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._value
+
+
+class FakeSession:
+    """Returns canned results in order and records executed statements"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else None)
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    unread_count_cache.clear()
+    yield
+    unread_count_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_unread_counts_are_a_cached_key_lookup():
+    db = FakeSession((3, 7))
+
+    assert await get_unread_counts(db, USER_ID) == {"notifications": 3, "messages": 7}
+    assert await get_unread_counts(db, USER_ID) == {"notifications": 3, "messages": 7}
+
+    assert len(db.statements) == 1
+    assert "WHERE user_unread_counts.user_id =" in compile_sql(db.statements[0])
+
+    invalidate_unread_counts([USER_ID])
+    assert await get_unread_counts(db, USER_ID) == {"notifications": 0, "messages": 0}  # no counter row yet
+
+
+@pytest.mark.asyncio
+async def test_adjust_upserts_clamped_counters():
+    db = FakeSession()
+
+    await adjust_unread_counts(db, [OTHER_USER_ID, USER_ID, USER_ID], notifications=-2)
+
+    sql = compile_sql(db.statements[0])
+    assert "INSERT INTO user_unread_counts" in sql
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+    assert "greatest(user_unread_counts.notifications +" in sql
+    # One row per distinct user; a negative delta never inserts a negative count
+    params = db.statements[0].compile(dialect=postgresql.dialect()).params
+    assert sorted(v for k, v in params.items() if k.startswith("notifications_m")) == [0, 0]
+
+
+@pytest.mark.asyncio
+async def test_adjust_without_changes_skips_the_query():
+    db = FakeSession()
+
+    await adjust_unread_counts(db, [USER_ID])
+    await adjust_unread_counts(db, [], messages=1)
+
+    assert db.statements == []
+
+
+@pytest.mark.asyncio
+async def test_record_message_counts_for_other_participants():
+    conversation_id = uuid.uuid4()
+    db = FakeSession([OTHER_USER_ID])
+
+    assert await record_message(db, conversation_id, USER_ID) == [OTHER_USER_ID]
+
+    update_sql, upsert_sql = (compile_sql(s) for s in db.statements)
+    assert "SET unread_count=(conversation_participants.unread_count +" in update_sql
+    assert "conversation_participants.user_id !=" in update_sql
+    assert "INSERT INTO user_unread_counts" in upsert_sql
+
+
+@pytest.mark.asyncio
+async def test_mark_conversation_read_moves_unread_off_the_total():
+    participant = ConversationParticipant(id=uuid.uuid4(), conversation_id=uuid.uuid4(), user_id=USER_ID, unread_count=4)
+    db = FakeSession(4)
+
+    await mark_conversation_read(db, participant)
+
+    assert "FOR UPDATE" in compile_sql(db.statements[0])
+    assert participant.unread_count == 0
+    assert participant.last_read_at is not None
+    params = db.statements[1].compile(dialect=postgresql.dialect()).params
+    assert -4 in params.values()
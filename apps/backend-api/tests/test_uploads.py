@@ -0,0 +1,86 @@
+"""
+Tests for streaming attachment uploads
+"""
+
+import hashlib
+import uuid
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from core.config import settings
+from core.uploads import UploadLimit, receive_stream, reserve_quota
+
+
+async def chunked(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_receive_stream_hashes_and_sizes_while_writing(tmp_path):
+    """The digest and size should describe exactly the bytes written"""
+    received = await receive_stream(chunked(b"lease ", b"agreement"), tmp_path, UploadLimit(100, "too large"))
+
+    assert received.size == 15
+    assert received.sha256 == hashlib.sha256(b"lease agreement").hexdigest()
+    assert received.path.read_bytes() == b"lease agreement"
+
+
+@pytest.mark.asyncio
+async def test_receive_stream_stops_at_limit_and_removes_partial_file(tmp_path):
+    """Exceeding the limit should fail with 413 before the rest is consumed"""
+    consumed = []
+
+    async def chunks():
+        for chunk in (b"1234", b"5678", b"90"):
+            consumed.append(chunk)
+            yield chunk
+
+    with pytest.raises(HTTPException) as exc_info:
+        await receive_stream(chunks(), tmp_path, UploadLimit(6, "too large"))
+
+    assert exc_info.value.status_code == 413
+    assert exc_info.value.detail == "too large"
+    assert consumed == [b"1234", b"5678"]
+    assert list(tmp_path.iterdir()) == []
+
+
+class UsageSession:
+    """Reports ``used`` bytes for the organization and records statements"""
+
+    def __init__(self, used):
+        self.used = used
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self
+
+    def scalar(self):
+        return self.used
+
+
+@pytest.mark.asyncio
+async def test_reserve_quota_rechecks_usage_under_the_organization_lock(monkeypatch):
+    """Concurrent uploads passed the unlocked early check; the final one is serialized"""
+    monkeypatch.setattr(settings, "ATTACHMENT_ORG_QUOTA_BYTES", 100)
+    db = UsageSession(used=90)
+
+    await reserve_quota(db, uuid.uuid4(), 10)
+    with pytest.raises(HTTPException) as exc_info:
+        await reserve_quota(db, uuid.uuid4(), 11)
+
+    assert exc_info.value.status_code == 413
+    lock_sql, usage_sql = db.statements[:2]
+    assert "pg_advisory_xact_lock(hashtext(" in lock_sql
+    assert "sum(attachments.file_size_bytes)" in usage_sql
+
+
+@pytest.mark.asyncio
+async def test_reserve_quota_is_free_without_a_quota(monkeypatch):
+    monkeypatch.setattr(settings, "ATTACHMENT_ORG_QUOTA_BYTES", 0)
+    db = UsageSession(used=10**12)
+
+    await reserve_quota(db, uuid.uuid4(), 10)
+
+    assert db.statements == []
@@ -13,7 +13,7 @@ import { formatDateTimeDisplay } from '@/lib/utils/safe-date-formatter';
 import { rules } from '@/lib/utils/validation-rules';
 import { useFormState } from '@/lib/hooks/useFormState';
 import { useV2Auth } from '@/lib/hooks/useV2Auth';
-import { useConversations, useConversation, useCreateConversation, useCreateMessage, useTenants } from '@/lib/hooks/useV2Data';
+import { useConversations, useConversation, useCreateConversation, useMessages, useCreateMessage, useTenants } from '@/lib/hooks/useV2Data';
 import { useLandlords } from '@/lib/hooks/useV2Data';
 
 /**
@@ -33,7 +33,10 @@ export default function PMCMessagesClient() {
   
   // v2 API hooks
   const { data: conversationsData, isLoading: conversationsLoading, refetch: refetchConversations } = useConversations(organizationId);
-  const { data: conversationData, refetch: refetchConversation } = useConversation(selectedConversation?.id);
+  const { refetch: refetchConversation } = useConversation(selectedConversation?.id);
+  const {
+    messages, fetchNextPage, hasNextPage, isFetchingNextPage
+  } = useMessages(selectedConversation?.id || '');
   const createConversation = useCreateConversation();
   const createMessage = useCreateMessage();
   const { data: landlordsData } = useLandlords(organizationId);
@@ -42,7 +45,6 @@ export default function PMCMessagesClient() {
   const conversations = conversationsData || [];
   const landlords = landlordsData || [];
   const tenants = tenantsData || [];
-  const messages = conversationData?.messages || [];
 
   useEffect(() => {
     refetchConversations();
@@ -346,6 +348,13 @@ export default function PMCMessagesClient() {
                     </div>
                   ) : (
                     <div className="space-y-4">
+                      {hasNextPage && (
+                        <div className="flex justify-center">
+                          <Button size="xs" color="light" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+                            {isFetchingNextPage ? 'Loading...' : 'Load older messages'}
+                          </Button>
+                        </div>
+                      )}
                       {messages.map((msg, index) => {
                         const isPMC = msg.senderRole === 'pmc';
                         const showDateSeparator = index === 0 || 
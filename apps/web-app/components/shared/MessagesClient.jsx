@@ -54,9 +54,10 @@ export default function MessagesClient({ userRole = 'landlord' }) {
   // Load selected conversation
   const { data: selectedConversation, refetch: refetchConversation } = useConversation(selectedConversationId || '');
   
-  // Load messages for selected conversation
-  const { data: messagesData, refetch: refetchMessages } = useMessages(selectedConversationId || '');
-  const messages = messagesData && Array.isArray(messagesData) ? messagesData : [];
+  // Load messages for selected conversation (latest page; older ones on demand)
+  const {
+    messages, refetch: refetchMessages, fetchNextPage, hasNextPage, isFetchingNextPage
+  } = useMessages(selectedConversationId || '');
 
   // Load properties for landlords/tenants
   const { data: propertiesData } = useProperties(organizationId);
@@ -84,14 +85,15 @@ export default function MessagesClient({ userRole = 'landlord' }) {
     initialMessage: '',
   });
 
-  // Auto-scroll to bottom when new messages arrive
+  // Auto-scroll to bottom when new messages arrive (not when older ones are loaded above)
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
+  const newestMessageId = messages[messages.length - 1]?.id;
   useEffect(() => {
     scrollToBottom();
-  }, [messages]);
+  }, [newestMessageId]);
 
   // Polling for real-time updates
   const { startPolling, stopPolling } = usePolling({
@@ -218,12 +220,21 @@ export default function MessagesClient({ userRole = 'landlord' }) {
     }
   };
 
-  const handleDownloadConversation = () => {
+  const handleDownloadConversation = async () => {
     if (!selectedConversation || !messages.length) {
       notify.warning('No messages to download');
       return;
     }
 
+    // Only the latest page is loaded; the download covers the whole history
+    let allMessages;
+    try {
+      allMessages = await v2Api.listAllMessages(selectedConversation.id);
+    } catch (error) {
+      notify.error(error.message || 'Failed to load messages');
+      return;
+    }
+
     const participantNames = selectedConversation.participants?.map(p => p.user?.full_name || p.user?.email || 'Unknown').join(', ') || 'Unknown';
 
     const conversationText = [
@@ -237,7 +248,7 @@ export default function MessagesClient({ userRole = 'landlord' }) {
       'MESSAGES',
       '='.repeat(60),
       '',
-      ...messages.map((msg, index) => {
+      ...allMessages.map((msg, index) => {
         const senderName = msg.sender?.full_name || msg.sender?.email || 'Unknown';
         const timestamp = formatDateTimeDisplay(msg.created_at);
         return [
@@ -267,22 +278,8 @@ export default function MessagesClient({ userRole = 'landlord' }) {
     setSelectedConversationId(conversation.id);
   };
 
-  // Calculate unread count (messages where is_read is false and sender is not current user)
-  const unreadCount = conversations.reduce((count, conv) => {
-    const unread = conv.messages?.filter(msg => 
-      !msg.is_read && msg.sender_user_id !== user?.id
-    ).length || 0;
-    return count + unread;
-  }, 0);
-
-  // Get last message preview
-  const getLastMessage = (conversation) => {
-    if (!conversation.messages || conversation.messages.length === 0) return null;
-    const sorted = [...conversation.messages].sort((a, b) => 
-      new Date(b.created_at) - new Date(a.created_at)
-    );
-    return sorted[0];
-  };
+  // Calculate unread count (messages from others the current user has not read)
+  const unreadCount = conversations.reduce((count, conv) => count + (conv.unread_count || 0), 0);
 
   return (
     <PageLayout
@@ -321,11 +318,8 @@ export default function MessagesClient({ userRole = 'landlord' }) {
             ) : (
               <div className="space-y-2 max-h-[calc(100vh-350px)] overflow-y-auto">
                 {conversations.map(convo => {
-                  const lastMessage = getLastMessage(convo);
-                  const preview = lastMessage?.body?.substring(0, 50) || 'No messages yet';
-                  const unread = convo.messages?.filter(msg => 
-                    !msg.is_read && msg.sender_user_id !== user?.id
-                  ).length || 0;
+                  const preview = convo.last_message?.body?.substring(0, 50) || 'No messages yet';
+                  const unread = convo.unread_count || 0;
                   
                   return (
                     <div
@@ -407,6 +401,13 @@ export default function MessagesClient({ userRole = 'landlord' }) {
                   className="flex-1 overflow-y-auto space-y-3 p-4 bg-gray-50 dark:bg-gray-900 rounded-lg mb-4"
                   style={{ maxHeight: 'calc(100vh - 400px)' }}
                 >
+                  {hasNextPage && (
+                    <div className="flex justify-center">
+                      <Button size="xs" color="light" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+                        {isFetchingNextPage ? 'Loading...' : 'Load older messages'}
+                      </Button>
+                    </div>
+                  )}
                   {messages.length === 0 ? (
                     <Empty description="No messages yet. Start the conversation" />
                   ) : (
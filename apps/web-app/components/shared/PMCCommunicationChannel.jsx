@@ -6,7 +6,7 @@ import { HiChat, HiPaperAirplane, HiPlus, HiUser } from 'react-icons/hi';
 import { ProCard } from '../shared/LazyProComponents';
 import { formatDateTimeDisplay } from '@/lib/utils/safe-date-formatter';
 import { useV2Auth } from '@/lib/hooks/useV2Auth';
-import { useConversations, useConversation, useCreateConversation, useCreateMessage } from '@/lib/hooks/useV2Data';
+import { useConversations, useConversation, useCreateConversation, useMessages, useCreateMessage } from '@/lib/hooks/useV2Data';
 import { useFormState } from '@/lib/hooks/useFormState';
 import { notify } from '@/lib/utils/notification-helper';
 
@@ -28,12 +28,14 @@ export default function PMCCommunicationChannel({ landlordId, propertyId }) {
   
   // v2 API hooks
   const { data: conversationsData, isLoading: conversationsLoading, refetch: refetchConversations } = useConversations(organizationId);
-  const { data: conversationData, refetch: refetchConversation } = useConversation(selectedConversation?.id);
+  const { refetch: refetchConversation } = useConversation(selectedConversation?.id);
+  const {
+    messages, fetchNextPage, hasNextPage, isFetchingNextPage
+  } = useMessages(selectedConversation?.id || '');
   const createConversation = useCreateConversation();
   const createMessage = useCreateMessage();
   
   const conversations = conversationsData || [];
-  const messages = conversationData?.messages || [];
   const loading = conversationsLoading;
 
   useEffect(() => {
@@ -174,9 +176,9 @@ export default function PMCCommunicationChannel({ landlordId, propertyId }) {
                             {conversation.property.propertyName || conversation.property.addressLine1}
                           </Badge>
                         )}
-                        {conversation.messages?.[0] && (
+                        {conversation.last_message && (
                           <p className="text-xs text-gray-400 mt-1">
-                            {formatDateTimeDisplay(conversation.messages[0].createdAt)}
+                            {formatDateTimeDisplay(conversation.last_message.created_at)}
                           </p>
                         )}
                       </div>
@@ -201,6 +203,13 @@ export default function PMCCommunicationChannel({ landlordId, propertyId }) {
                 </div>
 
                 <div className="flex-1 overflow-y-auto p-4 space-y-4">
+                  {hasNextPage && (
+                    <div className="flex justify-center">
+                      <Button size="xs" color="light" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+                        {isFetchingNextPage ? 'Loading...' : 'Load older messages'}
+                      </Button>
+                    </div>
+                  )}
                   {messages.map((msg) => (
                     <div
                       key={msg.id}
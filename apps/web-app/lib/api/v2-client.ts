@@ -13,6 +13,12 @@ export interface ApiError {
   status?: number;
 }
 
+export interface AttachmentSummary {
+  count: number;
+  total_size_bytes: number;
+  latest_created_at: string | null;
+}
+
 class ApiClient {
   private baseUrl: string;
   private token: string | null = null;
@@ -45,6 +51,30 @@ class ApiClient {
     options: RequestInit = {},
     retries = 2
   ): Promise<T> {
+    const response = await this.send(endpoint, options, retries);
+
+    // Handle 204 No Content
+    if (response.status === 204) {
+      return null as T;
+    }
+
+    return response.json();
+  }
+
+  /** One page of a cursor-paged list; nextCursor is null on the last page */
+  private async requestPage<T>(endpoint: string): Promise<{ items: T[]; nextCursor: string | null }> {
+    const response = await this.send(endpoint);
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  }
+
+  private async send(
+    endpoint: string,
+    options: RequestInit = {},
+    retries = 2
+  ): Promise<Response> {
     const url = `${this.baseUrl}${endpoint}`;
     const headers: HeadersInit = {
       'Content-Type': 'application/json',
@@ -80,23 +110,18 @@ class ApiClient {
         // Retry on network errors (5xx) or rate limiting (429), not client errors (4xx)
         if (retries > 0 && (response.status >= 500 || response.status === 429)) {
           await new Promise(resolve => setTimeout(resolve, 1000 * (3 - retries))); // Exponential backoff
-          return this.request<T>(endpoint, options, retries - 1);
+          return this.send(endpoint, options, retries - 1);
         }
 
         throw error;
       }
 
-      // Handle 204 No Content
-      if (response.status === 204) {
-        return null as T;
-      }
-
-      return response.json();
+      return response;
     } catch (error: any) {
       // Retry on network errors (not HTTP errors)
       if (retries > 0 && error.name === 'TypeError' && error.message.includes('fetch')) {
         await new Promise(resolve => setTimeout(resolve, 1000 * (3 - retries))); // Exponential backoff
-        return this.request<T>(endpoint, options, retries - 1);
+        return this.send(endpoint, options, retries - 1);
       }
       throw error;
     }
@@ -311,6 +336,7 @@ class ApiClient {
     organization_id?: string;
     property_id?: string;
     status?: string;
+    include_attachments?: boolean;
   }) {
     const params = new URLSearchParams();
     if (filters?.organization_id) {
@@ -322,6 +348,9 @@ class ApiClient {
     if (filters?.status) {
       params.append('status_filter', filters.status);
     }
+    if (filters?.include_attachments) {
+      params.append('include_attachments', 'true');
+    }
     const query = params.toString();
     return this.request<Array<{
       id: string;
@@ -360,6 +389,7 @@ class ApiClient {
         file_size_bytes: number | null;
         created_at: string;
       }>;
+      attachment_summary?: AttachmentSummary | null;
     }>>(`/work-orders${query ? `?${query}` : ''}`);
   }
 
@@ -533,6 +563,27 @@ class ApiClient {
     }>>(`/attachments?entity_type=${entityType}&entity_id=${entityId}`);
   }
 
+  async listAttachmentsBatch(entityType: string, entityIds: string[], countsOnly = false) {
+    const params = new URLSearchParams({ entity_type: entityType });
+    entityIds.forEach((id) => params.append('entity_ids', id));
+    if (countsOnly) {
+      params.append('counts_only', 'true');
+    }
+    return this.request<Record<string, AttachmentSummary & {
+      attachments: Array<{
+        id: string;
+        organization_id: string;
+        entity_type: string;
+        entity_id: string;
+        storage_key: string;
+        file_name: string;
+        mime_type: string | null;
+        file_size_bytes: number | null;
+        created_at: string;
+      }> | null;
+    }>>(`/attachments/batch?${params.toString()}`);
+  }
+
   async uploadAttachment(
     entityType: string,
     entityId: string,
@@ -574,8 +625,9 @@ class ApiClient {
     return response.json();
   }
 
-  async downloadAttachment(attachmentId: string) {
-    const url = `${API_BASE_URL}/attachments/${attachmentId}/download`;
+  async downloadAttachment(attachmentId: string, variant?: 'original' | 'thumbnail' | 'preview') {
+    const query = variant && variant !== 'original' ? `?variant=${variant}` : '';
+    const url = `${API_BASE_URL}/attachments/${attachmentId}/download${query}`;
     const headers: HeadersInit = {};
     
     if (this.token) {
@@ -762,6 +814,75 @@ class ApiClient {
     return this.request<void>('/notifications/mark-all-read', { method: 'POST' });
   }
 
+  async getUnreadCounts() {
+    return this.request<{ notifications: number; messages: number }>('/notifications/unread-count');
+  }
+
+  async broadcastNotification(data: {
+    audience: {
+      organization_id: string;
+      property_id?: string;
+      roles?: Array<'pmc_admin' | 'pm' | 'landlord' | 'tenant' | 'vendor'>;
+      user_ids?: string[];
+    };
+    entity_type: string;
+    entity_id: string;
+    type: string;
+  }) {
+    return this.request<{ status: 'completed' | 'queued'; recipient_count: number; job_id: string | null }>(
+      '/notifications/broadcast',
+      { method: 'POST', body: JSON.stringify(data) }
+    );
+  }
+
+  async getNotificationJob(jobId: string) {
+    return this.request<any>(`/notifications/jobs/${jobId}`);
+  }
+
+  /**
+   * Listen for notification events (Server-Sent Events over fetch, so the
+   * bearer token can be sent). Resolves when the stream ends or `signal` aborts;
+   * callers reconnect and refetch the list on `resync`.
+   */
+  async streamNotifications(
+    onEvent: (event: string, data: any) => void,
+    signal?: AbortSignal
+  ) {
+    const headers: HeadersInit = { Accept: 'text/event-stream' };
+    if (this.token) {
+      headers['Authorization'] = `Bearer ${this.token}`;
+    }
+
+    const response = await fetch(`${this.baseUrl}/notifications/stream`, {
+      headers,
+      credentials: 'include',
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to open notification stream: ${response.statusText}`);
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = 'message';
+        let data = '';
+        for (const line of message.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        if (data) onEvent(event, JSON.parse(data));
+      }
+    }
+  }
+
   // User endpoints
   async listUsers(organizationId?: string) {
     const params = new URLSearchParams();
@@ -845,9 +966,12 @@ class ApiClient {
         properties?: Array<any>;
         tenants?: Array<any>;
         landlords?: Array<any>;
+        vendors?: Array<any>;
         leases?: Array<any>;
         work_orders?: Array<any>;
       };
+      partial?: boolean;
+      timed_out?: string[];
     }>(`/search?${params}`);
   }
 
@@ -934,8 +1058,24 @@ class ApiClient {
     });
   }
 
-  async listMessages(conversationId: string) {
-    return this.request<Array<any>>(`/conversations/${conversationId}/messages`);
+  /** Newest first; pass the previous page's X-Next-Cursor to load older messages */
+  async listMessages(conversationId: string, options?: { limit?: number; cursor?: string }) {
+    const params = new URLSearchParams();
+    if (options?.limit) params.append('limit', String(options.limit));
+    if (options?.cursor) params.append('cursor', options.cursor);
+    return this.requestPage<any>(`/conversations/${conversationId}/messages${params.toString() ? `?${params}` : ''}`);
+  }
+
+  /** Whole history, oldest first (e.g. for export) */
+  async listAllMessages(conversationId: string) {
+    const messages: any[] = [];
+    let cursor: string | undefined;
+    do {
+      const page = await this.listMessages(conversationId, { limit: 100, cursor });
+      messages.push(...page.items);
+      cursor = page.nextCursor ?? undefined;
+    } while (cursor);
+    return messages.reverse();
   }
 
   async createMessage(conversationId: string, data: { body: string }) {
@@ -945,6 +1085,10 @@ class ApiClient {
     });
   }
 
+  async markConversationRead(conversationId: string) {
+    return this.request<void>(`/conversations/${conversationId}/read`, { method: 'POST' });
+  }
+
   // Invitation endpoints
   async listInvitations(organizationId?: string, statusFilter?: string) {
     const params = new URLSearchParams();
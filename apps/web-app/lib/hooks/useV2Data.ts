@@ -6,7 +6,8 @@
  */
 "use client";
 
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useMemo } from 'react';
+import { useInfiniteQuery, useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { v2Api } from '@/lib/api/v2-client';
 import { useOrganizationId, useQueryEnabled } from './useOrganizationScoped';
 
@@ -669,13 +670,24 @@ export function useCreateConversation() {
   });
 }
 
+/**
+ * Messages of a conversation, oldest first. The API pages newest first, so
+ * only the latest page is loaded until fetchNextPage() loads older ones.
+ */
 export function useMessages(conversationId: string) {
-  return useQuery({
+  const query = useInfiniteQuery({
     queryKey: ['v2', 'conversations', conversationId, 'messages'],
-    queryFn: () => v2Api.listMessages(conversationId),
+    queryFn: ({ pageParam }) => v2Api.listMessages(conversationId, { cursor: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
     enabled: !!conversationId,
     staleTime: STALE_TIMES.messages,
   });
+  const messages = useMemo(
+    () => (query.data?.pages ?? []).flatMap((page) => page.items).reverse(),
+    [query.data]
+  );
+  return { ...query, messages };
 }
 
 export function useCreateMessage() {